@@ -0,0 +1,708 @@
+import os
+import json
+import time
+import subprocess
+import resource
+import tempfile
+import math
+import tracemalloc
+import numpy
+import pandas
+import matplotlib
+from matplotlib import pyplot
+
+# ! Custom
+from scalarFields import *
+from vectorFields import *
+from dataOps import (
+    readDataSet,
+    computeDerivedScalarFields,
+    computeCurl,
+    getGMaxMin,
+    getAtomicMass,
+    getSourceFields,
+)
+from renderOps import (
+    renderFrames,
+    renderStaticFrame,
+    drawQuiver,
+    getQuiverFactor,
+    getRenderContext,
+)
+from gridOps import Grid, SLICE_GRID
+import formulae
+import scalarVisualization
+import vectorVisualization
+
+
+def generateScalarData(
+    rows: int = SLICE_GRID.planeCells,
+    seed: int = 0,
+) -> pandas.DataFrame:
+    """
+    Generates a synthetic multifield data set with the same columns as the contest data
+
+    Parameters:
+    - rows - Number of grid cells
+    - seed - Seed of the random number generator
+
+    Returns:
+    - A pandas.DataFrame with the given scalar fields as columns
+    """
+    generator = numpy.random.default_rng(seed)
+
+    # * Mass abundances of the 8 chemical species that sum up to 1
+    abundances = generator.dirichlet(numpy.ones(8), size=rows)
+
+    return pandas.DataFrame(
+        {
+            TOTAL_PARTICLE_DENSITY["accessor"]: generator.lognormal(0.0, 2.0, rows),
+            GAS_TEMPERATURE["accessor"]: generator.uniform(10.0, 1e5, rows),
+            H_MASS_ABUNDANCE["accessor"]: abundances[:, 0],
+            H_PLUS_MASS_ABUNDANCE["accessor"]: abundances[:, 1],
+            HE_MASS_ABUNDANCE["accessor"]: abundances[:, 2],
+            HE_PLUS_MASS_ABUNDANCE["accessor"]: abundances[:, 3],
+            HE_PLUS_PLUS_MASS_ABUNDANCE["accessor"]: abundances[:, 4],
+            H_MINUS_MASS_ABUNDANCE["accessor"]: abundances[:, 5],
+            H2_MASS_ABUNDANCE["accessor"]: abundances[:, 6],
+            H2_PLUS_MASS_ABUNDANCE["accessor"]: abundances[:, 7],
+        }
+    )
+
+
+def computeDerivedScalarFieldsPerRow(
+    dataSet: list[pandas.DataFrame], fields: list[dict]
+) -> list[pandas.DataFrame]:
+    """
+    Reference implementation of `computeDerivedScalarFields()` that evaluates the formulae once per row with `DataFrame.apply()`
+
+    Parameters:
+    - dataSet - A list of pandas.DataFrame that represents the entire data set
+    - fields - The fields to be computed
+
+    Returns:
+    - A list of pandas.DataFrame that contains the new fields
+    """
+    for data in dataSet:
+        data[TOTAL_DENSITY["accessor"]] = data.apply(
+            lambda row: formulae.getTotalDensity(
+                tpd=row[TOTAL_PARTICLE_DENSITY["accessor"]],
+                h=row[H_MASS_ABUNDANCE["accessor"]],
+                hP=row[H_PLUS_MASS_ABUNDANCE["accessor"]],
+                hM=row[H_MINUS_MASS_ABUNDANCE["accessor"]],
+                he=row[HE_MASS_ABUNDANCE["accessor"]],
+                heP=row[HE_PLUS_MASS_ABUNDANCE["accessor"]],
+                hePP=row[HE_PLUS_PLUS_MASS_ABUNDANCE["accessor"]],
+                h2=row[H2_MASS_ABUNDANCE["accessor"]],
+                h2P=row[H2_PLUS_MASS_ABUNDANCE["accessor"]],
+            ),
+            axis=1,
+        )
+
+        for field in fields:
+            if field["type"] == "number_density":
+                if field["dependentColumn"] in [
+                    H_MASS_ABUNDANCE,
+                    H_PLUS_MASS_ABUNDANCE,
+                    H_MINUS_MASS_ABUNDANCE,
+                ]:
+                    formula = formulae.getHNumberDensity
+                elif field["dependentColumn"] in [
+                    HE_MASS_ABUNDANCE,
+                    HE_PLUS_MASS_ABUNDANCE,
+                    HE_PLUS_PLUS_MASS_ABUNDANCE,
+                ]:
+                    formula = formulae.getHeNumberDensity
+                else:
+                    formula = formulae.getH2NumberDensity
+
+                data[field["accessor"]] = data.apply(
+                    lambda row: formula(
+                        row[field["dependentColumn"]["accessor"]],
+                        row[TOTAL_DENSITY["accessor"]],
+                    ),
+                    axis=1,
+                )
+            elif field["type"] == "mass_density":
+                data[field["accessor"]] = data.apply(
+                    lambda row: formulae.getMassDensity(
+                        ma=row[field["dependentColumn"]["accessor"]],
+                        td=row[TOTAL_DENSITY["accessor"]],
+                    ),
+                    axis=1,
+                )
+
+        data.drop(
+            list(set(data.columns.values) - set(field["accessor"] for field in fields)),
+            inplace=True,
+            axis=1,
+        )
+
+    return dataSet
+
+
+def benchmarkDerivedFields(
+    rows: int = SLICE_GRID.planeCells,
+    fields: list[dict] = [
+        H_NUMBER_DENSITY,
+        H_PLUS_NUMBER_DENSITY,
+        H_MINUS_NUMBER_DENSITY,
+        HE_MASS_DENSITY,
+        H2_NUMBER_DENSITY,
+    ],
+) -> dict:
+    """
+    Times `computeDerivedScalarFields()` against the per row `DataFrame.apply()` path and checks that both produce the same values
+
+    Parameters:
+    - rows - Number of grid cells of the synthetic data set
+    - fields - The derived fields to be computed
+
+    Returns:
+    - A dictionary with the timings (seconds) and the speedup
+    """
+    data = generateScalarData(rows=rows)
+
+    start = time.perf_counter()
+    expected = computeDerivedScalarFieldsPerRow(dataSet=[data.copy()], fields=fields)
+    perRowTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = computeDerivedScalarFields(dataSet=[data.copy()], fields=fields)
+    vectorizedTime = time.perf_counter() - start
+
+    # * The fused evaluation divides the total density by MASS_OF_HYDROGEN first, which can change the last bits
+    for field in fields:
+        if not numpy.allclose(
+            expected[0][field["accessor"]].to_numpy(),
+            actual[0][field["accessor"]].to_numpy(),
+            rtol=4 * numpy.finfo(numpy.float64).eps,
+            atol=0.0,
+        ):
+            raise AssertionError(f"{field['label']} differs from the per row path")
+
+    return {
+        "rows": rows,
+        "fields": len(fields),
+        "perRowSeconds": perRowTime,
+        "vectorizedSeconds": vectorizedTime,
+        "speedup": perRowTime / vectorizedTime,
+    }
+
+
+def benchmarkFormulae(
+    rows: int = SLICE_GRID.planeCells,
+    repeats: int = 20,
+    fields: list[dict] = [
+        H_NUMBER_DENSITY,
+        H_PLUS_NUMBER_DENSITY,
+        H_MINUS_NUMBER_DENSITY,
+        HE_NUMBER_DENSITY,
+        HE_PLUS_NUMBER_DENSITY,
+        HE_PLUS_PLUS_NUMBER_DENSITY,
+        H2_NUMBER_DENSITY,
+        H2_PLUS_NUMBER_DENSITY,
+        H_MASS_DENSITY,
+        HE_MASS_DENSITY,
+        H2_MASS_DENSITY,
+    ],
+) -> dict:
+    """
+    Times the number and mass densities computed one formula at a time against `formulae.getSpeciesDensities()` writing into preallocated buffers.
+    The memory allocated by each evaluation is traced with `tracemalloc`.
+
+    Parameters:
+    - rows - Number of grid cells of the synthetic data set
+    - repeats - Number of evaluations that are timed
+    - fields - The number and mass density fields to be computed
+
+    Returns:
+    - A dictionary that maps each path (`"separate"`, `"fused"`) to its time per evaluation (seconds), throughput (values per second), peak allocation (MB) and maximum relative error against the separate path
+    """
+    data = generateScalarData(rows=rows)
+    td = formulae.getTotalDensity(
+        tpd=data[TOTAL_PARTICLE_DENSITY["accessor"]].to_numpy(),
+        h=data[H_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        hP=data[H_PLUS_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        hM=data[H_MINUS_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        he=data[HE_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        heP=data[HE_PLUS_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        hePP=data[HE_PLUS_PLUS_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        h2=data[H2_MASS_ABUNDANCE["accessor"]].to_numpy(),
+        h2P=data[H2_PLUS_MASS_ABUNDANCE["accessor"]].to_numpy(),
+    )
+    abundances = [
+        data[field["dependentColumn"]["accessor"]].to_numpy() for field in fields
+    ]
+    masses = [getAtomicMass(field) for field in fields]
+    buffers = [numpy.empty(rows) for _ in fields]
+
+    def separate():
+        # * One formula per field, each of which allocates its result and a temporary
+        return [
+            ma * td if mass == None else ma * td / (mass * formulae.MASS_OF_HYDROGEN)
+            for ma, mass in zip(abundances, masses)
+        ]
+
+    def fused():
+        return formulae.getSpeciesDensities(
+            td=td,
+            abundances=abundances,
+            masses=masses,
+            out=buffers,
+        )
+
+    expected = separate()
+    results = {}
+    for name, evaluate in [("separate", separate), ("fused", fused)]:
+        tracemalloc.start()
+        actual = evaluate()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            evaluate()
+        seconds = (time.perf_counter() - start) / repeats
+
+        error = max(
+            float(numpy.max(numpy.abs(values - reference) / numpy.abs(reference)))
+            for values, reference in zip(actual, expected)
+        )
+        if error > 4 * numpy.finfo(numpy.float64).eps:
+            raise AssertionError(f"The {name} densities differ by {error:.2e}")
+
+        results[name] = {
+            "seconds": seconds,
+            "valuesPerSecond": rows * len(fields) / seconds,
+            "allocatedMB": peak,
+            "relativeError": error,
+        }
+
+    return results
+
+
+def benchmarkQuiver(
+    grid=SLICE_GRID,
+    figsize: tuple = (15, 10),
+) -> dict:
+    """
+    Renders a quiver plot of a synthetic curl with every arrow and with each level of detail mode, and measures the render time and the file size
+
+    Parameters:
+    - grid - The grid of the synthetic curl
+    - figsize - Size of the figure in inches
+
+    Returns:
+    - A dictionary that maps each mode to the downsampling factor, the number of arrows, the render time (seconds) and the size of the PNG file (bytes)
+    """
+    generator = numpy.random.default_rng(0)
+    X, Y = grid.getAxes()
+
+    # * Vortices on top of noise
+    x, y = numpy.meshgrid(X, Y)
+    U = numpy.sin(20 * y) + 0.1 * generator.standard_normal(grid.planeShape)
+    V = numpy.cos(20 * x) + 0.1 * generator.standard_normal(grid.planeShape)
+    C = numpy.sqrt(U**2 + V**2)
+
+    # * Norm and scale of the full resolution field
+    norm = matplotlib.colors.Normalize(C.min(), C.max())
+    scale = 10 ** (math.floor(math.log10(C.max())) + 2)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, mode, factor in [
+            ("full", "stride", 1),
+            ("stride", "stride", None),
+            ("mean", "mean", None),
+            ("magnitude", "magnitude", None),
+        ]:
+            saveFile = f"{directory}/{name}.png"
+
+            start = time.perf_counter()
+            figure, axes = getRenderContext(figsize=figsize)
+            if factor == None:
+                factor = getQuiverFactor(axes=axes, X=X, Y=Y)
+            quiver = drawQuiver(
+                axes=axes,
+                X=X,
+                Y=Y,
+                U=U,
+                V=V,
+                C=C,
+                norm=norm,
+                scale=scale,
+                lodMode=mode,
+                lodFactor=factor,
+            )
+            figure.savefig(saveFile)
+            renderTime = time.perf_counter() - start
+
+            results[name] = {
+                "factor": factor,
+                "arrows": quiver.N,
+                "renderSeconds": renderTime,
+                "fileBytes": os.path.getsize(saveFile),
+            }
+
+    return results
+
+
+def benchmarkRasterRender(
+    grids: list = [SLICE_GRID, Grid(nx=4 * SLICE_GRID.nx, ny=4 * SLICE_GRID.ny)],
+    frames: int = 5,
+    levels: int = 15,
+) -> dict:
+    """
+    Renders the PNG frames of a smooth synthetic field with each render mode and compares the time per frame against the contour fills.
+    The decorated raster frames are also compared pixel by pixel with the contour fill frames (they only differ along the edges of the intervals, where contourf interpolates).
+
+    Parameters:
+    - grids - The grids of the synthetic field
+    - frames - Number of frames rendered with each mode
+    - levels - Number of levels
+
+    Returns:
+    - A dictionary that maps each grid (`"{nx}x{ny}"`) and mode to the time per frame (seconds), the speedup over the contour fills and the fraction of the pixels equal to the contour fill frame
+    """
+    results = {}
+    for grid in grids:
+        X, Y = grid.getAxes()
+        x, y = numpy.meshgrid(X, Y)
+        Z = numpy.sin(20 * x) * numpy.cos(30 * y) + x
+        levelValues = numpy.linspace(Z.min(), Z.max(), levels)
+
+        shared: dict = {
+            "Z": Z,
+            "X": X,
+            "Y": Y,
+            "field": GAS_TEMPERATURE,
+            "levels": levelValues,
+        }
+        name: str = f"{grid.nx}x{grid.ny}"
+
+        with tempfile.TemporaryDirectory() as directory:
+            for mode, renderMode, decorate in [
+                ("contour", "contour", False),
+                ("image", "image", False),
+                ("raster (decorated)", "raster", True),
+                ("raster", "raster", False),
+            ]:
+                # * The first frame warms the figure and the color maps up
+                renderStaticFrame(
+                    saveFile=f"{directory}/warm.png",
+                    renderMode=renderMode,
+                    decorate=decorate,
+                    **shared,
+                )
+
+                start = time.perf_counter()
+                for index in range(frames):
+                    renderStaticFrame(
+                        saveFile=f"{directory}/{mode} - {index}.png",
+                        renderMode=renderMode,
+                        decorate=decorate,
+                        **shared,
+                    )
+                seconds = (time.perf_counter() - start) / frames
+
+                pixels = renderStaticFrame(
+                    saveFile=None,
+                    renderMode=renderMode,
+                    decorate=decorate,
+                    **shared,
+                )
+                if mode == "contour":
+                    contourSeconds = seconds
+                    contourPixels = pixels
+
+                # * Pixels within the rounding of the colors to bytes (the bare raster has no axes to compare)
+                matchingPixels = None
+                if pixels.shape == contourPixels.shape:
+                    difference = numpy.abs(pixels.astype(numpy.int16) - contourPixels)
+                    matchingPixels = numpy.mean(difference.max(axis=-1) <= 2)
+
+                results[f"{name} | {mode}"] = {
+                    "secondsPerFrame": seconds,
+                    "speedup": contourSeconds / seconds,
+                    "matchingPixels": matchingPixels,
+                }
+
+    return results
+
+
+def writeSyntheticFiles(
+    directory: str,
+    timesteps: int = 3,
+    grid=SLICE_GRID,
+) -> tuple[list[str], list[str]]:
+    """
+    Writes synthetic multifield and velocity files in the format of the contest z-slices
+
+    Parameters:
+    - directory - Directory in which the files are written
+    - timesteps - Number of timesteps
+    - grid - The grid of each timestep (several z-planes give larger files)
+
+    Returns:
+    - A tuple (scalarFiles, vectorFiles) with the paths of the files, one per timestep
+    """
+    rows = int(numpy.prod(grid.shape))
+    scalarFiles, vectorFiles = [], []
+
+    for timestep in range(timesteps):
+        scalarFile = f"{directory}/multifield.{timestep:04d}.zslice.txt"
+        data = generateScalarData(rows=rows, seed=timestep)
+        numpy.savetxt(scalarFile, data[sorted(data.columns)].to_numpy(), fmt="%.6e")
+        scalarFiles.append(scalarFile)
+
+        vectorFile = f"{directory}/velocity.{timestep:04d}.zslice.txt"
+        velocity = numpy.random.default_rng(timestep).standard_normal((rows, 3))
+        numpy.savetxt(vectorFile, velocity, fmt="%.6e")
+        vectorFiles.append(vectorFile)
+
+    return (scalarFiles, vectorFiles)
+
+
+def benchmarkPipeline(
+    grid=SLICE_GRID,
+    timesteps: int = 3,
+    field: dict = H_NUMBER_DENSITY,
+) -> dict:
+    """
+    Times every stage of the visualization pipeline for each timestep of a synthetic data set written to disk.
+    The stages are run one timestep at a time so that their times, throughput (cells/s) and the peak memory can be compared between commits.
+
+    Parameters:
+    - grid - The grid of each timestep
+    - timesteps - Number of timesteps
+    - field - The derived scalar field that is computed and rendered
+
+    Returns:
+    - A dictionary with the grid, the record of every stage and timestep (seconds, cells, cells/s, peak memory in MB) and the totals of every stage (seconds, cells/s and frames/s of the render stages)
+    """
+    scalarFields = getSourceFields([field])
+    vectorFields = [I_COMPONENT, J_COMPONENT, K_COMPONENT]
+    cells = int(numpy.prod(grid.shape))
+    records = []
+
+    def measure(stage: str, timestep: int, run):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+
+        records.append(
+            {
+                "stage": stage,
+                "timestep": timestep,
+                "seconds": seconds,
+                "cells": cells,
+                "cellsPerSecond": cells / seconds,
+                "peakMB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            }
+        )
+
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        scalarFiles, vectorFiles = writeSyntheticFiles(
+            directory=directory,
+            timesteps=timesteps,
+            grid=grid,
+        )
+
+        for timestep, (scalarFile, vectorFile) in enumerate(
+            zip(scalarFiles, vectorFiles)
+        ):
+            # * The first read parses the text file, the second one maps the cached columns
+            measure(
+                "readDataSet",
+                timestep,
+                lambda: readDataSet(files=[scalarFile], fields=scalarFields, grid=grid),
+            )
+            scalarDataSet = measure(
+                "readDataSet (cached)",
+                timestep,
+                lambda: readDataSet(files=[scalarFile], fields=scalarFields, grid=grid),
+            )
+            scalarDataSet = measure(
+                "computeDerivedScalarFields",
+                timestep,
+                lambda: computeDerivedScalarFields(
+                    dataSet=scalarDataSet, fields=[field]
+                ),
+            )
+            zMax, zMin = measure(
+                "getGMaxMin",
+                timestep,
+                lambda: getGMaxMin(dataSet=scalarDataSet, field=field),
+            )
+
+            vectorDataSet = readDataSet(files=[vectorFile], fields=vectorFields)
+            vectorDataSet = measure(
+                "computeCurl",
+                timestep,
+                lambda: computeCurl(dataSet=vectorDataSet, zPlanes=None, grid=grid),
+            )
+            cMax, cMin = getGMaxMin(dataSet=vectorDataSet, field=CURL_MAG)
+
+            measure(
+                "scalarVisualization.visualizeStatic",
+                timestep,
+                lambda: scalarVisualization.visualizeStatic(
+                    dataSet=scalarDataSet,
+                    field=field,
+                    levels=numpy.linspace(zMin, zMax, 15),
+                    showFigure=False,
+                    saveFigure=True,
+                    saveFile=f"{directory}/scalar",
+                    workers=1,
+                    grid=grid,
+                ),
+            )
+            measure(
+                "vectorVisualization.visualize",
+                timestep,
+                lambda: vectorVisualization.visualize(
+                    data=vectorDataSet[0],
+                    gMax=cMax,
+                    gMin=cMin,
+                    showFigure=False,
+                    saveFigure=True,
+                    saveFile=f"{directory}/vector",
+                    grid=grid,
+                ),
+            )
+            pyplot.close("all")
+
+    stages = {}
+    for record in records:
+        stage = stages.setdefault(record["stage"], {"seconds": 0.0, "cells": 0})
+        stage["seconds"] += record["seconds"]
+        stage["cells"] += record["cells"]
+    for name, stage in stages.items():
+        stage["cellsPerSecond"] = stage["cells"] / stage["seconds"]
+        if "Visualization" in name:
+            stage["framesPerSecond"] = timesteps / stage["seconds"]
+
+    return {
+        "grid": {"nx": grid.nx, "ny": grid.ny, "nz": grid.nz},
+        "timesteps": timesteps,
+        "records": records,
+        "stages": stages,
+    }
+
+
+def getCommit() -> str:
+    """
+    Gets the abbreviated hash of the checked out commit (`"unknown"` outside a git repository)
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compareBenchmarks(
+    baseline: dict,
+    current: dict,
+) -> dict:
+    """
+    Compares the stage totals of two pipeline benchmarks (e.g., of two commits)
+
+    Parameters:
+    - baseline - The results of `benchmarkPipeline()` to compare against
+    - current - The results of `benchmarkPipeline()` to be compared
+
+    Returns:
+    - A dictionary that maps each stage of both benchmarks to the ratio of the current time to the baseline time (above 1 is slower)
+    """
+    return {
+        name: stage["seconds"] / baseline["stages"][name]["seconds"]
+        for name, stage in current["stages"].items()
+        if name in baseline["stages"]
+    }
+
+
+if __name__ == "__main__":
+    print("*** Benchmarking derived fields ⏱️")
+    result = benchmarkDerivedFields()
+    print(
+        f"*** *** {result['fields']} fields x {result['rows']} rows | "
+        f"apply: {result['perRowSeconds']:.3f}s | "
+        f"vectorized: {result['vectorizedSeconds']:.4f}s | "
+        f"speedup: {result['speedup']:.0f}x"
+    )
+
+    print("*** Benchmarking batched formulae ⏱️")
+    for name, result in benchmarkFormulae().items():
+        print(
+            f"*** *** {name} | "
+            f"{result['seconds'] * 1000:.2f}ms | "
+            f"{result['valuesPerSecond'] / 1e6:.0f}M values/s | "
+            f"allocated: {result['allocatedMB']:.1f}MB | "
+            f"max relative error: {result['relativeError']:.2e}"
+        )
+
+    print("*** Benchmarking quiver level of detail ⏱️")
+    for mode, result in benchmarkQuiver().items():
+        print(
+            f"*** *** {mode} | "
+            f"factor: {result['factor']} | "
+            f"arrows: {result['arrows']} | "
+            f"render: {result['renderSeconds']:.2f}s | "
+            f"file: {result['fileBytes'] / 1024:.0f}KB"
+        )
+
+    print("*** Benchmarking raster rendering ⏱️")
+    for name, result in benchmarkRasterRender().items():
+        print(
+            f"*** *** {name} | "
+            f"{result['secondsPerFrame'] * 1000:.1f}ms per frame | "
+            f"speedup: {result['speedup']:.1f}x"
+            + (
+                f" | pixels matching contour: {result['matchingPixels']:.1%}"
+                if result["matchingPixels"] != None
+                else ""
+            )
+        )
+
+    print("*** Benchmarking the pipeline ⏱️")
+    results = {"commit": getCommit(), "pipelines": []}
+    for grid in [SLICE_GRID, Grid(nx=SLICE_GRID.nx, ny=SLICE_GRID.ny, nz=4)]:
+        result = benchmarkPipeline(grid=grid)
+        results["pipelines"].append(result)
+        for name, stage in result["stages"].items():
+            print(
+                f"*** *** {grid.nx}x{grid.ny}x{grid.nz} | {name} | "
+                f"{stage['seconds'] / result['timesteps']:.3f}s per timestep | "
+                f"{stage['cellsPerSecond'] / 1e6:.2f}M cells/s"
+                + (
+                    f" | {stage['framesPerSecond']:.2f} frames/s"
+                    if "framesPerSecond" in stage
+                    else ""
+                )
+            )
+
+    # * Results of earlier commits are kept next to each other to be compared
+    os.makedirs("./outputs/benchmarks", exist_ok=True)
+    resultsFile = f"./outputs/benchmarks/pipeline-{results['commit']}.json"
+    with open(resultsFile, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"*** *** Results written to {resultsFile} 💾")
+
+    baselineFile = os.environ.get("BENCHMARK_BASELINE")
+    if baselineFile != None:
+        with open(baselineFile) as baseline:
+            baselines = json.load(baseline)["pipelines"]
+        for before, after in zip(baselines, results["pipelines"]):
+            for name, ratio in compareBenchmarks(
+                baseline=before, current=after
+            ).items():
+                print(f"*** *** {name} | {ratio:.2f}x the time of {baselineFile}")
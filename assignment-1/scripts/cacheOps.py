@@ -0,0 +1,351 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy
+
+
+def getFingerprint(file: str) -> dict:
+    """
+    Gets the fingerprint of a source file which determines whether its cached columns are still valid
+
+    Parameters:
+    - file - Path of the source file
+
+    Returns:
+    - A dictionary with the absolute path, the modification time (ns) and the size (bytes) of the file
+    """
+    stat = os.stat(file)
+
+    return {
+        "path": os.path.abspath(file),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def getCacheEntry(
+    file: str,
+    cacheDir: str = None,
+    variant: str = "",
+) -> str:
+    """
+    Gets the directory in which the columns of a source file are cached
+
+    Parameters:
+    - file - Path of the source file
+    - cacheDir - Directory of the cache (defaults to a `.cache` directory next to the source file)
+    - variant - Distinguishes different extracts of the same source file (e.g., the z-range)
+
+    Returns:
+    - The path of the cache entry directory
+    """
+    path: str = os.path.abspath(file)
+
+    if cacheDir == None:
+        cacheDir = os.path.join(os.path.dirname(path), ".cache")
+
+    key: str = hashlib.sha1(f"{path}|{variant}".encode()).hexdigest()[:16]
+
+    return os.path.join(cacheDir, f"{os.path.basename(path)}.{key}")
+
+
+def readCachedColumns(
+    file: str,
+    columns: list[int],
+    cacheDir: str = None,
+    variant: str = "",
+) -> dict[int, numpy.ndarray]:
+    """
+    Memory maps the cached `columns` of a source file.
+    The cache entry is discarded if the source file has changed since it was written.
+
+    Parameters:
+    - file - Path of the source file
+    - columns - The columns (accessors) to be read
+    - cacheDir - Directory of the cache
+    - variant - Distinguishes different extracts of the same source file
+
+    Returns:
+    - A dictionary that maps each cached column to a read-only memory mapped array (missing columns are left out)
+    """
+    entry: str = getCacheEntry(file=file, cacheDir=cacheDir, variant=variant)
+    metaFile: str = os.path.join(entry, "meta.json")
+
+    if not os.path.isfile(metaFile):
+        return {}
+
+    with open(metaFile) as meta:
+        fingerprint: dict = json.load(meta)["fingerprint"]
+
+    if fingerprint != getFingerprint(file):
+        print("*** *** Source file changed, invalidating cache 🗑️")
+        shutil.rmtree(entry, ignore_errors=True)
+        return {}
+
+    cached: dict[int, numpy.ndarray] = {}
+    for column in columns:
+        columnFile: str = os.path.join(entry, f"{column}.npy")
+        if os.path.isfile(columnFile):
+            cached[column] = numpy.load(columnFile, mmap_mode="r")
+
+    return cached
+
+
+def writeCachedColumns(
+    file: str,
+    columns: dict[int, numpy.ndarray],
+    fingerprint: dict,
+    cacheDir: str = None,
+    variant: str = "",
+):
+    """
+    Writes the `columns` of a source file to the cache as `.npy` files
+
+    Parameters:
+    - file - Path of the source file
+    - columns - A dictionary that maps each column (accessor) to its values
+    - fingerprint - The fingerprint of the source file taken before it was read (see `getFingerprint()`)
+    - cacheDir - Directory of the cache
+    - variant - Distinguishes different extracts of the same source file
+    """
+    entry: str = getCacheEntry(file=file, cacheDir=cacheDir, variant=variant)
+    metaFile: str = os.path.join(entry, "meta.json")
+
+    # * Drop the columns of an older version of the source file
+    if os.path.isfile(metaFile):
+        with open(metaFile) as meta:
+            if json.load(meta)["fingerprint"] != fingerprint:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    os.makedirs(entry, exist_ok=True)
+
+    for column, values in columns.items():
+        # * Write to a temporary file first so that readers never see a partial file
+        columnFile: str = os.path.join(entry, f"{column}.npy")
+        temporaryFile: str = f"{columnFile}.{os.getpid()}.tmp"
+        with open(temporaryFile, "wb") as output:
+            numpy.save(output, numpy.ascontiguousarray(values))
+        os.replace(temporaryFile, columnFile)
+
+    temporaryFile: str = f"{metaFile}.{os.getpid()}.tmp"
+    with open(temporaryFile, "w") as meta:
+        json.dump({"fingerprint": fingerprint, "variant": variant}, meta)
+    os.replace(temporaryFile, metaFile)
+
+
+def readCachedStatistics(
+    file: str,
+    cacheDir: str = None,
+    variant: str = "",
+) -> dict[int, dict]:
+    """
+    Reads the statistics index of a source file from the cache
+
+    Parameters:
+    - file - Path of the source file
+    - cacheDir - Directory of the cache
+    - variant - Distinguishes different extracts of the same source file
+
+    Returns:
+    - A dictionary that maps each column (accessor) to its statistics (empty if the cache entry is missing or outdated)
+    """
+    entry: str = getCacheEntry(file=file, cacheDir=cacheDir, variant=variant)
+    metaFile: str = os.path.join(entry, "meta.json")
+    statisticsFile: str = os.path.join(entry, "statistics.json")
+
+    if not os.path.isfile(metaFile) or not os.path.isfile(statisticsFile):
+        return {}
+
+    with open(metaFile) as meta:
+        if json.load(meta)["fingerprint"] != getFingerprint(file):
+            return {}
+
+    with open(statisticsFile) as statistics:
+        return {int(column): value for column, value in json.load(statistics).items()}
+
+
+def writeCachedStatistics(
+    file: str,
+    statistics: dict[int, dict],
+    cacheDir: str = None,
+    variant: str = "",
+):
+    """
+    Adds the statistics of columns to the statistics index of a source file.
+    Nothing is written unless the cache entry of the source file exists and is up to date.
+
+    Parameters:
+    - file - Path of the source file
+    - statistics - A dictionary that maps each column (accessor) to its statistics
+    - cacheDir - Directory of the cache
+    - variant - Distinguishes different extracts of the same source file
+    """
+    entry: str = getCacheEntry(file=file, cacheDir=cacheDir, variant=variant)
+    metaFile: str = os.path.join(entry, "meta.json")
+    statisticsFile: str = os.path.join(entry, "statistics.json")
+
+    if not os.path.isfile(metaFile):
+        return
+
+    with open(metaFile) as meta:
+        if json.load(meta)["fingerprint"] != getFingerprint(file):
+            return
+
+    index: dict[int, dict] = readCachedStatistics(
+        file=file,
+        cacheDir=cacheDir,
+        variant=variant,
+    )
+    index.update(statistics)
+
+    temporaryFile: str = f"{statisticsFile}.{os.getpid()}.tmp"
+    with open(temporaryFile, "w") as output:
+        json.dump({str(column): value for column, value in index.items()}, output)
+    os.replace(temporaryFile, statisticsFile)
+
+
+# * Size (bytes) above which the least recently used results are evicted
+RESULT_CACHE_BYTES = 4 * 1024**3
+
+# * Hits, misses and evictions of the result cache in this process
+resultCacheCounters: dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def getResultKey(description: dict) -> str:
+    """
+    Gets the key of a computed result in the result cache
+
+    Parameters:
+    - description - A JSON serializable dictionary that determines the result (e.g., the fingerprint of the source file, the field definition and the code version)
+
+    Returns:
+    - The hexadecimal key
+    """
+    return hashlib.sha1(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def getResultCacheDir(
+    file: str,
+    cacheDir: str = None,
+) -> str:
+    """
+    Gets the directory of the result cache that is shared by the source files of a directory
+
+    Parameters:
+    - file - Path of a source file
+    - cacheDir - Directory of the cache (defaults to a `.cache` directory next to the source file)
+
+    Returns:
+    - The path of the result cache directory
+    """
+    if cacheDir == None:
+        cacheDir = os.path.join(os.path.dirname(os.path.abspath(file)), ".cache")
+
+    return os.path.join(cacheDir, "results")
+
+
+def readCachedResult(
+    key: str,
+    resultDir: str,
+) -> tuple[numpy.ndarray, dict]:
+    """
+    Memory maps a computed result and marks it as recently used
+
+    Parameters:
+    - key - The key of the result (see `getResultKey()`)
+    - resultDir - Directory of the result cache (see `getResultCacheDir()`)
+
+    Returns:
+    - A tuple (values, statistics) with the read-only memory mapped values and their statistics, or `None` on a miss
+    """
+    resultFile: str = os.path.join(resultDir, f"{key}.npy")
+    statisticsFile: str = os.path.join(resultDir, f"{key}.json")
+
+    try:
+        with open(statisticsFile) as statistics:
+            result: tuple = (
+                numpy.load(resultFile, mmap_mode="r"),
+                json.load(statistics),
+            )
+        # * The modification time orders the results for the eviction
+        os.utime(resultFile)
+    except (FileNotFoundError, ValueError):
+        resultCacheCounters["misses"] += 1
+        return None
+
+    resultCacheCounters["hits"] += 1
+
+    return result
+
+
+def writeCachedResult(
+    key: str,
+    resultDir: str,
+    values: numpy.ndarray,
+    statistics: dict,
+    maxBytes: int = RESULT_CACHE_BYTES,
+):
+    """
+    Writes a computed result to the result cache and evicts the least recently used results above `maxBytes`
+
+    Parameters:
+    - key - The key of the result (see `getResultKey()`)
+    - resultDir - Directory of the result cache (see `getResultCacheDir()`)
+    - values - The values of the result
+    - statistics - The statistics of the values
+    - maxBytes - Size of the result cache above which results are evicted
+    """
+    os.makedirs(resultDir, exist_ok=True)
+
+    # * The statistics are written last since a result is only read when they exist
+    resultFile: str = os.path.join(resultDir, f"{key}.npy")
+    temporaryFile: str = f"{resultFile}.{os.getpid()}.tmp"
+    with open(temporaryFile, "wb") as output:
+        numpy.save(output, numpy.ascontiguousarray(values))
+    os.replace(temporaryFile, resultFile)
+
+    statisticsFile: str = os.path.join(resultDir, f"{key}.json")
+    temporaryFile = f"{statisticsFile}.{os.getpid()}.tmp"
+    with open(temporaryFile, "w") as output:
+        json.dump(statistics, output)
+    os.replace(temporaryFile, statisticsFile)
+
+    evictCachedResults(resultDir=resultDir, maxBytes=maxBytes)
+
+
+def evictCachedResults(
+    resultDir: str,
+    maxBytes: int = RESULT_CACHE_BYTES,
+):
+    """
+    Removes the least recently used results until the result cache fits in `maxBytes`
+
+    Parameters:
+    - resultDir - Directory of the result cache (see `getResultCacheDir()`)
+    - maxBytes - Size of the result cache to be kept
+    """
+    results: list[tuple[int, int, str]] = []
+    for entry in os.scandir(resultDir):
+        if entry.name.endswith(".npy"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # * Evicted by another process or thread
+                continue
+            results.append((stat.st_mtime_ns, stat.st_size, entry.name[: -len(".npy")]))
+
+    total: int = sum(size for _, size, _ in results)
+
+    for _, size, key in sorted(results):
+        if total <= maxBytes:
+            break
+
+        for extension in [".json", ".npy"]:
+            try:
+                os.remove(os.path.join(resultDir, f"{key}{extension}"))
+            except FileNotFoundError:
+                pass
+
+        total -= size
+        resultCacheCounters["evictions"] += 1
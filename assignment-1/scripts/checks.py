@@ -0,0 +1,314 @@
+import os
+import time
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy
+import pandas
+
+# ! Custom
+from scalarFields import *
+from vectorFields import *
+from dataOps import computeDerivedScalarFields, getStorageArray
+from gridOps import Grid, SLICE_GRID
+from profileOps import getResidentMemory
+import scalarVisualization
+import vectorVisualization
+import combinedVisualization
+from benchmark import generateScalarData
+
+
+def checkPrecision(
+    rows: int = SLICE_GRID.planeCells,
+    fields: list[dict] = [
+        TOTAL_DENSITY,
+        H_NUMBER_DENSITY,
+        H_MINUS_NUMBER_DENSITY,
+        HE_MASS_DENSITY,
+        H2_NUMBER_DENSITY,
+    ],
+    tolerances: dict = {"float32": 1e-6, "float16": 2e-3},
+) -> dict:
+    """
+    Computes the derived fields from columns held in the compact precisions and checks their relative error against the float64 path
+
+    Parameters:
+    - rows - Number of grid cells of the synthetic data set
+    - fields - The derived fields to be compared
+    - tolerances - The allowed maximum relative error of each precision
+
+    Returns:
+    - A dictionary that maps each precision to the memory (MB) of the columns, the number of float16 columns and the maximum relative error
+    """
+    abundances: list[dict] = [
+        H_MASS_ABUNDANCE,
+        H_PLUS_MASS_ABUNDANCE,
+        H_MINUS_MASS_ABUNDANCE,
+        HE_MASS_ABUNDANCE,
+        HE_PLUS_MASS_ABUNDANCE,
+        HE_PLUS_PLUS_MASS_ABUNDANCE,
+        H2_MASS_ABUNDANCE,
+        H2_PLUS_MASS_ABUNDANCE,
+    ]
+    data = generateScalarData(rows=rows)
+
+    # * Abundances below the smallest normal float16 are kept as float32, so they are clipped to exercise the float16 columns
+    for field in abundances:
+        data[field["accessor"]] = data[field["accessor"]].clip(lower=1e-4)
+
+    fieldsByColumn = {field["accessor"]: field for field in abundances}
+    expected = computeDerivedScalarFields(dataSet=[data.copy()], fields=fields)[0]
+
+    results = {}
+    for precision in ["float64", "float32", "float16"]:
+        compact = pandas.DataFrame(
+            {
+                column: getStorageArray(
+                    values=data[column].to_numpy(),
+                    field=fieldsByColumn.get(column),
+                    precision=precision,
+                )
+                for column in data.columns
+            }
+        )
+        memory = float(compact.memory_usage(index=False).sum()) / 2**20
+        halves = int((compact.dtypes == numpy.float16).sum())
+
+        actual = computeDerivedScalarFields(dataSet=[compact], fields=fields)[0]
+
+        error = max(
+            float(
+                numpy.max(
+                    numpy.abs(
+                        actual[field["accessor"]].to_numpy(dtype=numpy.float64)
+                        - expected[field["accessor"]].to_numpy()
+                    )
+                    / numpy.abs(expected[field["accessor"]].to_numpy())
+                )
+            )
+            for field in fields
+        )
+
+        # * A NaN error fails the check too
+        if not error <= tolerances.get(precision, 0.0):
+            raise AssertionError(
+                f"The relative error of the {precision} precision is {error:.2e}"
+            )
+
+        results[precision] = {
+            "memoryMB": memory,
+            "float16Columns": halves,
+            "relativeError": error,
+        }
+
+    return results
+
+
+def sampleResidentMemory(run, interval: float = 0.005) -> float:
+    """
+    Runs a function while a thread samples the current resident memory of this process
+
+    Parameters:
+    - run - The function to be run
+    - interval - Seconds between two samples
+
+    Returns:
+    - The largest resident memory (MB) sampled while the function ran
+    """
+    samples: list[float] = [getResidentMemory()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            samples.append(getResidentMemory())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        run()
+    finally:
+        done.set()
+        sampler.join()
+    samples.append(getResidentMemory())
+
+    return max(samples)
+
+
+def measureRenderMemory(
+    entryPoint: str,
+    frames: int = 40,
+    shape: tuple = (62, 150),
+) -> dict:
+    """
+    Saves the frames of a synthetic data set with a visualize entry point and samples the resident memory.
+    The entry point renders 10 frames to warm matplotlib's caches up and then all the `frames` twice, so that the memory that grows with the number of frames is held by both runs and only a leak tells them apart.
+    It is run by `checkRenderMemory()` in a fresh process, so that the memory of the precision check does not hide its growth.
+
+    Parameters:
+    - entryPoint - `"scalar"`, `"scalar (animated)"`, `"vector"` or `"combined"`
+    - frames - Number of frames to be rendered
+    - shape - Shape (ny, nx) of the synthetic fields
+
+    Returns:
+    - A dictionary with the peak resident memory (MB) of the first and of the second run, and the render time (seconds) of the second run
+    """
+    grid = Grid(nx=shape[1], ny=shape[0])
+    generator = numpy.random.default_rng(0)
+
+    scalarDataSet: list[pandas.DataFrame] = [
+        pandas.DataFrame(
+            {GAS_TEMPERATURE["accessor"]: generator.uniform(10.0, 1e5, grid.planeCells)}
+        )
+        for _ in range(frames)
+    ]
+    vectorDataSet: list[pandas.DataFrame] = []
+    for _ in range(frames):
+        U, V = generator.standard_normal((2, grid.planeCells)) * 1e13
+        vectorDataSet.append(
+            pandas.DataFrame(
+                {
+                    CURL_X["accessor"]: U,
+                    CURL_Y["accessor"]: V,
+                    CURL_MAG["accessor"]: numpy.sqrt(U**2 + V**2),
+                }
+            )
+        )
+
+    def render(count: int, directory: str):
+        if entryPoint in ["scalar", "scalar (animated)"]:
+            scalarVisualization.visualize(
+                dataSet=scalarDataSet[:count],
+                field=GAS_TEMPERATURE,
+                animated=entryPoint == "scalar (animated)",
+                levels=15,
+                showFigure=False,
+                saveFigure=True,
+                saveFile=f"{directory}/frame",
+                fps=24,
+                workers=1,
+                grid=grid,
+            )
+            return
+
+        for index in range(count):
+            if entryPoint == "vector":
+                vectorVisualization.visualize(
+                    data=vectorDataSet[index],
+                    gMax=3e13,
+                    gMin=0.0,
+                    showFigure=False,
+                    saveFigure=True,
+                    saveFile=f"{directory}/frame - {index}",
+                    grid=grid,
+                )
+            else:
+                combinedVisualization.visualize(
+                    scalarData=scalarDataSet[index],
+                    vectorData=vectorDataSet[index],
+                    scalarField=GAS_TEMPERATURE,
+                    zMax=1e5,
+                    zMin=10.0,
+                    cMax=3e13,
+                    cMin=0.0,
+                    contourLevels=15,
+                    showFigure=False,
+                    saveFigure=True,
+                    saveFile=f"{directory}/frame - {index}",
+                    grid=grid,
+                )
+
+    with tempfile.TemporaryDirectory() as directory:
+        render(10, directory)
+        firstPeak = sampleResidentMemory(lambda: render(frames, directory))
+
+        start = time.perf_counter()
+        secondPeak = sampleResidentMemory(lambda: render(frames, directory))
+        renderTime = time.perf_counter() - start
+
+    return {
+        "frames": frames,
+        "firstPeakMB": firstPeak,
+        "secondPeakMB": secondPeak,
+        "renderSeconds": renderTime,
+    }
+
+
+def checkRenderMemory(
+    frames: int = 40,
+    shape: tuple = (62, 150),
+    growthMB: float = 3.0,
+) -> dict:
+    """
+    Renders `frames` frames twice with every visualize entry point, each in its own fresh process, and checks that the second run does not need more resident memory than the first one
+
+    Parameters:
+    - frames - Number of frames rendered with each entry point
+    - shape - Shape (ny, nx) of the synthetic fields
+    - growthMB - Allowed growth of the peak resident memory between the two runs (the noise is below 1MB)
+
+    Returns:
+    - A dictionary that maps each entry point to the results of `measureRenderMemory()`
+    """
+    entryPoints: list[str] = ["scalar", "scalar (animated)", "vector", "combined"]
+
+    # * One single-worker pool per entry point, so that the entry points render side by side without sharing a process
+    executors: list[ProcessPoolExecutor] = [
+        ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        for _ in entryPoints
+    ]
+    try:
+        futures = [
+            executor.submit(
+                measureRenderMemory,
+                entryPoint=entryPoint,
+                frames=frames,
+                shape=shape,
+            )
+            for executor, entryPoint in zip(executors, entryPoints)
+        ]
+
+        results = {}
+        for entryPoint, future in zip(entryPoints, futures):
+            result = future.result()
+
+            if result["secondPeakMB"] > result["firstPeakMB"] + growthMB:
+                raise AssertionError(
+                    f"{entryPoint}: resident memory grew from {result['firstPeakMB']:.1f}MB to {result['secondPeakMB']:.1f}MB when the {frames} frames were rendered again"
+                )
+
+            results[entryPoint] = result
+    finally:
+        for executor in executors:
+            executor.shutdown(cancel_futures=True)
+
+    return results
+
+
+if __name__ == "__main__":
+    # * Every check raises an AssertionError (and fails the script) on a regression
+    # * CHECKS=precision only runs the precision check, which takes a few seconds
+    checks: list[str] = os.environ.get("CHECKS", "precision,memory").split(",")
+
+    if "precision" in checks:
+        print("*** Checking precisions ✅")
+        for precision, result in checkPrecision().items():
+            print(
+                f"*** *** {precision} | "
+                f"columns: {result['memoryMB']:.1f}MB | "
+                f"float16 columns: {result['float16Columns']} | "
+                f"max relative error: {result['relativeError']:.2e}"
+            )
+
+    if "memory" in checks:
+        print("*** Checking render memory ✅")
+        for entryPoint, result in checkRenderMemory().items():
+            print(
+                f"*** *** {entryPoint} | {result['frames']} frames | "
+                f"first peak: {result['firstPeakMB']:.1f}MB | "
+                f"second peak: {result['secondPeakMB']:.1f}MB | "
+                f"{result['frames'] / result['renderSeconds']:.1f} frames/s"
+            )
@@ -2,14 +2,38 @@ import pandas
 import numpy
 from matplotlib import pyplot
 import math
-from dataOps import readDataSet, getGMaxMin, computeCurl, computeDerivedScalarFields
+from dataOps import (
+    processDataSet,
+    getGMaxMin,
+    readStatistics,
+    streamDataSet,
+)
+from cacheOps import resultCacheCounters
+from profileOps import profiled, enableProfiling, reportProfile
 from scalarFields import *
 from vectorFields import *
+from renderOps import (
+    KM_TO_PARSEC,
+    drawContourFill,
+    drawQuiver,
+    getRenderContext,
+    renderCombinedFrame,
+    renderFrames,
+)
+from gridOps import (
+    Grid,
+    GridDataSet,
+    GridFrame,
+    getDataSetGrid,
+    getPlane,
+    toGridDataSet,
+)
 
 
+@profiled("combinedVisualization.visualize")
 def visualize(
-    scalarData: pandas.DataFrame,
-    vectorData: pandas.DataFrame,
+    scalarData: pandas.DataFrame | GridFrame,
+    vectorData: pandas.DataFrame | GridFrame,
     scalarField: dict,
     zMax,
     zMin,
@@ -19,13 +43,16 @@ def visualize(
     showFigure: bool = True,
     saveFigure: bool = True,
     saveFile: str = "combined-output",
+    grid: Grid = None,
+    lodMode: str = "mean",
+    lodFactor: int = None,
 ):
     """
     Creates a quiver plot overlapped on a contour fill plot based on the vectorData and scalarData respectively
 
     Parameters:
-    - scalarData : A pandas.DataFrame to be used for the contour fill plot
-    - vectorData : A pandas.DataFrame to be sued for the quiver plot
+    - scalarData : A pandas.DataFrame or a GridFrame to be used for the contour fill plot
+    - vectorData : A pandas.DataFrame or a GridFrame to be sued for the quiver plot
     - scalarField : The field to be used as the 3rd dimension of the contour fill plot
     - zMax : Maximum value of the scalarField in the scalarData
     - zMin : Minimum value of the scalarField in the scalarData
@@ -35,84 +62,163 @@ def visualize(
     - showFigure - Show the plot in an interactive window
     - saveFigure - Save the figure to a file
     - saveFile - The save file name to be used
+    - grid - The grid of the data when it is a pandas.DataFrame (a GridFrame carries its own grid)
+    - lodMode - How the arrows are reduced to the density the figure can show (`"stride"`, `"mean"` or `"magnitude"`, see `renderOps.reduceQuiver()`)
+    - lodFactor - The downsampling factor of the arrows (`None` chooses it from the size and the DPI of the figure, `1` draws every arrow)
     """
     # * Define the X and Y co-ordinate range
-    X: list[float] = numpy.linspace(0.0, 0.6, 600)
-    Y: list[float] = numpy.linspace(0.0, 0.248, 248)
+    scalarGrid: Grid = getDataSetGrid(dataSet=scalarData, grid=grid)
+    vectorGrid: Grid = getDataSetGrid(dataSet=vectorData, grid=grid)
+    X, Y = scalarGrid.getAxes()
 
     # * Z dimension for (scalar) contour plot
-    Z = numpy.array(scalarData[scalarField["accessor"]]).reshape(len(Y), len(X))
+    Z = getPlane(data=scalarData, field=scalarField, grid=scalarGrid)
 
     # * Determine levels
     levels = numpy.linspace(zMin, zMax, contourLevels)
 
-    # * U, V, C for (vector) quiver plot
-    U = numpy.array(vectorData[CURL_X["accessor"]]).reshape(len(Y), len(X))
-    V = numpy.array(vectorData[CURL_Y["accessor"]]).reshape(len(Y), len(X))
-    C = numpy.array(vectorData[CURL_MAG["accessor"]]).reshape(len(Y), len(X))
-
-    # * Change unit to Parsec
-    U *= 3.2407792700054e-14
-    V *= 3.2407792700054e-14
-    C *= 3.2407792700054e-14
+    # * U, V, C for (vector) quiver plot (in Parsec)
+    U = getPlane(data=vectorData, field=CURL_X, grid=vectorGrid) * KM_TO_PARSEC
+    V = getPlane(data=vectorData, field=CURL_Y, grid=vectorGrid) * KM_TO_PARSEC
+    C = getPlane(data=vectorData, field=CURL_MAG, grid=vectorGrid) * KM_TO_PARSEC
 
     # * Compute the scale and normalize
     scale = None
     norm = None
     if cMax != None and cMin != None:
-        cMax *= 3.2407792700054e-14
-        cMin *= 3.2407792700054e-14
+        cMax *= KM_TO_PARSEC
+        cMin *= KM_TO_PARSEC
         scale = 10 ** (math.floor(math.log10(cMax)) + 2)
         norm = pyplot.Normalize(cMax, cMin)
 
-        # * Define figure
-    pyplot.figure(figsize=(10, 5))
-
-    # * Define axis labels
-    pyplot.xlabel("X | parsec")
-    pyplot.ylabel("Y | parsec")
-
-    # * Set X and Y Ticks
-    pyplot.xticks(numpy.arange(min(X), max(X), 0.06))
-    pyplot.yticks(numpy.arange(min(Y), max(Y), 0.03))
-
-    # * Define title
-    pyplot.title(f"{scalarField['label']} & Curl of Velocity")
+    # * Define figure (figures that are only saved reuse the figure of this process)
+    if showFigure:
+        figure = pyplot.figure(figsize=(10, 5))
+        axes = figure.gca()
+    else:
+        figure, axes = getRenderContext(figsize=(10, 5))
 
     # * Draw Contour Fill plot
-    contourf = pyplot.contourf(
-        X,
-        Y,
-        Z,
-        levels,
-        cmap=scalarField["colorMap"] if "colorMap" in scalarField else "Blues_r",
+    drawContourFill(
+        axes=axes,
+        X=X,
+        Y=Y,
+        Z=Z,
+        field=scalarField,
+        levels=levels,
+        colorMap=scalarField["colorMap"] if "colorMap" in scalarField else "Blues_r",
+        title=f"{scalarField['label']} & Curl of Velocity",
+        colorbarLabel=f"{scalarField['label']} | {scalarField['unit']}",
     )
 
     # * Draw quiver
-    quiver = pyplot.quiver(
-        X,
-        Y,
-        U,
-        V,
-        C,
+    quiver = drawQuiver(
+        axes=axes,
+        X=X,
+        Y=Y,
+        U=U,
+        V=V,
+        C=C,
         norm=norm,
         scale=scale,
-        angles="xy",
-        scale_units="xy",
-        minshaft=1,
-        minlength=0,
+        lodMode=lodMode,
+        lodFactor=lodFactor,
     )
 
     # * Add colorbar
-    pyplot.colorbar(contourf, label=f"{scalarField['label']} | {scalarField['unit']}")
-    pyplot.colorbar(quiver, label="Magnitude of the Curl the velocity | parsec/s")
+    figure.colorbar(
+        quiver, ax=axes, label="Magnitude of the Curl the velocity | parsec/s"
+    )
 
     if showFigure:
         print("*** *** Showing figure 🖥️")
         pyplot.show()
     if saveFigure:
         print("*** *** Saving figure 💾")
-        pyplot.savefig(f"{saveFile}.png")
+        figure.savefig(f"{saveFile}.png")
+    if showFigure:
+        pyplot.close(figure)
+
+
+@profiled("combinedVisualization.visualizeBatch")
+def visualizeBatch(
+    scalarDataSet: list[pandas.DataFrame] | GridDataSet,
+    vectorDataSet: list[pandas.DataFrame] | GridDataSet,
+    scalarField: dict,
+    zMax,
+    zMin,
+    cMax,
+    cMin,
+    saveFiles: list[str],
+    contourLevels=5,
+    workers: int = None,
+    grid: Grid = None,
+    lodMode: str = "mean",
+    lodFactor: int = None,
+):
+    """
+    Saves a quiver plot overlapped on a contour fill plot for every timestep, rendering the frames in parallel.
+    The levels, the normalization and the scale are computed once and shared with every worker.
+
+    Parameters:
+    - scalarDataSet : A list of pandas.DataFrame or a GridDataSet to be used for the contour fill plots
+    - vectorDataSet : A list of pandas.DataFrame or a GridDataSet to be used for the quiver plots
+    - scalarField : The field to be used as the 3rd dimension of the contour fill plot
+    - zMax : Maximum value of the scalarField in the scalarDataSet
+    - zMin : Minimum value of the scalarField in the scalarDataSet
+    - cMax : Maximum value of the magnitude of the curl in the vectorDataSet
+    - cMin : Minimum value of the magnitude of the curl in the vectorDataSet
+    - saveFiles : The save file name of each timestep (without extension)
+    - contourLevels - Number of levels of contour
+    - workers - Number of worker processes (`None` uses all the CPUs)
+    - grid - The grid of the data sets when they are lists of pandas.DataFrame (a GridDataSet carries its own grid)
+    - lodMode - How the arrows are reduced to the density the figure can show (`"stride"`, `"mean"` or `"magnitude"`, see `renderOps.reduceQuiver()`)
+    - lodFactor - The downsampling factor of the arrows (`None` chooses it from the size and the DPI of the figure, `1` draws every arrow)
+    """
+    # * Define the X and Y co-ordinate range
+    scalarGrid: Grid = getDataSetGrid(dataSet=scalarDataSet, grid=grid)
+    vectorGrid: Grid = getDataSetGrid(dataSet=vectorDataSet, grid=grid)
+    X, Y = scalarGrid.getAxes()
+
+    # * Determine levels
+    levels = numpy.linspace(zMin, zMax, contourLevels)
+
+    # * Compute the scale and normalize
+    scale = None
+    norm = None
+    if cMax != None and cMin != None:
+        scale = 10 ** (math.floor(math.log10(cMax * KM_TO_PARSEC)) + 2)
+        norm = pyplot.Normalize(cMax * KM_TO_PARSEC, cMin * KM_TO_PARSEC)
+
+    print(f"*** *** Rendering {len(saveFiles)} figures in parallel 💾")
+    renderFrames(
+        renderer=renderCombinedFrame,
+        frames=[
+            {
+                "saveFile": f"{saveFile}.png",
+                "Z": getPlane(data=scalarData, field=scalarField, grid=scalarGrid),
+                # * Change unit to Parsec
+                "U": getPlane(data=vectorData, field=CURL_X, grid=vectorGrid)
+                * KM_TO_PARSEC,
+                "V": getPlane(data=vectorData, field=CURL_Y, grid=vectorGrid)
+                * KM_TO_PARSEC,
+                "C": getPlane(data=vectorData, field=CURL_MAG, grid=vectorGrid)
+                * KM_TO_PARSEC,
+            }
+            for scalarData, vectorData, saveFile in zip(
+                scalarDataSet, vectorDataSet, saveFiles
+            )
+        ],
+        workers=workers,
+        X=X,
+        Y=Y,
+        field=scalarField,
+        levels=levels,
+        norm=norm,
+        scale=scale,
+        lodMode=lodMode,
+        lodFactor=lodFactor,
+    )
 
 
 if __name__ == "__main__":
@@ -124,27 +230,56 @@ if __name__ == "__main__":
     scalarPath: str = "./data/extracted/scalar"
     vectorPath: str = "./data/extracted/vector"
 
+    # * Read the z-planes straight from the gzipped data volumes (the same cache entries makeZSlices.py writes) instead of the extracted z-slices
+    # * The curl needs the next z-plane as well
+    volumes: bool = False
+    scalarZRange: range = range(125, 126) if volumes else None
+    vectorZRange: range = range(125, 127) if volumes else None
+
+    # * Number of worker processes that render the figures (`None` uses all the CPUs)
+    workers: int = None
+
+    # * Whether the stages are timed and reported at the end of the run (PIPELINE_PROFILE=1 also turns it on)
+    profile: bool = False
+    if profile:
+        enableProfiling()
+
+    # * How the arrows are reduced to the density the figure can show ("stride", "mean" or "magnitude")
+    lodMode: str = "mean"
+
     scalarFiles: list[str] = [
-        rf"{scalarPath}/multifield.{'{:04d}'.format(timestep)}.zslice.txt"
+        (
+            rf"./data/multifield.{'{:04d}'.format(timestep)}.txt.gz"
+            if volumes
+            else rf"{scalarPath}/multifield.{'{:04d}'.format(timestep)}.zslice.txt"
+        )
         for timestep in timestepRange
     ]
 
     vectorFiles: list[str] = [
-        rf"{vectorPath}/velocity.{'{:04d}'.format(timestep)}.zslice.txt"
+        (
+            rf"./data/vector.{'{:04d}'.format(timestep)}.txt.gz"
+            if volumes
+            else rf"{vectorPath}/velocity.{'{:04d}'.format(timestep)}.zslice.txt"
+        )
         for timestep in timestepRange
     ]
 
-    print("*** Reading vector data set 🗃️")
-    vectorDataSet: list[pandas.DataFrame] = readDataSet(
+    print("*** Reading and processing vector data set ⛓️")
+    vectorDataSet: list[pandas.DataFrame] = processDataSet(
         files=vectorFiles,
         fields=[
             I_COMPONENT,
             J_COMPONENT,
             K_COMPONENT,
         ],
+        curl=True,
+        workers=workers,
+        zRange=vectorZRange,
     )
-    print("*** Processing data ⛓️")
-    vectorDataSet = computeCurl(dataSet=vectorDataSet)
+
+    # * Hold the curl as one (t, z, y, x) array per field
+    vectorDataSet: GridDataSet = toGridDataSet(dataSet=vectorDataSet)
     cMax, cMin = getGMaxMin(dataSet=vectorDataSet, field=CURL_MAG)
 
     scalarFieldList = [
@@ -160,53 +295,66 @@ if __name__ == "__main__":
     # scalarField = H_MINUS_NUMBER_DENSITY
     # scalarField = H_PLUS_NUMBER_DENSITY
 
-    for scalarField in scalarFieldList:
-        print()
-        print(f"Field - {scalarField['label']}")
-        scalarDataSet: list[pandas.DataFrame] = None
-        print("*** Reading scalar multifield data set 🗃️")
-        if scalarField["fieldType"] == "given":
-            scalarDataSet = readDataSet(
-                files=scalarFiles,
-                fields=[scalarField],
-            )
-        elif scalarField["fieldType"] == "derived":
-            scalarDataSet = readDataSet(
-                files=scalarFiles,
-                fields=[
-                    TOTAL_PARTICLE_DENSITY,
-                    H_MASS_ABUNDANCE,
-                    H_PLUS_MASS_ABUNDANCE,
-                    H_MINUS_MASS_ABUNDANCE,
-                    HE_MASS_ABUNDANCE,
-                    HE_PLUS_MASS_ABUNDANCE,
-                    HE_PLUS_PLUS_MASS_ABUNDANCE,
-                    H2_MASS_ABUNDANCE,
-                    H2_PLUS_MASS_ABUNDANCE,
-                ],
-            )
-            print("*** Processing data ⛓️")
-            scalarDataSet = computeDerivedScalarFields(
-                dataSet=scalarDataSet,
-                fields=[scalarField],
-            )
-        else:
-            exit(0)
+    # * Number of timesteps of the scalar data set held in memory at a time (`None` uses one per worker)
+    window: int = None
 
-        # * Get global max & min of the field in the data set
-        zMax, zMin = getGMaxMin(dataSet=scalarDataSet, field=scalarField)
+    # * Type in which the scalar columns are held in memory ("float64", "float32" or "float16")
+    precision: str = "float64"
+
+    # * Number of windows read ahead on a background thread while a window is rendered
+    lookahead: int = 1
+
+    # * Get global max & min of every field from the statistics index
+    print("*** Indexing scalar multifield data set 📇")
+    statisticsSet: list[pandas.DataFrame] = readStatistics(
+        files=scalarFiles,
+        fields=scalarFieldList,
+        window=window,
+        workers=workers,
+        zRange=scalarZRange,
+    )
+    ranges: dict[int, tuple] = {
+        scalarField["accessor"]: getGMaxMin(dataSet=statisticsSet, field=scalarField)
+        for scalarField in scalarFieldList
+    }
 
-        for iter, timestep in enumerate(timestepRange):
-            visualize(
-                scalarData=scalarDataSet[iter],
-                vectorData=vectorDataSet[iter],
+    # * Every field is derived from the same columns, which are read once per timestep
+    print("*** Reading scalar multifield data set 🗃️")
+    for start, scalarDataSet in streamDataSet(
+        files=scalarFiles,
+        fields=scalarFieldList,
+        window=window,
+        workers=workers,
+        precision=precision,
+        lookahead=lookahead,
+        zRange=scalarZRange,
+    ):
+        timesteps = timestepRange[start : start + len(scalarDataSet)]
+
+        for scalarField in scalarFieldList:
+            print()
+            print(f"Field - {scalarField['label']}")
+            zMax, zMin = ranges[scalarField["accessor"]]
+
+            visualizeBatch(
+                scalarDataSet=scalarDataSet,
+                vectorDataSet=vectorDataSet[start : start + len(scalarDataSet)],
                 zMax=zMax,
                 zMin=zMin,
                 cMax=cMax,
                 cMin=cMin,
                 scalarField=scalarField,
                 contourLevels=15,
-                showFigure=False,
-                saveFigure=True,
-                saveFile=f"{scalarField['label']} x Curl of Velocity - {timestep}",
+                saveFiles=[
+                    f"{scalarField['label']} x Curl of Velocity - {timestep}"
+                    for timestep in timesteps
+                ],
+                workers=workers,
+                lodMode=lodMode,
             )
+
+    print(
+        f"*** Result cache: {resultCacheCounters['hits']} hits, {resultCacheCounters['misses']} misses ♻️"
+    )
+
+    reportProfile()
@@ -1,21 +1,336 @@
+import io
+import os
+import gzip
+import shutil
+import tempfile
 import pandas
 import numpy
 import math
+import time
+import hashlib
+import functools
+import multiprocessing
+from dataclasses import asdict
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from scalarFields import *
 from vectorFields import *
 import formulae
+from gridOps import Grid, SLICE_GRID
+from profileOps import profiled, profileTimestep, profileRecords
+from cacheOps import (
+    getFingerprint,
+    readCachedColumns,
+    writeCachedColumns,
+    readCachedStatistics,
+    writeCachedStatistics,
+    resultCacheCounters,
+    getResultKey,
+    getResultCacheDir,
+    readCachedResult,
+    writeCachedResult,
+)
 
+# * Number of bins of the histogram in the statistics index
+STATISTICS_BINS = 64
 
+# * Precisions in which the columns can be held in memory
+PRECISIONS = ["float64", "float32", "float16"]
+
+# * Number of timesteps read ahead by the prefetching loaders
+LOOKAHEAD = 2
+
+# * Items loaded by the prefetching loaders and the time (seconds) spent waiting for them in this process
+prefetchCounters: dict[str, float] = {"items": 0, "stalls": 0, "stallSeconds": 0.0}
+
+# * Version of the computations whose results are cached (bump it when a derived field or the curl is computed differently)
+RESULT_VERSION = 1
+
+
+def parseDataFile(
+    file: str,
+    columns: list[int],
+) -> pandas.DataFrame:
+    """
+    Parses the `columns` of a whitespace separated data file
+
+    Parameters:
+    - file - Path (or binary file object) of the file to be read
+    - columns - The columns (accessors) to be read (`None` reads all the columns)
+
+    Returns:
+    - A pandas.DataFrame with the columns of the file
+    """
+    return pandas.read_csv(
+        file,
+        sep=r"\s+",
+        header=None,
+        usecols=columns,
+        lineterminator="\n",
+        dtype=numpy.float64,
+    )
+
+
+def readLines(
+    stream,
+    start: int,
+    count: int,
+) -> bytes:
+    """
+    Reads `count` lines after skipping the first `start` lines of a binary stream.
+    The stream is read in chunks and reading stops as soon as the last requested line has been read.
+
+    Parameters:
+    - stream - A binary file object (e.g., an opened `.gz` file)
+    - start - Number of lines to be skipped
+    - count - Number of lines to be read
+
+    Returns:
+    - The requested lines
+    """
+    chunkSize: int = 1 << 22
+
+    # * Skip the lines before the first requested line by counting new lines in each chunk
+    remainder: bytes = b""
+    skipped: int = 0
+    while skipped < start:
+        chunk: bytes = stream.read(chunkSize)
+        if not chunk:
+            raise ValueError(
+                f"Expected at least {start + count} lines but got {skipped}"
+            )
+
+        newLines: int = chunk.count(b"\n")
+        if skipped + newLines < start:
+            skipped += newLines
+            continue
+
+        position: int = -1
+        for _ in range(start - skipped):
+            position = chunk.index(b"\n", position + 1)
+
+        remainder = chunk[position + 1 :]
+        skipped = start
+
+    # * Read chunks until the requested lines are available
+    chunks: list[bytes] = [remainder]
+    lines: int = remainder.count(b"\n")
+    while lines < count:
+        chunk: bytes = stream.read(chunkSize)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        lines += chunk.count(b"\n")
+
+    requested: list[bytes] = b"".join(chunks).split(b"\n", count)[:count]
+    if len(requested) < count or requested[-1] == b"":
+        raise ValueError(f"Expected at least {start + count} lines")
+
+    return b"\n".join(requested) + b"\n"
+
+
+def getZRangeVariant(zRange: range) -> str:
+    """
+    Gets the cache variant of an extract of the z-planes in `zRange`
+    """
+    if isinstance(zRange, int):
+        zRange = range(zRange, zRange + 1)
+
+    return f"z{zRange.start}-{zRange.stop - 1}"
+
+
+def extractZSlice(
+    file: str,
+    columns: list[int],
+    zRange: range,
+    cacheDir: str = None,
+    grid: Grid = SLICE_GRID,
+) -> dict[int, numpy.ndarray]:
+    """
+    Extracts the z-planes in `zRange` from a gzipped data volume and writes the `columns` to the cache.
+    The volume is decompressed as a stream which stops as soon as the last requested plane has been read.
+
+    Parameters:
+    - file - Path of the gzipped data volume (e.g., multifield.0001.txt.gz)
+    - columns - The columns (accessors) to be extracted
+    - zRange - The z-planes to be extracted (a `range` or a single z index)
+    - cacheDir - Directory of the cache (defaults to a `.cache` directory next to the file)
+    - grid - The grid of the data volume (only the size of a z-plane is used)
+
+    Returns:
+    - A dictionary that maps each column to its values
+    """
+    if isinstance(zRange, int):
+        zRange = range(zRange, zRange + 1)
+
+    if zRange.step != 1 or len(zRange) == 0:
+        raise ValueError(f"Expected a contiguous z-range but got {zRange}")
+
+    print(f"*** *** Extracting z-planes {zRange.start}-{zRange.stop - 1} of {file} 🗜️")
+    fingerprint: dict = getFingerprint(file)
+
+    with gzip.open(file, "rb") as stream:
+        lines: bytes = readLines(
+            stream=stream,
+            start=zRange.start * grid.planeCells,
+            count=len(zRange) * grid.planeCells,
+        )
+
+    extracted: dict[int, numpy.ndarray] = {
+        column: values.to_numpy()
+        for column, values in parseDataFile(
+            file=io.BytesIO(lines),
+            columns=columns,
+        ).items()
+    }
+
+    writeCachedColumns(
+        file=file,
+        columns=extracted,
+        fingerprint=fingerprint,
+        cacheDir=cacheDir,
+        variant=getZRangeVariant(zRange),
+    )
+
+    return extracted
+
+
+def extractZSlices(
+    files: list[str],
+    fields: list[dict],
+    zRange: range,
+    cacheDir: str = None,
+    workers: int = None,
+    grid: Grid = SLICE_GRID,
+):
+    """
+    Extracts the z-planes in `zRange` from the gzipped data volumes in parallel and writes the `fields` to the cache.
+    Volumes for which all the fields are already cached are skipped.
+
+    Parameters:
+    - files - List of gzipped data volumes (paths)
+    - fields - List of dictionaries that describe the fields to be extracted
+    - zRange - The z-planes to be extracted (a `range` or a single z index)
+    - cacheDir - Directory of the cache (defaults to a `.cache` directory next to each file)
+    - workers - Number of worker processes (defaults to the number of CPUs)
+    - grid - The grid of the data volumes (only the size of a z-plane is used)
+    """
+    columns: list[int] = [field["accessor"] for field in fields]
+
+    pending: list[str] = [
+        file
+        for file in files
+        if len(
+            readCachedColumns(
+                file=file,
+                columns=columns,
+                cacheDir=cacheDir,
+                variant=getZRangeVariant(zRange),
+            )
+        )
+        < len(set(columns))
+    ]
+
+    if len(pending) == 0:
+        return
+
+    if workers == 1:
+        for file in pending:
+            extractZSlice(
+                file=file,
+                columns=columns,
+                zRange=zRange,
+                cacheDir=cacheDir,
+                grid=grid,
+            )
+        return
+
+    # * Forked workers could inherit a lock held by a prefetch thread, so they are started from a fork server
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        futures = [
+            executor.submit(
+                extractZSlice,
+                file=file,
+                columns=columns,
+                zRange=zRange,
+                cacheDir=cacheDir,
+                grid=grid,
+            )
+            for file in pending
+        ]
+
+        for future in futures:
+            # * Only wait for the extract (and re-raise its errors), the columns are read back from the cache
+            future.result()
+
+
+def getStorageArray(
+    values: numpy.ndarray,
+    field: dict = None,
+    precision: str = "float64",
+) -> numpy.ndarray:
+    """
+    Converts a column to the type in which it is held in memory.
+    In the float16 precision only the fields with a float16 `compactType` (the mass abundances) are halved, and only if every non-zero value is a normal float16. The other columns are kept as float32.
+
+    Parameters:
+    - values - The values of the column
+    - field - A dictionary that represents the field of the column
+    - precision - One of `PRECISIONS`
+
+    Returns:
+    - The values in the storage type (the same array if it already has that type)
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+
+    if precision == "float64":
+        return values
+
+    if (
+        precision == "float16"
+        and field != None
+        and field.get("compactType") == "float16"
+    ):
+        magnitudes: numpy.ndarray = numpy.abs(values[values != 0])
+        limits = numpy.finfo(numpy.float16)
+
+        if magnitudes.size == 0 or (
+            magnitudes.min() >= limits.smallest_normal
+            and magnitudes.max() <= limits.max
+        ):
+            return values.astype(numpy.float16)
+
+    return values.astype(numpy.float32, copy=False)
+
+
+@profiled("readDataSet")
 def readDataSet(
     files: list[str],
     fields: list[dict],
+    useCache: bool = True,
+    cacheDir: str = None,
+    zRange: range = None,
+    workers: int = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
 ) -> list[pandas.DataFrame]:
     """
     Reads the `fields` from the `files` passed in as the argument and returns a list of `pandas.DataFrame`.
+    The parsed columns are cached as `.npy` files and memory mapped on later reads until the source file changes.
 
     Parameters:
     - files : List of files (paths) to be read
     - fields : List of dictionaries that describe the fields to be read. The dictionary is expected to have the 'accessor' key which represents the column index of the field
+    - useCache : Whether the binary column cache must be used (the cache is skipped when `fields` is `None`)
+    - cacheDir : Directory of the cache (defaults to a `.cache` directory next to each file)
+    - zRange : The z-planes to be extracted when the `files` are gzipped data volumes (e.g., multifield.0001.txt.gz) instead of z-slices. The extracts are always cached.
+    - workers : Number of worker processes used to extract the z-planes
+    - precision : Type in which the columns are held in memory (`"float64"`, `"float32"` or `"float16"`, see `getStorageArray()`). The cache always keeps float64.
+    - grid : The grid of the data volumes from which the z-planes are extracted
 
     Returns:
     - List of `pandas.DataFrame` that represent each data set file
@@ -28,24 +343,208 @@ def readDataSet(
     # * List of DataFrames representing each data file
     dataSet: list[pandas.DataFrame] = []
 
+    if zRange != None:
+        extractZSlices(
+            files=files,
+            fields=fields,
+            zRange=zRange,
+            cacheDir=cacheDir,
+            workers=workers,
+            grid=grid,
+        )
+
+    # * Fields of the columns to be read
+    fieldsByColumn: dict[int, dict] = (
+        {field["accessor"]: field for field in fields} if fields != None else {}
+    )
+
     # * Columns to be read
     fields = [field["accessor"] for field in fields] if fields != None else None
 
     for file in files:
-        data: pandas.DataFrame = pandas.read_csv(
-            file,
-            delim_whitespace=True,
-            header=None,
-            usecols=fields,
-            lineterminator="\n",
-            dtype=numpy.float64,
+        if zRange == None and (not useCache or fields == None):
+            data: pandas.DataFrame = parseDataFile(file=file, columns=fields)
+
+            # * The statistics are computed before the columns are converted, so they stay exact
+            statistics: dict[int, dict] = {
+                column: computeStatistics(data[column].to_numpy())
+                for column in data.columns
+            }
+            if precision != "float64":
+                data = pandas.DataFrame(
+                    {
+                        column: getStorageArray(
+                            values=data[column].to_numpy(),
+                            field=fieldsByColumn.get(column),
+                            precision=precision,
+                        )
+                        for column in data.columns
+                    }
+                )
+            data.attrs["statistics"] = statistics
+            dataSet.append(data)
+            continue
+
+        columns: dict[int, numpy.ndarray] = readCachedColumns(
+            file=file,
+            columns=fields,
+            cacheDir=cacheDir,
+            variant=getZRangeVariant(zRange) if zRange != None else "",
+        )
+
+        missing: list[int] = [field for field in fields if field not in columns]
+        if len(missing) > 0 and zRange != None:
+            # * The volume changed after it was extracted
+            columns.update(
+                extractZSlice(
+                    file=file,
+                    columns=missing,
+                    zRange=zRange,
+                    cacheDir=cacheDir,
+                    grid=grid,
+                )
+            )
+        elif len(missing) > 0:
+            print(f"*** *** Parsing {file} 📃")
+            fingerprint: dict = getFingerprint(file)
+            parsed: dict[int, numpy.ndarray] = {
+                column: values.to_numpy()
+                for column, values in parseDataFile(
+                    file=file,
+                    columns=missing,
+                ).items()
+            }
+            writeCachedColumns(
+                file=file,
+                columns=parsed,
+                fingerprint=fingerprint,
+                cacheDir=cacheDir,
+            )
+            columns.update(parsed)
+
+        # * Columns are kept in the file order like `pandas.read_csv()` does
+        data: pandas.DataFrame = pandas.DataFrame(
+            {
+                column: getStorageArray(
+                    values=columns[column],
+                    field=fieldsByColumn[column],
+                    precision=precision,
+                )
+                for column in sorted(set(fields))
+            }
         )
 
+        # * Statistics index of the columns (computed once per file from the float64 columns and kept next to the cached columns)
+        variant: str = getZRangeVariant(zRange) if zRange != None else ""
+        statistics: dict[int, dict] = readCachedStatistics(
+            file=file,
+            cacheDir=cacheDir,
+            variant=variant,
+        )
+        computed: dict[int, dict] = {
+            column: computeStatistics(columns[column])
+            for column in data.columns
+            if column not in statistics
+        }
+        if len(computed) > 0:
+            writeCachedStatistics(
+                file=file,
+                statistics=computed,
+                cacheDir=cacheDir,
+                variant=variant,
+            )
+            statistics.update(computed)
+
+        data.attrs["statistics"] = {
+            column: statistics[column] for column in data.columns
+        }
+
         dataSet.append(data)
 
     return dataSet
 
 
+def computeStatistics(values: numpy.ndarray) -> dict:
+    """
+    Computes the statistics of a column that are kept in the statistics index
+
+    Parameters:
+    - values - The values of the column
+
+    Returns:
+    - A dictionary with the count, min, max, mean, NaN count, log10 range of the positive values, a fixed-bin histogram between min and max and a fixed-bin histogram of the log10 of the positive values
+    """
+    values = numpy.asarray(values)
+    nan = numpy.isnan(values)
+    nanCount: int = int(nan.sum())
+    finite: numpy.ndarray = values[~nan] if nanCount > 0 else values
+
+    if finite.size == 0:
+        return {
+            "count": 0,
+            "min": None,
+            "max": None,
+            "mean": None,
+            "nanCount": nanCount,
+            "logMin": None,
+            "logMax": None,
+            "positiveCount": 0,
+            "histogram": [],
+            "logHistogram": [],
+        }
+
+    lMin: float = float(finite.min())
+    lMax: float = float(finite.max())
+    positive: numpy.ndarray = finite[finite > 0]
+
+    # * Histograms of fixed bins between the minimum and maximum (linear and log10 of the positive values)
+    histogram, _ = numpy.histogram(finite, bins=STATISTICS_BINS, range=(lMin, lMax))
+    logMin, logMax, logHistogram = None, None, []
+    if positive.size > 0:
+        logValues: numpy.ndarray = numpy.log10(positive, dtype=numpy.float64)
+        logMin, logMax = float(logValues.min()), float(logValues.max())
+        logHistogram = numpy.histogram(
+            logValues, bins=STATISTICS_BINS, range=(logMin, logMax)
+        )[0].tolist()
+
+    return {
+        "count": int(finite.size),
+        "min": lMin,
+        "max": lMax,
+        "mean": float(finite.mean(dtype=numpy.float64)),
+        "nanCount": nanCount,
+        "logMin": logMin,
+        "logMax": logMax,
+        "positiveCount": int(positive.size),
+        "histogram": histogram.tolist(),
+        "logHistogram": logHistogram,
+    }
+
+
+def getStatistics(
+    data: pandas.DataFrame,
+    field: dict,
+) -> dict:
+    """
+    Gets the statistics of a field from the statistics index of the data, computing them if they are missing
+
+    Parameters:
+    - data - A pandas.DataFrame (or a `gridOps.GridFrame`) that represents one data set file
+    - field - A dictionary that represents the field
+
+    Returns:
+    - The statistics of the field (see `computeStatistics()`)
+    """
+    statistics: dict = data.attrs.setdefault("statistics", {})
+
+    if field["accessor"] not in statistics:
+        statistics[field["accessor"]] = computeStatistics(
+            numpy.asarray(data[field["accessor"]])
+        )
+
+    return statistics[field["accessor"]]
+
+
 def getLMaxMin(
     data: pandas.DataFrame,
     field: dict,
@@ -60,9 +559,15 @@ def getLMaxMin(
     Returns:
     - A tuple (max, min)
     """
-    return (data[field["accessor"]].max(), data[field["accessor"]].min())
+    statistics: dict = getStatistics(data=data, field=field)
 
+    if statistics["count"] == 0:
+        return (math.nan, math.nan)
 
+    return (statistics["max"], statistics["min"])
+
+
+@profiled("getGMaxMin")
 def getGMaxMin(
     dataSet: list[pandas.DataFrame],
     field: dict,
@@ -96,8 +601,339 @@ def getGMaxMin(
         return None
 
 
+def getGlobalStatistics(
+    dataSet: list[pandas.DataFrame],
+    field: dict,
+) -> dict:
+    """
+    Combines the statistics index of every data set file into the statistics of a field in the entire data set
+
+    Parameters:
+    - dataSet - A list of pandas.DataFrame that represents the entire data set
+    - field - A dictionary that represents the field
+
+    Returns:
+    - A dictionary with the count, min, max, mean, NaN count and log10 range of the positive values of the field
+    """
+    statistics: list[dict] = [getStatistics(data=data, field=field) for data in dataSet]
+    nanCount: int = sum(local["nanCount"] for local in statistics)
+    statistics = [local for local in statistics if local["count"] > 0]
+    logMins: list[float] = [
+        local["logMin"] for local in statistics if local["logMin"] != None
+    ]
+    logMaxs: list[float] = [
+        local["logMax"] for local in statistics if local["logMax"] != None
+    ]
+    count: int = sum(local["count"] for local in statistics)
+
+    return {
+        "count": count,
+        "min": min(local["min"] for local in statistics) if count > 0 else None,
+        "max": max(local["max"] for local in statistics) if count > 0 else None,
+        "mean": (
+            sum(local["mean"] * local["count"] for local in statistics) / count
+            if count > 0
+            else None
+        ),
+        "nanCount": nanCount,
+        "logMin": min(logMins) if len(logMins) > 0 else None,
+        "logMax": max(logMaxs) if len(logMaxs) > 0 else None,
+    }
+
+
+def getQuantileLevels(
+    dataSet: list[pandas.DataFrame],
+    field: dict,
+    levels: int,
+) -> numpy.ndarray:
+    """
+    Gets contour levels that split the values of a field in the entire data set into bins of (approximately) equal counts.
+    The quantiles are estimated from the histograms in the statistics index, so the data is not scanned again.
+    The log10 histograms are used when all the values are positive.
+
+    Parameters:
+    - dataSet - A list of pandas.DataFrame that represents the entire data set
+    - field - A dictionary that represents the field
+    - levels - Number of levels
+
+    Returns:
+    - The increasing levels, from the global minimum to the global maximum (duplicates are dropped)
+    """
+    statistics: list[dict] = [getStatistics(data=data, field=field) for data in dataSet]
+    statistics = [local for local in statistics if local["count"] > 0]
+
+    if len(statistics) == 0:
+        return numpy.array([])
+
+    logarithmic: bool = all(
+        local["positiveCount"] == local["count"] for local in statistics
+    )
+    lower: str = "logMin" if logarithmic else "min"
+    upper: str = "logMax" if logarithmic else "max"
+    histogram: str = "logHistogram" if logarithmic else "histogram"
+
+    # * Edges of the histogram of each timestep and the cumulative counts at the edges
+    edges: list[numpy.ndarray] = [
+        numpy.linspace(local[lower], local[upper], len(local[histogram]) + 1)
+        for local in statistics
+    ]
+    cumulative: list[numpy.ndarray] = [
+        numpy.concatenate([[0], numpy.cumsum(local[histogram])]) for local in statistics
+    ]
+
+    # * Global cumulative distribution, assuming the values are uniform within each bin
+    grid: numpy.ndarray = numpy.unique(numpy.concatenate(edges))
+    distribution: numpy.ndarray = sum(
+        numpy.interp(grid, edge, counts) for edge, counts in zip(edges, cumulative)
+    )
+    distribution = distribution / distribution[-1]
+
+    quantiles: numpy.ndarray = numpy.interp(
+        numpy.linspace(0.0, 1.0, levels), distribution, grid
+    )
+    if logarithmic:
+        quantiles = 10**quantiles
+
+    gMax, gMin = getGMaxMin(dataSet=dataSet, field=field)
+    quantiles[0] = gMin
+    quantiles[-1] = gMax
+
+    return numpy.unique(quantiles)
+
+
+def getNumberDensityFormula(field: dict):
+    """
+    Gets the formula that computes the number density `field` from its mass abundance
+
+    Parameters:
+    - field - A dictionary that represents a number density field
+
+    Returns:
+    - The formula from `formulae` (`None` if the field is not a known number density)
+    """
+    if (
+        field == H_NUMBER_DENSITY
+        or field == H_PLUS_NUMBER_DENSITY
+        or field == H_MINUS_NUMBER_DENSITY
+    ):
+        return formulae.getHNumberDensity
+    elif (
+        field == HE_NUMBER_DENSITY
+        or field == HE_PLUS_NUMBER_DENSITY
+        or field == HE_PLUS_PLUS_NUMBER_DENSITY
+    ):
+        return formulae.getHeNumberDensity
+    elif field == H2_NUMBER_DENSITY or field == H2_PLUS_NUMBER_DENSITY:
+        return formulae.getH2NumberDensity
+
+    return None
+
+
+def getAtomicMass(field: dict) -> int:
+    """
+    Gets the atomic mass of the species of a number or mass density field
+
+    Parameters:
+    - field - A dictionary that represents a number or mass density field
+
+    Returns:
+    - The atomic mass in units of the mass of hydrogen for a number density, `None` for a mass density
+    """
+    if field.get("type") == "mass_density":
+        return None
+
+    formula = getNumberDensityFormula(field)
+
+    if formula == None:
+        raise ValueError(f"No formula computes {field['label']}")
+
+    return formulae.ATOMIC_MASSES[formula]
+
+
+def getFieldDependencies(field: dict) -> list[dict]:
+    """
+    Gets the fields from which `field` is computed
+
+    Parameters:
+    - field - A dictionary that represents a scalar field
+
+    Returns:
+    - The fields on which `field` directly depends (empty for a given field)
+    """
+    if field["fieldType"] == "given":
+        return []
+    elif "dependencies" in field:
+        return field["dependencies"]
+    elif "dependentColumn" in field:
+        return [field["dependentColumn"], TOTAL_DENSITY]
+
+    raise ValueError(f"The dependencies of {field['label']} are unknown")
+
+
+def resolveFields(fields: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Resolves the requested fields into the given fields that must be read and the derived fields that must be computed
+
+    Parameters:
+    - fields - The requested fields
+
+    Returns:
+    - A tuple (sourceFields, derivedFields) where the derived fields are in the order in which they can be computed
+    """
+    sourceFields: list[dict] = []
+    derivedFields: list[dict] = []
+    visited: set[int] = set()
+
+    def visit(field: dict):
+        if field["accessor"] in visited:
+            return
+        visited.add(field["accessor"])
+
+        for dependency in getFieldDependencies(field):
+            visit(dependency)
+
+        if field["fieldType"] == "given":
+            sourceFields.append(field)
+        else:
+            derivedFields.append(field)
+
+    for field in fields:
+        visit(field)
+
+    sourceFields.sort(key=lambda field: field["accessor"])
+
+    return (sourceFields, derivedFields)
+
+
+def getSourceFields(fields: list[dict]) -> list[dict]:
+    """
+    Gets the minimal set of given fields that must be read to compute `fields`
+
+    Parameters:
+    - fields - The requested fields
+
+    Returns:
+    - The given fields ordered by their accessor
+    """
+    return resolveFields(fields)[0]
+
+
+def evaluateField(
+    field: dict,
+    columns: dict[int, numpy.ndarray],
+) -> numpy.ndarray:
+    """
+    Lazily computes `field` from the columns of a timestep.
+    Every intermediate field (e.g., TOTAL_DENSITY) is memoized in `columns` so that it is computed only once per timestep.
+
+    Parameters:
+    - field - The field to be computed
+    - columns - A dictionary that maps the accessor of each available field to its values (updated in place)
+
+    Returns:
+    - The values of `field`
+    """
+    if field["accessor"] in columns:
+        return columns[field["accessor"]]
+
+    if field["fieldType"] == "given":
+        raise KeyError(f"{field['label']} was not read")
+
+    dependencies: list[numpy.ndarray] = [
+        evaluateField(field=dependency, columns=columns)
+        for dependency in getFieldDependencies(field)
+    ]
+
+    if field == TOTAL_DENSITY:
+        values = formulae.getTotalDensity(
+            tpd=columns[TOTAL_PARTICLE_DENSITY["accessor"]],
+            h=columns[H_MASS_ABUNDANCE["accessor"]],
+            hP=columns[H_PLUS_MASS_ABUNDANCE["accessor"]],
+            hM=columns[H_MINUS_MASS_ABUNDANCE["accessor"]],
+            he=columns[HE_MASS_ABUNDANCE["accessor"]],
+            heP=columns[HE_PLUS_MASS_ABUNDANCE["accessor"]],
+            hePP=columns[HE_PLUS_PLUS_MASS_ABUNDANCE["accessor"]],
+            h2=columns[H2_MASS_ABUNDANCE["accessor"]],
+            h2P=columns[H2_PLUS_MASS_ABUNDANCE["accessor"]],
+        )
+    elif field.get("type") == "number_density":
+        formula = getNumberDensityFormula(field)
+
+        if formula == None:
+            raise ValueError(f"No formula computes {field['label']}")
+
+        values = formula(dependencies[0], dependencies[1])
+    elif field.get("type") == "mass_density":
+        values = formulae.getMassDensity(td=dependencies[1], ma=dependencies[0])
+    else:
+        raise ValueError(f"No formula computes {field['label']}")
+
+    # * Derived fields of a compact data set are kept as float32
+    storageType = numpy.result_type(numpy.float32, *dependencies)
+    if storageType != numpy.float64:
+        values = values.astype(storageType)
+
+    columns[field["accessor"]] = values
+
+    return values
+
+
+def computeDerivedColumns(
+    columns: dict[int, numpy.ndarray],
+    fields: list[dict],
+) -> dict[int, numpy.ndarray]:
+    """
+    Computes the derived scalar fields as whole-column array operations.
+    Intermediate fields (e.g., TOTAL_DENSITY) are computed once and shared by every requested field.
+
+    Parameters:
+    - columns - A dictionary that maps the accessor of each available field to its values
+    - fields - The fields to be computed
+
+    Returns:
+    - A dictionary that maps the accessor of each computed field (including the intermediate ones) to its values
+    """
+    memo: dict[int, numpy.ndarray] = dict(columns)
+
+    # * Every number and mass density shares the total density, so they are computed together in one fused evaluation
+    species: list[dict] = [
+        field
+        for field in resolveFields(fields)[1]
+        if field.get("type") in ["number_density", "mass_density"]
+        and field["accessor"] not in memo
+    ]
+    if len(species) > 0:
+        td: numpy.ndarray = evaluateField(field=TOTAL_DENSITY, columns=memo)
+        abundances: list[numpy.ndarray] = [
+            evaluateField(field=field["dependentColumn"], columns=memo)
+            for field in species
+        ]
+        densities: list[numpy.ndarray] = formulae.getSpeciesDensities(
+            td=td,
+            abundances=abundances,
+            masses=[getAtomicMass(field) for field in species],
+            out=[
+                numpy.empty(
+                    td.shape,
+                    dtype=numpy.result_type(numpy.float32, td, abundance),
+                )
+                for abundance in abundances
+            ],
+        )
+        for field, values in zip(species, densities):
+            memo[field["accessor"]] = values
+
+    for field in fields:
+        evaluateField(field=field, columns=memo)
+
+    return {column: values for column, values in memo.items() if column not in columns}
+
+
+@profiled("computeDerivedScalarFields")
 def computeDerivedScalarFields(
-    dataSet: list[pandas.DataFrame], fields: list[dict]
+    dataSet: list[pandas.DataFrame],
+    fields: list[dict],
+    dropColumns: bool = True,
 ) -> list[pandas.DataFrame]:
     """
     Computes the derived scalar fields in the data set.
@@ -105,6 +941,7 @@ def computeDerivedScalarFields(
     Parameters:
     - dataSet - A list of pandas.DataFrame that represents the entire data set
     - fields - The fields to be computed
+    - dropColumns - Whether the columns other than `fields` are dropped (keeping them lets later calls reuse the source columns and the intermediate fields)
 
     Returns:
     - A list of pandas.DataFrame that contains the new fields
@@ -112,152 +949,855 @@ def computeDerivedScalarFields(
     for iter in range(len(dataSet)):
         print("*** *** Computing derived fields 🧮")
 
-        dataSet[iter][TOTAL_DENSITY["accessor"]] = dataSet[iter].apply(
-            lambda row: formulae.getTotalDensity(
-                tpd=row[TOTAL_PARTICLE_DENSITY["accessor"]],
-                h=row[H_MASS_ABUNDANCE["accessor"]],
-                hP=row[H_PLUS_MASS_ABUNDANCE["accessor"]],
-                hM=row[H_MINUS_MASS_ABUNDANCE["accessor"]],
-                he=row[HE_MASS_ABUNDANCE["accessor"]],
-                heP=row[HE_PLUS_MASS_ABUNDANCE["accessor"]],
-                hePP=row[HE_PLUS_PLUS_MASS_ABUNDANCE["accessor"]],
-                h2=row[H2_MASS_ABUNDANCE["accessor"]],
-                h2P=row[H2_PLUS_MASS_ABUNDANCE["accessor"]],
-            ),
-            axis=1,
-        )
+        columns: dict[int, numpy.ndarray] = {
+            column: dataSet[iter][column].to_numpy()
+            for column in dataSet[iter].columns.values
+        }
 
-        for field in fields:
-            if "type" in field and "dependentColumn" in field:
-                if field["type"] == "number_density":
-                    if (
-                        field == H_NUMBER_DENSITY
-                        or field == H_PLUS_NUMBER_DENSITY
-                        or field == H_MINUS_NUMBER_DENSITY
-                    ):
-                        dataSet[iter][field["accessor"]] = dataSet[iter].apply(
-                            lambda row: formulae.getHNumberDensity(
-                                h=row[field["dependentColumn"]["accessor"]],
-                                td=row[TOTAL_DENSITY["accessor"]],
-                            ),
-                            axis=1,
-                        )
-                    elif (
-                        field == HE_NUMBER_DENSITY
-                        or field == HE_PLUS_NUMBER_DENSITY
-                        or field == HE_PLUS_PLUS_NUMBER_DENSITY
-                    ):
-                        dataSet[iter][field["accessor"]] = dataSet[iter].apply(
-                            lambda row: formulae.getHeNumberDensity(
-                                he=row[field["dependentColumn"]["accessor"]],
-                                td=row[TOTAL_DENSITY["accessor"]],
-                            ),
-                            axis=1,
-                        )
-                    elif field == H2_NUMBER_DENSITY or field == H2_PLUS_NUMBER_DENSITY:
-                        dataSet[iter][field["accessor"]] = dataSet[iter].apply(
-                            lambda row: formulae.getH2NumberDensity(
-                                h2=row[field["dependentColumn"]["accessor"]],
-                                td=row[TOTAL_DENSITY["accessor"]],
-                            ),
-                            axis=1,
-                        )
-                elif field["type"] == "mass_density":
-                    dataSet[iter][field["accessor"]] = dataSet[iter].apply(
-                        lambda row: formulae.getMassDensity(
-                            ma=row[field["dependentColumn"]["accessor"]],
-                            td=row[TOTAL_DENSITY["accessor"]],
-                        ),
-                        axis=1,
-                    )
-
-        print("*** *** Cleaning up unwanted columns 🗑️")
-        dropFields: list = list(
-            set(dataSet[iter].columns.values)
-            - set(field["accessor"] for field in fields)
-        )
-        dataSet[iter].drop(
-            dropFields,
-            inplace=True,
-            axis=1,
+        statistics: dict[int, dict] = dataSet[iter].attrs.get("statistics", {})
+        derived: dict[int, numpy.ndarray] = computeDerivedColumns(
+            columns=columns,
+            fields=fields,
         )
+        keep: set[int] = set(field["accessor"] for field in fields)
+
+        for column, values in derived.items():
+            if dropColumns and column not in keep:
+                continue
+            dataSet[iter][column] = values
+            statistics[column] = computeStatistics(values)
+
+        if dropColumns:
+            print("*** *** Cleaning up unwanted columns 🗑️")
+            dataSet[iter].drop(
+                list(set(dataSet[iter].columns.values) - keep),
+                inplace=True,
+                axis=1,
+            )
+        dataSet[iter].attrs["statistics"] = {
+            column: statistics[column]
+            for column in dataSet[iter].columns
+            if column in statistics
+        }
 
     return dataSet
 
 
+def computeCurlArrays(
+    velocity: numpy.ndarray,
+    spacing: float = SLICE_GRID.spacing,
+    scheme: str = "forward",
+) -> dict[int, numpy.ndarray]:
+    """
+    Computes the curl of a velocity field with array slicing.
+    Cells outside the grid are treated as zero (i.e., zero padding at the upper x, y and z boundaries, and also at the lower ones for the central scheme).
+
+    Parameters:
+    - velocity - An array of shape (nz, ny, nx, 3) with the i, j and k components of the velocity
+    - spacing - The distance between two neighbouring cells
+    - scheme - The finite difference to be used (`"forward"` or `"central"`)
+
+    Returns:
+    - A dictionary that maps the accessor of CURL_X, CURL_Y, CURL_Z and CURL_MAG to contiguous arrays of shape (nz, ny, nx)
+    """
+
+    def shift(
+        component: numpy.ndarray,
+        axis: int,
+        offset: int,
+    ) -> numpy.ndarray:
+        """
+        Returns the values of the neighbour at `offset` cells along `axis` (zero outside the grid)
+        """
+        shifted = numpy.zeros_like(component)
+        length = component.shape[axis]
+
+        if abs(offset) < length:
+            target = [slice(None)] * component.ndim
+            source = [slice(None)] * component.ndim
+            if offset > 0:
+                target[axis] = slice(0, length - offset)
+                source[axis] = slice(offset, length)
+            else:
+                target[axis] = slice(-offset, length)
+                source[axis] = slice(0, length + offset)
+            shifted[tuple(target)] = component[tuple(source)]
+
+        return shifted
+
+    if velocity.ndim != 4 or velocity.shape[3] != 3:
+        raise ValueError(
+            f"Expected a velocity of shape (nz, ny, nx, 3) but got {velocity.shape}"
+        )
+
+    # * Axes of the (nz, ny, nx) grid
+    zAxis, yAxis, xAxis = 0, 1, 2
+
+    u = velocity[..., 0]
+    v = velocity[..., 1]
+    w = velocity[..., 2]
+
+    if scheme == "forward":
+        cx = (shift(w, yAxis, 1) - w - shift(v, zAxis, 1) + v) / spacing
+        cy = (shift(u, zAxis, 1) - u - shift(w, xAxis, 1) + w) / spacing
+        cz = (shift(v, xAxis, 1) - v - shift(u, yAxis, 1) + u) / spacing
+    elif scheme == "central":
+        cx = (
+            shift(w, yAxis, 1)
+            - shift(w, yAxis, -1)
+            - shift(v, zAxis, 1)
+            + shift(v, zAxis, -1)
+        ) / (2 * spacing)
+        cy = (
+            shift(u, zAxis, 1)
+            - shift(u, zAxis, -1)
+            - shift(w, xAxis, 1)
+            + shift(w, xAxis, -1)
+        ) / (2 * spacing)
+        cz = (
+            shift(v, xAxis, 1)
+            - shift(v, xAxis, -1)
+            - shift(u, yAxis, 1)
+            + shift(u, yAxis, -1)
+        ) / (2 * spacing)
+    else:
+        raise ValueError(f"Unknown finite difference scheme: {scheme}")
+
+    return {
+        CURL_X["accessor"]: cx,
+        CURL_Y["accessor"]: cy,
+        CURL_Z["accessor"]: cz,
+        CURL_MAG["accessor"]: numpy.sqrt(cx**2 + cy**2 + cz**2),
+    }
+
+
+@profiled("computeCurl")
 def computeCurl(
     dataSet: list[pandas.DataFrame],
+    zPlanes: int = 1,
+    scheme: str = "forward",
+    grid: Grid = SLICE_GRID,
 ) -> list[pandas.DataFrame]:
     """
     Computes the curl of the velocity in the data set.
 
     Parameter:
     - dataSet - A list of pandas.DataFrame that represents the entire data set
+    - zPlanes - Number of z-planes for which the curl is kept, the remaining planes are only used as neighbours (`None` keeps all the planes)
+    - scheme - The finite difference to be used (`"forward"` or `"central"`)
+    - grid - The grid of the data (the number of z-planes is read from the number of rows)
 
     Returns:
     - A list of pandas.DataFrame that contains the curl fields
     """
+    for iter, data in enumerate(dataSet):
+        print("*** *** Computing Curl 🧮")
+        velocity: numpy.ndarray = data[
+            [
+                I_COMPONENT["accessor"],
+                J_COMPONENT["accessor"],
+                K_COMPONENT["accessor"],
+            ]
+        ].to_numpy()
+        velocity = velocity.reshape(grid.withRows(len(data)).shape + (3,))
+
+        curl: dict[int, numpy.ndarray] = computeCurlArrays(
+            velocity=velocity,
+            spacing=grid.spacing,
+            scheme=scheme,
+        )
+
+        print("*** *** Adding computed columns 🎲")
+        dataSet[iter] = pandas.DataFrame(
+            {
+                column: curl[column][:zPlanes].reshape(-1)
+                for column in [
+                    CURL_X["accessor"],
+                    CURL_Y["accessor"],
+                    # CURL_Z["accessor"], # Unnecessary column
+                    CURL_MAG["accessor"],
+                ]
+            }
+        )
+        dataSet[iter].attrs["statistics"] = {
+            column: computeStatistics(dataSet[iter][column].to_numpy())
+            for column in dataSet[iter].columns
+        }
+
+    return dataSet
+
+
+def getCodeVersion() -> str:
+    """
+    Gets the version of the code that computes the cached results, i.e., `RESULT_VERSION` and a hash of `formulae.py` and of this file (`computeDerivedColumns()`, `computeCurlArrays()` and the other stages)
+
+    Returns:
+    - The code version
+    """
+    digest = hashlib.sha1()
+    for file in [formulae.__file__, __file__]:
+        with open(file, "rb") as source:
+            digest.update(source.read())
+
+    return f"{RESULT_VERSION}-{digest.hexdigest()[:16]}"
+
+
+def describeField(field: dict) -> dict:
+    """
+    Gets the definition of a field (its dependencies included) in a form that can be serialized to JSON
+
+    Parameters:
+    - field - A dictionary that represents the field
+
+    Returns:
+    - The definition of the field
+    """
+    description: dict = {}
+
+    for key, value in field.items():
+        if isinstance(value, dict):
+            value = describeField(value)
+        elif isinstance(value, list):
+            value = [
+                describeField(item) if isinstance(item, dict) else item
+                for item in value
+            ]
+        description[key] = value
+
+    formula = getNumberDensityFormula(field) if "fieldType" in field else None
+    if formula != None:
+        description["formula"] = formula.__name__
+
+    return description
+
+
+def getResultKeys(
+    file: str,
+    derivedFields: list[dict] = None,
+    curl: bool = False,
+    zRange: range = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
+    scheme: str = "forward",
+    zPlanes: int = 1,
+) -> dict[int, str]:
+    """
+    Gets the keys of the derived fields and the curl of a timestep in the result cache.
+    A key changes whenever the source file, the field definition, the precision, the grid, the curl settings or the code version changes.
+
+    Parameters:
+    - file - The file (path) of the timestep
+    - derivedFields - The derived scalar fields to be computed (the given fields are left out)
+    - curl - Whether the curl of the velocity must be computed
+    - zRange - The z-planes extracted from a gzipped data volume
+    - precision - Type in which the columns are held in memory
+    - grid - The grid of the data
+    - scheme - The finite difference of the curl (see `computeCurl()`)
+    - zPlanes - Number of z-planes for which the curl is kept (see `computeCurl()`)
+
+    Returns:
+    - A dictionary that maps the accessor of each computed column to its key
+    """
+    source: dict = {
+        "fingerprint": getFingerprint(file),
+        "variant": getZRangeVariant(zRange) if zRange != None else "",
+        "precision": precision,
+        "version": getCodeVersion(),
+    }
+    keys: dict[int, str] = {}
+
+    for field in derivedFields if derivedFields != None else []:
+        if field["fieldType"] == "derived":
+            keys[field["accessor"]] = getResultKey(
+                dict(source, field=describeField(field))
+            )
+
+    if curl:
+        for field in [CURL_X, CURL_Y, CURL_MAG]:
+            keys[field["accessor"]] = getResultKey(
+                dict(
+                    source,
+                    field=describeField(field),
+                    scheme=scheme,
+                    zPlanes=zPlanes,
+                    grid=asdict(grid),
+                )
+            )
+
+    return keys
+
+
+def readCachedResults(
+    keys: dict[int, str],
+    resultDir: str,
+) -> dict[int, tuple[numpy.ndarray, dict]]:
+    """
+    Reads the computed columns of a timestep from the result cache
+
+    Parameters:
+    - keys - A dictionary that maps the accessor of each computed column to its key (see `getResultKeys()`)
+    - resultDir - Directory of the result cache
+
+    Returns:
+    - A dictionary that maps the accessor of each cached column to a tuple (values, statistics)
+    """
+    results: dict[int, tuple[numpy.ndarray, dict]] = {}
+
+    for column, key in keys.items():
+        result: tuple = readCachedResult(key=key, resultDir=resultDir)
+        if result != None:
+            results[column] = result
+
+    return results
+
+
+def writeResultStatistics(
+    file: str,
+    statistics: dict[int, dict],
+    keys: dict[int, str],
+    cacheDir: str = None,
+    zRange: range = None,
+):
+    """
+    Writes the statistics of a processed timestep to the statistics index of its file.
+    The statistics of the derived fields and the curl are stored with their result key (see `getResultKeys()`), so `readStatistics()` can tell when they were computed by another code version, field definition or curl setting.
+
+    Parameters:
+    - file - The file (path) of the timestep
+    - statistics - A dictionary that maps each column (accessor) to its statistics
+    - keys - A dictionary that maps the accessor of each computed column to its result key
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes extracted from a gzipped data volume
+    """
+    writeCachedStatistics(
+        file=file,
+        statistics={
+            column: dict(value, resultKey=keys[column]) if column in keys else value
+            for column, value in statistics.items()
+        },
+        cacheDir=cacheDir,
+        variant=getZRangeVariant(zRange) if zRange != None else "",
+    )
+
+
+def processTimestep(
+    file: str,
+    fields: list[dict],
+    derivedFields: list[dict] = None,
+    curl: bool = False,
+    cacheDir: str = None,
+    zRange: range = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
+    useResultCache: bool = True,
+    scheme: str = "forward",
+    zPlanes: int = 1,
+) -> pandas.DataFrame:
+    """
+    Reads, derives and computes the curl of a single timestep.
+    The derived fields and the curl are kept in the result cache, so a timestep whose results are all cached is not processed again.
+
+    Parameters:
+    - file - The file (path) of the timestep
+    - fields - List of dictionaries that describe the fields to be read
+    - derivedFields - The derived scalar fields to be computed (`None` skips `computeDerivedScalarFields()`)
+    - curl - Whether the curl of the velocity must be computed
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the file is a gzipped data volume
+    - precision - Type in which the columns are held in memory (see `getStorageArray()`)
+    - grid - The grid of the data (the number of z-planes is read from the data)
+    - useResultCache - Whether the computed columns are read from and written to the result cache
+    - scheme - The finite difference of the curl (see `computeCurl()`)
+    - zPlanes - Number of z-planes for which the curl is kept (see `computeCurl()`)
+
+    Returns:
+    - A pandas.DataFrame with the processed timestep
+    """
+    resultDir: str = getResultCacheDir(file=file, cacheDir=cacheDir)
+    keys: dict[int, str] = {}
+    if derivedFields != None or curl:
+        keys = getResultKeys(
+            file=file,
+            derivedFields=derivedFields,
+            curl=curl,
+            zRange=zRange,
+            precision=precision,
+            grid=grid,
+            scheme=scheme,
+            zPlanes=zPlanes,
+        )
+    cached: dict[int, tuple] = (
+        readCachedResults(keys=keys, resultDir=resultDir) if useResultCache else {}
+    )
 
-    def getRow(
-        data: pandas.DataFrame,
-        x: int,
-        y: int,
-        z: int,
+    # * Every column of the result is cached, so the file does not have to be read at all
+    if (
+        len(keys) > 0
+        and len(cached) == len(keys)
+        and all(field["fieldType"] == "derived" for field in derivedFields or [])
     ):
-        if x >= 600 or y >= 248:
-            return (0, 0, 0)
+        print("*** *** Reading cached results ♻️")
+        data: pandas.DataFrame = pandas.DataFrame(
+            {column: values for column, (values, _) in cached.items()}
+        )
+        data.attrs["statistics"] = {
+            column: statistics for column, (_, statistics) in cached.items()
+        }
+        if precision == "float64":
+            writeResultStatistics(
+                file=file,
+                statistics=data.attrs["statistics"],
+                keys=keys,
+                cacheDir=cacheDir,
+                zRange=zRange,
+            )
+        return data
 
-        index: int = x + y * 600 + z * 600 * 248
+    dataSet: list[pandas.DataFrame] = readDataSet(
+        files=[file],
+        fields=fields,
+        cacheDir=cacheDir,
+        zRange=zRange,
+        workers=1,
+        precision=precision,
+        grid=grid,
+    )
 
-        return tuple(data.iloc[index])
+    if derivedFields != None:
+        # * Cached derived fields are not computed again (nor the intermediate fields only they need)
+        for column, (values, statistics) in cached.items():
+            if column in [field["accessor"] for field in derivedFields]:
+                dataSet[0][column] = values
+                dataSet[0].attrs["statistics"][column] = statistics
 
-    for data in dataSet:
-        print("*** *** Computing Curl 🧮")
-        curlX: list = []
-        curlY: list = []
-        curlZ: list = []
-        curlMag: list = []
-
-        for z in range(1):
-            for y in range(248):
-                for x in range(600):
-                    row: tuple = getRow(data, x, y, z)
-                    rowX: tuple = getRow(data, x + 1, y, z)
-                    rowY: tuple = getRow(data, x, y + 1, z)
-                    rowZ: tuple = getRow(data, x, y, z + 1)
-
-                    cx = (rowY[2] - row[2] - rowZ[1] + row[1]) / 0.001
-                    cy = (rowZ[0] - row[0] - rowX[2] + row[2]) / 0.001
-                    cz = (rowX[1] - row[1] - rowY[0] + row[0]) / 0.001
-
-                    curlX.append(cx)
-                    curlY.append(cy)
-                    curlZ.append(cz)
-
-                    curlMag.append(math.sqrt(cx ** 2 + cy ** 2 + cz ** 2))
-
-        print("*** *** Cleaning up unwanted columns and rows🗑️")
-        data.drop(
-            data.loc[148800:].index,
-            inplace=True,
+        dataSet = computeDerivedScalarFields(dataSet=dataSet, fields=derivedFields)
+
+    if curl:
+        dataSet = computeCurl(
+            dataSet=dataSet,
+            zPlanes=zPlanes,
+            scheme=scheme,
+            grid=grid,
         )
 
-        dropColumns: list[int] = [
-            I_COMPONENT["accessor"],
-            J_COMPONENT["accessor"],
-            K_COMPONENT["accessor"],
-            # CURL_Z["accessor"],
-        ]
-        data.drop(
-            dropColumns,
-            inplace=True,
-            axis=1,
+    for column, key in keys.items():
+        if useResultCache and column not in cached:
+            writeCachedResult(
+                key=key,
+                resultDir=resultDir,
+                values=dataSet[0][column].to_numpy(),
+                statistics=dataSet[0].attrs["statistics"][column],
+            )
+
+    if (derivedFields != None or curl) and precision == "float64":
+        # * Keep the statistics of the computed columns in the statistics index of the file
+        writeResultStatistics(
+            file=file,
+            statistics=dataSet[0].attrs["statistics"],
+            keys=keys,
+            cacheDir=cacheDir,
+            zRange=zRange,
         )
 
-        print("*** *** Adding computed columns 🎲")
-        data[CURL_X["accessor"]] = curlX
-        data[CURL_Y["accessor"]] = curlY
-        # data[CURL_Z["accessor"]] = curlZ # Unnecessary column
-        data[CURL_MAG["accessor"]] = curlMag
+    return dataSet[0]
+
+
+def processTimestepToFile(
+    outputFile: str,
+    **arguments,
+) -> list:
+    """
+    Runs `processTimestep()` in a worker process and saves the result as a single (rows, columns) `.npy` file
+
+    Parameters:
+    - outputFile - The file in which the result is saved
+    - arguments - The arguments of `processTimestep()`
+
+    Returns:
+    - A tuple (columns, statistics, counters, records) with the columns (accessors) of the result in the order they are saved, their statistics index, the result cache counters and the profile records of the timestep
+    """
+    before: dict[str, int] = dict(resultCacheCounters)
+    records: int = len(profileRecords)
+    with profileTimestep(arguments["file"]):
+        data: pandas.DataFrame = processTimestep(**arguments)
+    numpy.save(outputFile, data.to_numpy())
+
+    return (
+        list(data.columns),
+        data.attrs.get("statistics", {}),
+        {name: count - before[name] for name, count in resultCacheCounters.items()},
+        profileRecords[records:],
+    )
+
+
+def processDataSet(
+    files: list[str],
+    fields: list[dict],
+    derivedFields: list[dict] = None,
+    curl: bool = False,
+    workers: int = None,
+    outputDir: str = None,
+    cacheDir: str = None,
+    zRange: range = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
+    useResultCache: bool = True,
+    scheme: str = "forward",
+    zPlanes: int = 1,
+) -> list[pandas.DataFrame]:
+    """
+    Reads, derives and computes the curl of every timestep in parallel.
+    Each worker saves its result as a `.npy` file which is memory mapped instead of sending a pickled DataFrame back.
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - fields - List of dictionaries that describe the fields to be read
+    - derivedFields - The derived scalar fields to be computed (`None` skips `computeDerivedScalarFields()`)
+    - curl - Whether the curl of the velocity must be computed
+    - workers - Number of worker processes (defaults to the number of CPUs, `1` processes the timesteps in this process)
+    - outputDir - Directory in which the results are kept (defaults to a temporary directory that is removed once the results are mapped)
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - precision - Type in which the columns are held in memory (see `getStorageArray()`)
+    - grid - The grid of the data (the number of z-planes is read from the data)
+    - useResultCache - Whether the derived fields and the curl are read from and written to the result cache (see `processTimestep()`)
+    - scheme - The finite difference of the curl (see `computeCurl()`)
+    - zPlanes - Number of z-planes for which the curl is kept (see `computeCurl()`)
+
+    Returns:
+    - List of `pandas.DataFrame` in timestep order
+    """
+    if files == None or len(files) == 0:
+        print("No file names were passed!")
+        return None
+
+    arguments: dict = {
+        "fields": fields,
+        "derivedFields": derivedFields,
+        "curl": curl,
+        "cacheDir": cacheDir,
+        "zRange": zRange,
+        "precision": precision,
+        "grid": grid,
+        "useResultCache": useResultCache,
+        "scheme": scheme,
+        "zPlanes": zPlanes,
+    }
+
+    if workers == 1:
+        dataSet: list[pandas.DataFrame] = []
+        for file in files:
+            with profileTimestep(file):
+                dataSet.append(processTimestep(file=file, **arguments))
+        return dataSet
+
+    temporary: bool = outputDir == None
+    if temporary:
+        outputDir = tempfile.mkdtemp(prefix="dataSet-")
+    os.makedirs(outputDir, exist_ok=True)
+
+    outputFiles: list[str] = [
+        os.path.join(outputDir, f"{index}.npy") for index in range(len(files))
+    ]
+
+    try:
+        # * `iterateTimesteps()` calls this from its prefetch threads, whose locks a forked worker could inherit
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("forkserver"),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    processTimestepToFile,
+                    outputFile=outputFile,
+                    file=file,
+                    **arguments,
+                )
+                for file, outputFile in zip(files, outputFiles)
+            ]
+
+            # * Results are collected in the order of the files, not in the order they finish
+            dataSet: list[pandas.DataFrame] = []
+            for future, outputFile in zip(futures, outputFiles):
+                columns, statistics, counters, records = future.result()
+                for name, count in counters.items():
+                    resultCacheCounters[name] += count
+                profileRecords.extend(records)
+                data: pandas.DataFrame = pandas.DataFrame(
+                    numpy.load(outputFile, mmap_mode="c"),
+                    columns=columns,
+                    copy=False,
+                )
+                data.attrs["statistics"] = statistics
+                dataSet.append(data)
+    finally:
+        if temporary:
+            # * Mapped files stay readable after they are removed
+            shutil.rmtree(outputDir, ignore_errors=True)
 
     return dataSet
+
+
+def prefetch(
+    tasks,
+    lookahead: int = LOOKAHEAD,
+    threads: int = None,
+):
+    """
+    Runs the `tasks` on background threads up to `lookahead` tasks ahead of the consumer and yields their results in order.
+    At most `lookahead` results wait to be consumed (a bounded queue), so a slow consumer holds the loading back instead of filling the memory.
+    The time the consumer waits for a result that is not ready yet (a stall) is added to `prefetchCounters`.
+
+    Parameters:
+    - tasks - An iterable of functions without arguments (e.g., reading and deriving one timestep)
+    - lookahead - Number of tasks run ahead of the consumer (`0` runs each task when its result is needed)
+    - threads - Number of threads (defaults to `lookahead`)
+
+    Yields:
+    - The result of each task in the order of the tasks
+    """
+    if lookahead < 1:
+        for task in tasks:
+            yield task()
+        return
+
+    tasks = iter(tasks)
+    stalls, stallSeconds, items = 0, 0.0, 0
+
+    with ThreadPoolExecutor(
+        max_workers=threads if threads != None else lookahead,
+        thread_name_prefix="prefetch",
+    ) as executor:
+        pending: deque = deque()
+
+        try:
+            while True:
+                # * The current task and `lookahead` tasks that run while the consumer uses its result
+                for task in tasks:
+                    pending.append(executor.submit(task))
+                    if len(pending) > lookahead:
+                        break
+
+                if len(pending) == 0:
+                    break
+
+                current = pending.popleft()
+
+                if not current.done():
+                    stalls += 1
+                    start: float = time.perf_counter()
+                    result = current.result()
+                    stallSeconds += time.perf_counter() - start
+                else:
+                    result = current.result()
+
+                items += 1
+                yield result
+        finally:
+            # * Tasks that were not started are dropped when the consumer stops early
+            for future in pending:
+                future.cancel()
+
+            prefetchCounters["items"] += items
+            prefetchCounters["stalls"] += stalls
+            prefetchCounters["stallSeconds"] += stallSeconds
+            print(
+                f"*** *** Prefetched {items} items, waited {stallSeconds:.2f}s in {stalls} stalls ⏳"
+            )
+
+
+def iterateTimesteps(
+    files: list[str],
+    fields: list[dict],
+    derivedFields: list[dict] = None,
+    curl: bool = False,
+    cacheDir: str = None,
+    zRange: range = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
+    lookahead: int = LOOKAHEAD,
+):
+    """
+    Reads, derives and computes the curl of one timestep at a time (see `processTimestep()`).
+    The next `lookahead` timesteps are read and derived on background threads while the current one is used (e.g., rendered), see `prefetch()`.
+    Only the current timestep and the prefetched ones are held in memory, so the memory does not grow with the number of timesteps and the first timestep is ready as soon as it is processed.
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - fields - List of dictionaries that describe the fields to be read
+    - derivedFields - The derived scalar fields to be computed (`None` skips `computeDerivedScalarFields()`)
+    - curl - Whether the curl of the velocity must be computed
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - precision - Type in which the columns are held in memory (see `getStorageArray()`)
+    - grid - The grid of the data (the number of z-planes is read from the data)
+    - lookahead - Number of timesteps read ahead (`0` reads each timestep when it is needed)
+
+    Yields:
+    - A tuple (index, data) with the index of the timestep and a pandas.DataFrame with the processed timestep
+    """
+
+    def load(file: str) -> pandas.DataFrame:
+        with profileTimestep(file):
+            return processTimestep(
+                file=file,
+                fields=fields,
+                derivedFields=derivedFields,
+                curl=curl,
+                cacheDir=cacheDir,
+                zRange=zRange,
+                precision=precision,
+                grid=grid,
+            )
+
+    yield from enumerate(
+        prefetch(
+            tasks=(functools.partial(load, file) for file in files),
+            lookahead=lookahead,
+        )
+    )
+
+
+def streamDataSet(
+    files: list[str],
+    fields: list[dict],
+    window: int = None,
+    workers: int = None,
+    cacheDir: str = None,
+    zRange: range = None,
+    precision: str = "float64",
+    grid: Grid = SLICE_GRID,
+    lookahead: int = 1,
+):
+    """
+    Reads the source columns of all the `fields` in one pass over each file and derives every field from those shared columns.
+    Only `window` timesteps (and the `lookahead` windows being read ahead) are held in memory at a time.
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - fields - The given and derived scalar fields that are needed
+    - window - Number of timesteps processed at a time (defaults to the number of workers)
+    - workers - Number of worker processes (defaults to the number of CPUs, `1` processes the timesteps in this process)
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - precision - Type in which the columns are held in memory (see `getStorageArray()`)
+    - grid - The grid of the data (the number of z-planes is read from the data)
+    - lookahead - Number of windows that are read ahead on a background thread while a window is used (`0` reads each window when it is needed)
+
+    Yields:
+    - A tuple (start, dataSet) with the index of the first timestep of the window and a list of pandas.DataFrame that contain every field in `fields`
+    """
+    if window == None:
+        window = workers if workers != None else os.cpu_count()
+
+    derived: bool = any(field["fieldType"] == "derived" for field in fields)
+
+    starts: range = range(0, len(files), window)
+    windows = prefetch(
+        tasks=(
+            functools.partial(
+                processDataSet,
+                files=files[start : start + window],
+                fields=getSourceFields(fields),
+                derivedFields=fields if derived else None,
+                workers=workers,
+                cacheDir=cacheDir,
+                zRange=zRange,
+                precision=precision,
+                grid=grid,
+            )
+            for start in starts
+        ),
+        lookahead=lookahead,
+        threads=1,
+    )
+
+    yield from zip(starts, windows)
+
+
+def readStatistics(
+    files: list[str],
+    fields: list[dict],
+    window: int = None,
+    workers: int = None,
+    cacheDir: str = None,
+    zRange: range = None,
+    grid: Grid = SLICE_GRID,
+) -> list[pandas.DataFrame]:
+    """
+    Reads the statistics index of the `fields` for every timestep without keeping the data.
+    Timesteps whose index lacks one of the fields (or holds derived statistics under another result key) are streamed once with `streamDataSet()`, which adds the missing statistics to the index.
+
+    Parameters:
+    - files - List of files (paths), one per timestep
+    - fields - The given and derived scalar fields
+    - window - Number of timesteps processed at a time when the index is incomplete
+    - workers - Number of worker processes
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - grid - The grid of the data
+
+    Returns:
+    - A list of empty pandas.DataFrame whose statistics index can be passed to `getGMaxMin()`, `getGlobalStatistics()` and `getQuantileLevels()`
+    """
+    variant: str = getZRangeVariant(zRange) if zRange != None else ""
+    accessors: list[int] = [field["accessor"] for field in fields]
+    derivedFields: list[dict] = [
+        field for field in fields if field.get("fieldType") == "derived"
+    ]
+
+    statisticsSet: list[dict[int, dict]] = []
+    for file in files:
+        statistics: dict[int, dict] = readCachedStatistics(
+            file=file,
+            cacheDir=cacheDir,
+            variant=variant,
+        )
+
+        # * Derived statistics of another code version or field definition are stale
+        keys: dict[int, str] = (
+            getResultKeys(
+                file=file,
+                derivedFields=derivedFields,
+                zRange=zRange,
+                grid=grid,
+            )
+            if len(derivedFields) > 0 and len(statistics) > 0
+            else {}
+        )
+        statisticsSet.append(
+            {
+                column: value
+                for column, value in statistics.items()
+                if column not in keys or value.get("resultKey") == keys[column]
+            }
+        )
+    missing: list[int] = [
+        index
+        for index, statistics in enumerate(statisticsSet)
+        if any(accessor not in statistics for accessor in accessors)
+    ]
+
+    if len(missing) > 0:
+        print(f"*** *** Indexing {len(missing)} timesteps 📇")
+        for start, dataSet in streamDataSet(
+            files=[files[index] for index in missing],
+            fields=fields,
+            window=window,
+            workers=workers,
+            cacheDir=cacheDir,
+            zRange=zRange,
+            grid=grid,
+        ):
+            for offset, data in enumerate(dataSet):
+                statisticsSet[missing[start + offset]] = data.attrs["statistics"]
+
+    index: list[pandas.DataFrame] = []
+    for statistics in statisticsSet:
+        data: pandas.DataFrame = pandas.DataFrame()
+        data.attrs["statistics"] = {
+            accessor: statistics[accessor] for accessor in accessors
+        }
+        index.append(data)
+
+    return index
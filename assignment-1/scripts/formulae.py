@@ -1,7 +1,11 @@
+import numpy
+
 MASS_OF_HYDROGEN = 1.38066e-24
 
+# * Arrays are computed in float64 (`dtype=`) since the products with MASS_OF_HYDROGEN underflow or lose most of their precision in the compact (float32 / float16) types
+
 
-def getTotalDensity(tpd, h, hP, hM, he, heP, hePP, h2, h2P):
+def getTotalDensity(tpd, h, hP, hM, he, heP, hePP, h2, h2P, out=None):
     """
     Computes the total density from the total particle density and the mass abundance of all the chemical species
 
@@ -15,51 +19,142 @@ def getTotalDensity(tpd, h, hP, hM, he, heP, hePP, h2, h2P):
     - hePP -> He++ Mass Abundance
     - h2 -> H2 Mass Abundance
     - h2P -> H2+ Mass Abundance
+    - out -> Array in which the result is written (allocated when `None`)
+    """
+    if not any(
+        isinstance(values, numpy.ndarray)
+        for values in (tpd, h, hP, hM, he, heP, hePP, h2, h2P)
+    ):
+        return (tpd * MASS_OF_HYDROGEN) / (
+            h + hP + hM + 0.25 * (he + heP + hePP) + 0.5 * (h2 + h2P)
+        )
+
+    # * The denominator is accumulated in place (in `out`) in the same order as the scalar formula, with one scratch array
+    denominator = numpy.add(h, hP, out=out, dtype=numpy.float64)
+    denominator += hM
+    scratch = numpy.add(he, heP, dtype=numpy.float64)
+    scratch += hePP
+    scratch *= 0.25
+    denominator += scratch
+    numpy.add(h2, h2P, out=scratch, dtype=numpy.float64)
+    scratch *= 0.5
+    denominator += scratch
+    numpy.multiply(tpd, MASS_OF_HYDROGEN, out=scratch, dtype=numpy.float64)
+
+    return numpy.divide(scratch, denominator, out=denominator)
+
+
+def getNumberDensity(ma, td, mass=1, out=None):
     """
-    return (tpd * MASS_OF_HYDROGEN) / (
-        h + hP + hM + 0.25 * (he + heP + hePP) + 0.5 * (h2 + h2P)
-    )
+    Computes the number density of a species of atoms
 
+    Parameters:
+    - ma -> Mass Abundance
+    - td -> Total Density
+    - mass -> Atomic mass of the species in units of MASS_OF_HYDROGEN
+    - out -> Array in which the result is written (allocated when `None`)
+    """
+    if not isinstance(ma, numpy.ndarray) and not isinstance(td, numpy.ndarray):
+        return ma * td / (mass * MASS_OF_HYDROGEN)
+
+    out = numpy.multiply(ma, td, out=out, dtype=numpy.float64)
+    out /= mass * MASS_OF_HYDROGEN
 
-def getHNumberDensity(h, td):
+    return out
+
+
+def getHNumberDensity(h, td, out=None):
     """
     Computes the number density of H / H+ / H- atoms
 
     Parameters:
     - h -> Mass Abundance
     - tp -> Total Density
+    - out -> Array in which the result is written (allocated when `None`)
     """
-    return h * td / MASS_OF_HYDROGEN
+    return getNumberDensity(ma=h, td=td, mass=1, out=out)
 
 
-def getHeNumberDensity(he, td):
+def getHeNumberDensity(he, td, out=None):
     """
     Computes the number density of He / He+ / He++ atoms
 
     Parameters:
     - he -> Mass Abundance
     - tp -> Total Density
+    - out -> Array in which the result is written (allocated when `None`)
     """
-    return he * td / (4 * MASS_OF_HYDROGEN)
+    return getNumberDensity(ma=he, td=td, mass=4, out=out)
 
 
-def getH2NumberDensity(h2, td):
+def getH2NumberDensity(h2, td, out=None):
     """
     Computes the number density of H2 / H2+ atoms
 
     Parameters:
     - h2 -> Mass Abundance
     - tp -> Total Density
+    - out -> Array in which the result is written (allocated when `None`)
     """
-    return h2 * td / (2 * MASS_OF_HYDROGEN)
+    return getNumberDensity(ma=h2, td=td, mass=2, out=out)
+
 
+# * Atomic mass (in units of MASS_OF_HYDROGEN) of the species of each number density formula
+ATOMIC_MASSES = {
+    getHNumberDensity: 1,
+    getHeNumberDensity: 4,
+    getH2NumberDensity: 2,
+}
 
-def getMassDensity(td, ma):
+
+def getMassDensity(td, ma, out=None):
     """
     Computes the species mass density
 
     Parametes:
     - td -> Total Density
     - ma -> Species Mass Abundance
+    - out -> Array in which the result is written (allocated when `None`)
     """
-    return td * ma
+    if not isinstance(td, numpy.ndarray) and not isinstance(ma, numpy.ndarray):
+        return td * ma
+
+    return numpy.multiply(td, ma, out=out, dtype=numpy.float64)
+
+
+def getSpeciesDensities(td, abundances, masses, out=None):
+    """
+    Computes the number and mass densities of several species in one pass.
+    The total density is divided by MASS_OF_HYDROGEN once for every number density and each result is written straight into its output array, so no temporary arrays of the size of the data are made.
+
+    Parameters:
+    - td -> Total Density
+    - abundances -> Mass Abundance of each species
+    - masses -> Atomic mass of each species in units of MASS_OF_HYDROGEN for a number density, `None` for a mass density
+    - out -> Arrays in which the results are written, one per species (float64 arrays are allocated when `None`)
+
+    Returns:
+    - The list of densities in the order of the species
+    """
+    if out == None:
+        out = [numpy.empty(numpy.shape(td), dtype=numpy.float64) for _ in abundances]
+
+    # * Shared factor of every number density
+    factor = None
+    if any(mass != None for mass in masses):
+        factor = numpy.divide(td, MASS_OF_HYDROGEN, dtype=numpy.float64)
+
+    for ma, mass, density in zip(abundances, masses, out):
+        if mass == None:
+            numpy.multiply(
+                td, ma, out=density, dtype=numpy.float64, casting="same_kind"
+            )
+        else:
+            numpy.multiply(
+                ma, factor, out=density, dtype=numpy.float64, casting="same_kind"
+            )
+            if mass != 1:
+                # * 1 / 2 and 1 / 4 are exact, so the division is an exact scaling
+                density *= 1 / mass
+
+    return out
@@ -0,0 +1,328 @@
+import numpy
+import pandas
+from dataclasses import dataclass, replace
+
+
+@dataclass(frozen=True)
+class Grid:
+    """
+    Geometry of a regular grid with the same spacing along every axis
+
+    Attributes:
+    - nx - Number of cells along x
+    - ny - Number of cells along y
+    - nz - Number of cells (planes) along z
+    - spacing - The distance between two neighbouring cells
+    - origin - The (x, y, z) co-ordinates of the first cell
+    """
+
+    nx: int
+    ny: int
+    nz: int = 1
+    spacing: float = 0.001
+    origin: tuple[float, float, float] = (0.0, 0.0, 0.0)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """
+        The (nz, ny, nx) shape of a timestep
+        """
+        return (self.nz, self.ny, self.nx)
+
+    @property
+    def planeShape(self) -> tuple[int, int]:
+        """
+        The (ny, nx) shape of a z-plane
+        """
+        return (self.ny, self.nx)
+
+    @property
+    def planeCells(self) -> int:
+        """
+        Number of cells in a z-plane
+        """
+        return self.nx * self.ny
+
+    def getAxes(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Gets the X and Y co-ordinates of the cells
+
+        Returns:
+        - A tuple (X, Y)
+        """
+        return (
+            self.origin[0] + numpy.arange(self.nx) * self.spacing,
+            self.origin[1] + numpy.arange(self.ny) * self.spacing,
+        )
+
+    def withRows(self, rows: int):
+        """
+        Gets the grid of a timestep with `rows` cells, i.e., the number of z-planes is read from the data
+
+        Parameters:
+        - rows - Number of cells (rows) of the timestep
+
+        Returns:
+        - The grid with the number of z-planes in the timestep
+        """
+        if rows % self.planeCells != 0:
+            raise ValueError(
+                f"{rows} cells are not a whole number of {self.nx} x {self.ny} planes"
+            )
+
+        return replace(self, nz=rows // self.planeCells)
+
+    def coarsen(self, factor: int, mode: str = "stride"):
+        """
+        Gets the grid of a view that keeps every `factor`-th cell along x and y
+
+        Parameters:
+        - factor - The downsampling factor
+        - mode - `"stride"` keeps the first cell of each block, `"mean"` averages the block (its co-ordinates are the centre of the block)
+
+        Returns:
+        - The coarser grid
+        """
+        offset: float = 0.0 if mode == "stride" else (factor - 1) * self.spacing / 2
+
+        return replace(
+            self,
+            nx=self.nx // factor if mode == "mean" else -(-self.nx // factor),
+            ny=self.ny // factor if mode == "mean" else -(-self.ny // factor),
+            spacing=self.spacing * factor,
+            origin=(self.origin[0] + offset, self.origin[1] + offset, self.origin[2]),
+        )
+
+
+# * Grid of the contest data volumes
+CONTEST_GRID = Grid(nx=600, ny=248, nz=275, spacing=0.001)
+
+# * Grid of a single z-slice of the contest data
+SLICE_GRID = Grid(nx=600, ny=248, nz=1, spacing=0.001)
+
+
+class GridFrame:
+    """
+    One timestep of a `GridDataSet`.
+    It can be used in place of the pandas.DataFrame of a timestep: `frame[accessor]` is a (nz, ny, nx) view of the field and `frame.attrs["statistics"]` is its statistics index.
+    """
+
+    def __init__(self, grid, index: int):
+        self.grid = grid
+        self.index = index
+        self.attrs: dict = {"statistics": grid.statistics[index]}
+
+    @property
+    def columns(self) -> list[int]:
+        return list(self.grid.fields)
+
+    def __getitem__(self, accessor: int) -> numpy.ndarray:
+        return self.grid.fields[accessor][self.index]
+
+    def __contains__(self, accessor: int) -> bool:
+        return accessor in self.grid.fields
+
+    def __len__(self) -> int:
+        return int(numpy.prod(self.grid.shape))
+
+
+class GridDataSet:
+    """
+    A data set held as one contiguous (t, z, y, x) array per field.
+    Indexing a timestep returns a `GridFrame` and slicing the timesteps returns a `GridDataSet` of views, so no values are copied.
+
+    Attributes:
+    - fields - A dictionary that maps the accessor of each field to its (t, z, y, x) array
+    - grid - The `Grid` of a timestep
+    - statistics - The statistics index of each timestep (see `dataOps.computeStatistics()`)
+    """
+
+    def __init__(
+        self,
+        fields: dict[int, numpy.ndarray],
+        grid: Grid = SLICE_GRID,
+        statistics: list[dict[int, dict]] = None,
+    ):
+        shapes: set[tuple] = set(values.shape for values in fields.values())
+
+        if len(shapes) != 1 or next(iter(shapes))[1:] != grid.shape:
+            raise ValueError(
+                f"Expected (t, {grid.nz}, {grid.ny}, {grid.nx}) arrays but got {shapes}"
+            )
+
+        self.fields: dict[int, numpy.ndarray] = fields
+        self.grid: Grid = grid
+        self.statistics: list[dict[int, dict]] = (
+            statistics if statistics != None else [{} for _ in range(len(self))]
+        )
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """
+        The (nz, ny, nx) shape of a timestep
+        """
+        return self.grid.shape
+
+    def __len__(self) -> int:
+        return next(iter(self.fields.values())).shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return GridDataSet(
+                fields={
+                    accessor: values[index] for accessor, values in self.fields.items()
+                },
+                grid=self.grid,
+                statistics=self.statistics[index],
+            )
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Timestep {index} is out of range")
+
+        return GridFrame(grid=self, index=index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield GridFrame(grid=self, index=index)
+
+    def getPlane(
+        self,
+        field: dict,
+        timestep: int,
+        z: int = 0,
+    ) -> numpy.ndarray:
+        """
+        Gets a (ny, nx) view of a z-plane of a field
+
+        Parameters:
+        - field - A dictionary that represents the field
+        - timestep - Index of the timestep
+        - z - Index of the z-plane
+
+        Returns:
+        - The values of the plane
+        """
+        return self.fields[field["accessor"]][timestep, z]
+
+    def getView(
+        self,
+        factor: int = 1,
+        mode: str = "stride",
+    ):
+        """
+        Gets a coarser view of the data set for quick previews.
+        The statistics index of the full resolution data is kept so that the previews use the same levels and normalization.
+
+        Parameters:
+        - factor - Keeps one cell in `factor` along x and y (`1` returns the data set itself)
+        - mode - `"stride"` keeps every `factor`-th cell without copying, `"mean"` averages each `factor` x `factor` block (a copy, the last partial blocks are dropped)
+
+        Returns:
+        - The `GridDataSet` on the coarser grid
+        """
+        if factor == 1:
+            return self
+
+        if mode == "stride":
+            fields: dict[int, numpy.ndarray] = {
+                accessor: values[:, :, ::factor, ::factor]
+                for accessor, values in self.fields.items()
+            }
+        elif mode == "mean":
+            ny: int = self.grid.ny // factor
+            nx: int = self.grid.nx // factor
+            fields: dict[int, numpy.ndarray] = {
+                accessor: values[:, :, : ny * factor, : nx * factor]
+                .reshape(len(self), self.grid.nz, ny, factor, nx, factor)
+                .mean(axis=(3, 5), dtype=numpy.float64)
+                .astype(values.dtype, copy=False)
+                for accessor, values in self.fields.items()
+            }
+        else:
+            raise ValueError(f"Unknown downsampling mode: {mode}")
+
+        return GridDataSet(
+            fields=fields,
+            grid=self.grid.coarsen(factor=factor, mode=mode),
+            statistics=self.statistics,
+        )
+
+
+def getDataSetGrid(dataSet, grid: Grid = None) -> Grid:
+    """
+    Gets the grid of a data set
+
+    Parameters:
+    - dataSet - A `GridDataSet`, a `GridFrame` or a (list of) pandas.DataFrame
+    - grid - The grid of the data set when it is not a `GridDataSet` (defaults to `SLICE_GRID`)
+
+    Returns:
+    - The grid of the data set
+    """
+    if isinstance(dataSet, GridDataSet):
+        return dataSet.grid
+    elif isinstance(dataSet, GridFrame):
+        return dataSet.grid.grid
+
+    return grid if grid != None else SLICE_GRID
+
+
+def toGridDataSet(
+    dataSet: list[pandas.DataFrame],
+    grid: Grid = SLICE_GRID,
+) -> GridDataSet:
+    """
+    Copies a list of pandas.DataFrame (one per timestep) into a `GridDataSet`.
+    Every column is copied once into its (t, z, y, x) array together with its statistics index.
+
+    Parameters:
+    - dataSet - A list of pandas.DataFrame that represents the entire data set
+    - grid - The grid of a z-plane and its spacing (the number of z-planes is read from the number of rows)
+
+    Returns:
+    - The `GridDataSet` with every column of the data set
+    """
+    grid = grid.withRows(len(dataSet[0]))
+    shape: tuple[int, int, int] = grid.shape
+    fields: dict[int, numpy.ndarray] = {}
+
+    for column in dataSet[0].columns:
+        values: numpy.ndarray = numpy.empty(
+            (len(dataSet),) + tuple(shape),
+            dtype=dataSet[0][column].dtype,
+        )
+        for index, data in enumerate(dataSet):
+            values[index] = data[column].to_numpy().reshape(shape)
+        fields[column] = values
+
+    return GridDataSet(
+        fields=fields,
+        grid=grid,
+        statistics=[dict(data.attrs.get("statistics", {})) for data in dataSet],
+    )
+
+
+def getPlane(
+    data,
+    field: dict,
+    grid: Grid = SLICE_GRID,
+    z: int = 0,
+) -> numpy.ndarray:
+    """
+    Gets a z-plane of a field in one timestep as a (ny, nx) array without copying the values
+
+    Parameters:
+    - data - A `GridFrame` or a pandas.DataFrame that represents one timestep
+    - field - A dictionary that represents the field
+    - grid - The grid of the timestep (only used for a pandas.DataFrame)
+    - z - Index of the z-plane
+
+    Returns:
+    - A view of the plane (it must not be modified)
+    """
+    if isinstance(data, GridFrame):
+        return data[field["accessor"]][z]
+
+    return data[field["accessor"]].to_numpy().reshape((-1,) + grid.planeShape)[z]
@@ -0,0 +1,56 @@
+from dataOps import extractZSlices
+from scalarFields import *
+from vectorFields import *
+
+if __name__ == "__main__":
+    print("*** Getting file names 🗃️")
+    timestepRange = range(0, 200)
+
+    path: str = "./data"
+
+    scalarFiles: list[str] = [
+        rf"{path}/multifield.{'{:04d}'.format(timestep)}.txt.gz"
+        for timestep in timestepRange
+    ]
+
+    vectorFiles: list[str] = [
+        rf"{path}/vector.{'{:04d}'.format(timestep)}.txt.gz"
+        for timestep in timestepRange
+    ]
+
+    print("*** Setting parameters 🛠️")
+    # * The curl needs the next z-plane as well
+    scalarZRange: range = range(125, 126)
+    vectorZRange: range = range(125, 127)
+    workers: int = None
+
+    print("*** Extracting scalar z-slices 🗜️")
+    extractZSlices(
+        files=scalarFiles,
+        fields=[
+            TOTAL_PARTICLE_DENSITY,
+            GAS_TEMPERATURE,
+            H_MASS_ABUNDANCE,
+            H_PLUS_MASS_ABUNDANCE,
+            HE_MASS_ABUNDANCE,
+            HE_PLUS_MASS_ABUNDANCE,
+            HE_PLUS_PLUS_MASS_ABUNDANCE,
+            H_MINUS_MASS_ABUNDANCE,
+            H2_MASS_ABUNDANCE,
+            H2_PLUS_MASS_ABUNDANCE,
+        ],
+        zRange=scalarZRange,
+        workers=workers,
+    )
+
+    print("*** Extracting vector z-slices 🗜️")
+    extractZSlices(
+        files=vectorFiles,
+        fields=[
+            I_COMPONENT,
+            J_COMPONENT,
+            K_COMPONENT,
+        ],
+        zRange=vectorZRange,
+        workers=workers,
+    )
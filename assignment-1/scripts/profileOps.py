@@ -0,0 +1,252 @@
+import os
+import csv
+import json
+import time
+import inspect
+import resource
+import threading
+import functools
+from contextlib import contextmanager
+
+# * Environment variable that turns the profiling on (e.g., PIPELINE_PROFILE=1)
+PROFILE_VARIABLE = "PIPELINE_PROFILE"
+
+# * Whether the stages are being profiled
+profiling: bool = os.environ.get(PROFILE_VARIABLE, "") not in ["", "0"]
+
+# * Record of every profiled stage in this process
+profileRecords: list[dict] = []
+
+# * The timestep (file) being processed by each thread, recorded with every stage
+timestepContext = threading.local()
+
+
+def enableProfiling(enabled: bool = True):
+    """
+    Turns the profiling of the stages on or off (it starts on when the PIPELINE_PROFILE environment variable is set)
+
+    Parameters:
+    - enabled - Whether the stages must be profiled
+    """
+    global profiling
+    profiling = enabled
+
+    # * Worker processes read the environment variable
+    os.environ[PROFILE_VARIABLE] = "1" if enabled else "0"
+
+
+def getResidentMemory() -> float:
+    """
+    Gets the current resident memory (RSS) of this process
+
+    Returns:
+    - The resident memory in MB (`None` where `/proc/self/statm` is not available)
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages: int = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return pages * resource.getpagesize() / 1024**2
+
+
+def countRows(value) -> int:
+    """
+    Counts the rows (grid cells) of a data set
+
+    Parameters:
+    - value - A pandas.DataFrame, a `gridOps.GridFrame` or a list / `gridOps.GridDataSet` of them
+
+    Returns:
+    - The total number of rows (`None` if the value is not a data set)
+    """
+    if isinstance(value, (list, tuple)):
+        counts = [countRows(item) for item in value]
+        return sum(counts) if len(counts) > 0 and None not in counts else None
+    elif hasattr(value, "fields") and hasattr(value, "grid"):
+        return countRows(list(value))
+    elif hasattr(value, "columns") and hasattr(value, "__len__"):
+        return len(value)
+
+    return None
+
+
+@contextmanager
+def profileTimestep(timestep: str):
+    """
+    Records `timestep` with every stage profiled inside the context
+
+    Parameters:
+    - timestep - Name of the timestep (e.g., the path of its file)
+    """
+    previous: str = getattr(timestepContext, "timestep", None)
+    timestepContext.timestep = timestep
+
+    try:
+        yield
+    finally:
+        timestepContext.timestep = previous
+
+
+def profiled(stage: str):
+    """
+    Decorates a function so that each call is recorded as `stage` while the profiling is on.
+    The wall time, the CPU time of this process (not of its worker processes), the rows processed (of the returned data set or of the `dataSet` / `data` argument), the change of the resident memory over the stage and the peak memory of the process so far are recorded.
+    The peak memory (`ru_maxrss`) is the peak of the whole process, not of the stage, so only the resident memory change tells the stages apart.
+    Only a flag is checked while the profiling is off.
+
+    Parameters:
+    - stage - Name of the stage
+
+    Returns:
+    - The decorator
+    """
+
+    def decorator(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiling:
+                return function(*args, **kwargs)
+
+            memoryStart: float = getResidentMemory()
+            wallStart: float = time.perf_counter()
+            cpuStart: float = time.process_time()
+            result = function(*args, **kwargs)
+            wallTime: float = time.perf_counter() - wallStart
+            cpuTime: float = time.process_time() - cpuStart
+            memoryEnd: float = getResidentMemory()
+
+            rows: int = countRows(result)
+            if rows == None:
+                arguments: dict = signature.bind_partial(*args, **kwargs).arguments
+                for name in ["dataSet", "data", "scalarDataSet"]:
+                    if name in arguments:
+                        rows = countRows(arguments[name])
+                        break
+
+            profileRecords.append(
+                {
+                    "stage": stage,
+                    "timestep": getattr(timestepContext, "timestep", None),
+                    "pid": os.getpid(),
+                    "wallSeconds": wallTime,
+                    "cpuSeconds": cpuTime,
+                    "rows": rows,
+                    "rssDeltaMB": (
+                        memoryEnd - memoryStart if memoryStart != None else None
+                    ),
+                    "processPeakMB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                    / 1024,
+                }
+            )
+
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def summarizeProfile(records: list[dict] = None) -> str:
+    """
+    Summarizes the profiled stages as a table of their calls, total wall and CPU time, rows, throughput, largest resident memory growth of a call and peak memory of the process
+
+    Parameters:
+    - records - The profile records (defaults to the records of this run)
+
+    Returns:
+    - The table
+    """
+    records = records if records != None else profileRecords
+    stages: dict[str, dict] = {}
+
+    for record in records:
+        stage: dict = stages.setdefault(
+            record["stage"],
+            {
+                "calls": 0,
+                "wallSeconds": 0.0,
+                "cpuSeconds": 0.0,
+                "rows": 0,
+                "rssDeltaMB": 0.0,
+                "processPeakMB": 0.0,
+            },
+        )
+        stage["calls"] += 1
+        stage["wallSeconds"] += record["wallSeconds"]
+        stage["cpuSeconds"] += record["cpuSeconds"]
+        stage["rows"] += record["rows"] if record["rows"] != None else 0
+        if record["rssDeltaMB"] != None:
+            stage["rssDeltaMB"] = max(stage["rssDeltaMB"], record["rssDeltaMB"])
+        stage["processPeakMB"] = max(stage["processPeakMB"], record["processPeakMB"])
+
+    width: int = max([len("Stage")] + [len(name) for name in stages])
+    lines: list[str] = [
+        f"{'Stage':<{width}} | {'Calls':>5} | {'Wall (s)':>9} | {'CPU (s)':>9} | {'Rows':>11} | {'Rows/s':>11} | {'RSS Δ (MB)':>10} | {'Process peak (MB)':>17}"
+    ]
+    for name, stage in stages.items():
+        throughput: float = (
+            stage["rows"] / stage["wallSeconds"] if stage["wallSeconds"] > 0 else 0.0
+        )
+        lines.append(
+            f"{name:<{width}} | {stage['calls']:>5} | {stage['wallSeconds']:>9.3f} | {stage['cpuSeconds']:>9.3f} | {stage['rows']:>11} | {throughput:>11.0f} | {stage['rssDeltaMB']:>10.1f} | {stage['processPeakMB']:>17.1f}"
+        )
+
+    return "\n".join(lines)
+
+
+def writeProfile(
+    reportFile: str,
+    records: list[dict] = None,
+):
+    """
+    Writes the profile records to a JSON or CSV file (chosen by the extension of `reportFile`)
+
+    Parameters:
+    - reportFile - Path of the report (`.json` or `.csv`)
+    - records - The profile records (defaults to the records of this run)
+    """
+    records = records if records != None else profileRecords
+    directory: str = os.path.dirname(reportFile)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    with open(reportFile, "w", newline="") as report:
+        if reportFile.endswith(".csv"):
+            writer = csv.DictWriter(
+                report,
+                fieldnames=[
+                    "stage",
+                    "timestep",
+                    "pid",
+                    "wallSeconds",
+                    "cpuSeconds",
+                    "rows",
+                    "rssDeltaMB",
+                    "processPeakMB",
+                ],
+            )
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, report, indent=2)
+
+
+def reportProfile(reportFile: str = "./outputs/profile.json"):
+    """
+    Writes the report of the profiled stages and prints their summary table (nothing is done while the profiling is off)
+
+    Parameters:
+    - reportFile - Path of the report (`.json` or `.csv`)
+    """
+    if not profiling:
+        return
+
+    writeProfile(reportFile=reportFile)
+
+    print()
+    print(summarizeProfile())
+    print(f"*** Profile written to {reportFile} ⏱️")
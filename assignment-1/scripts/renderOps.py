@@ -0,0 +1,899 @@
+import io
+import os
+import math
+import shutil
+import subprocess
+import multiprocessing
+import numpy
+import matplotlib
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib.figure import Figure
+from matplotlib.axes import Axes
+from matplotlib.colors import BoundaryNorm, ListedColormap
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image
+
+# * Conversion factor from km to parsec
+KM_TO_PARSEC = 3.2407792700054e-14
+
+# * Minimum distance (pixels) between two neighbouring arrows of a quiver plot
+ARROW_SPACING = 12
+
+# * ffmpeg output arguments of each animation format (the sizes are padded to even numbers for yuv420p)
+ENCODER_ARGUMENTS = {
+    ".mp4": [
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-vf",
+        "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+    ],
+    ".webm": [
+        "-c:v",
+        "libvpx-vp9",
+        "-pix_fmt",
+        "yuv420p",
+        "-vf",
+        "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+    ],
+    # * A palette of each frame, so that the frames are encoded as they arrive (one palette for every frame would hold them all until the end)
+    ".gif": [
+        "-vf",
+        "split[a][b];[a]palettegen=stats_mode=single[p];[b][p]paletteuse=new=1",
+    ],
+}
+
+
+def decorateAxes(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    title: str,
+):
+    """
+    Sets the axis labels, ticks and title of a field plot
+
+    Parameters:
+    - axes - The matplotlib Axes to be decorated
+    - X - The X co-ordinates
+    - Y - The Y co-ordinates
+    - title - Title of the plot
+    """
+    # * Define axis labels
+    axes.set_xlabel("X | parsec")
+    axes.set_ylabel("Y | parsec")
+
+    # * Set X and Y Ticks
+    axes.set_xticks(numpy.arange(min(X), max(X), 0.06))
+    axes.set_yticks(numpy.arange(min(Y), max(Y), 0.03))
+
+    # * Define title
+    axes.set_title(title)
+
+
+def drawContourFill(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    Z: numpy.ndarray,
+    field: dict,
+    levels,
+    colorMap="Blues_r",
+    showGrid: bool = False,
+    title: str = None,
+    colorbarLabel: str = None,
+):
+    """
+    Draws a contour fill plot of `Z` on the `axes` together with its labels, ticks and colorbar
+
+    Parameters:
+    - axes - The matplotlib Axes to be drawn on
+    - X - The X co-ordinates
+    - Y - The Y co-ordinates
+    - Z - The field values of shape (len(Y), len(X))
+    - field - The field to be used as the 3rd dimension of the contour fill plot
+    - levels - Levels of contours
+    - colorMap - Color map to be used for the fills
+    - showGrid - Show grid lines on the figure
+    - title - Title of the plot (defaults to the label and unit of the field)
+    - colorbarLabel - Label of the colorbar (defaults to the unit of the field)
+
+    Returns:
+    - The contour set
+    """
+    decorateAxes(
+        axes=axes,
+        X=X,
+        Y=Y,
+        title=title if title != None else f"{field['label']} | {field['unit']}",
+    )
+
+    # * Draw Contour Fill plot
+    contourf = axes.contourf(
+        X,
+        Y,
+        Z,
+        levels,
+        cmap=colorMap,
+    )
+
+    # * Add color bar
+    axes.figure.colorbar(
+        contourf,
+        ax=axes,
+        label=colorbarLabel if colorbarLabel != None else field["unit"],
+    )
+
+    if showGrid:
+        # * Show grid lines
+        axes.grid(linestyle="--", linewidth=0.25)
+
+    return contourf
+
+
+def drawImage(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    Z: numpy.ndarray,
+    field: dict,
+    levels,
+    colorMap="Blues_r",
+    showGrid: bool = False,
+    title: str = None,
+):
+    """
+    Draws `Z` as an image whose colors are binned by the contour `levels` (a raster alternative to `drawContourFill()`)
+
+    Parameters:
+    - The parameters are those of `drawContourFill()`, `levels` must be the list of level values
+
+    Returns:
+    - The image, which can be updated with `set_data()`
+    """
+    decorateAxes(
+        axes=axes,
+        X=X,
+        Y=Y,
+        title=title if title != None else f"{field['label']} | {field['unit']}",
+    )
+
+    # * One color per level interval, picked like the contour fill plot does (the values outside the levels and NaN are left white)
+    colorMap = ListedColormap(getLevelColors(levels=levels, colorMap=colorMap) / 255)
+    colorMap.set_extremes(bad="white", under="white", over="white")
+
+    # * Draw the image with one color per level interval, like the contour fill plot
+    image = axes.imshow(
+        Z,
+        cmap=colorMap,
+        norm=BoundaryNorm(levels, ncolors=len(levels) - 1),
+        extent=(min(X), max(X), min(Y), max(Y)),
+        origin="lower",
+        aspect="auto",
+        interpolation="nearest",
+    )
+
+    # * Add color bar
+    axes.figure.colorbar(image, ax=axes, label=field["unit"])
+
+    if showGrid:
+        # * Show grid lines
+        axes.grid(linestyle="--", linewidth=0.25)
+
+    return image
+
+
+def getLevelColors(levels, colorMap="Blues_r") -> numpy.ndarray:
+    """
+    Gets the color of each interval between two levels, as picked by `Axes.contourf()` (the midpoint of each interval, normalized between the first and the last level)
+
+    Parameters:
+    - levels - The increasing level values
+    - colorMap - Name of the color map
+
+    Returns:
+    - An RGBA (uint8) array of shape (len(levels) - 1, 4)
+    """
+    levels = numpy.asarray(levels, dtype=numpy.float64)
+    midpoints = (levels[:-1] + levels[1:]) / 2
+
+    return matplotlib.colormaps[colorMap](
+        matplotlib.colors.Normalize(levels[0], levels[-1])(midpoints), bytes=True
+    )
+
+
+def rasterizeField(
+    Z: numpy.ndarray,
+    levels,
+    colorMap="Blues_r",
+) -> numpy.ndarray:
+    """
+    Quantizes `Z` into the intervals between the `levels` and maps each interval to its contour fill color through a lookup table.
+    The values outside the levels (and NaN) are left white, like the gaps of a contour fill plot.
+
+    Parameters:
+    - Z - The field values of the plane, of shape (ny, nx)
+    - levels - The increasing level values
+    - colorMap - Name of the color map
+
+    Returns:
+    - An RGBA (uint8) image of shape (ny, nx, 4) whose first row is the largest y
+    """
+    levels = numpy.asarray(levels, dtype=numpy.float64)
+
+    # * One color per interval and a last entry for the values outside the levels
+    table = numpy.concatenate(
+        [getLevelColors(levels=levels, colorMap=colorMap), [[255, 255, 255, 255]]]
+    ).astype(numpy.uint8)
+
+    # * Interval of each value, closed on the upper level like the contourf bands (lower, upper] (the minimum belongs to the first interval)
+    bins = numpy.digitize(Z, levels[1:-1], right=True)
+    bins[~((Z >= levels[0]) & (Z <= levels[-1]))] = len(levels) - 1
+
+    return table[bins[::-1]]
+
+
+def drawRaster(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    Z: numpy.ndarray,
+    field: dict,
+    levels,
+    colorMap="Blues_r",
+    showGrid: bool = False,
+    title: str = None,
+):
+    """
+    Draws the image of `rasterizeField()` on axes with a color bar (the decorated form of the `"raster"` render mode)
+
+    Parameters:
+    - The parameters are those of `drawContourFill()`, `levels` must be the list of level values
+
+    Returns:
+    - The image, which can be updated with `set_data(rasterizeField(...))`
+    """
+    decorateAxes(
+        axes=axes,
+        X=X,
+        Y=Y,
+        title=title if title != None else f"{field['label']} | {field['unit']}",
+    )
+
+    image = axes.imshow(
+        rasterizeField(Z=Z, levels=levels, colorMap=colorMap),
+        extent=(min(X), max(X), min(Y), max(Y)),
+        origin="upper",
+        aspect="auto",
+        interpolation="nearest",
+    )
+
+    # * Add a color bar with the colors of the intervals
+    axes.figure.colorbar(
+        matplotlib.cm.ScalarMappable(
+            norm=BoundaryNorm(levels, ncolors=len(levels) - 1),
+            cmap=ListedColormap(getLevelColors(levels=levels, colorMap=colorMap) / 255),
+        ),
+        ax=axes,
+        label=field["unit"],
+    )
+
+    if showGrid:
+        # * Show grid lines
+        axes.grid(linestyle="--", linewidth=0.25)
+
+    return image
+
+
+def getDrawFunction(renderMode: str):
+    """
+    Gets the function that draws a scalar field in a render mode
+
+    Parameters:
+    - renderMode - `"contour"` (`drawContourFill()`), `"image"` (`drawImage()`) or `"raster"` (`drawRaster()`)
+
+    Returns:
+    - The draw function
+    """
+    draws: dict = {
+        "contour": drawContourFill,
+        "image": drawImage,
+        "raster": drawRaster,
+    }
+    if renderMode not in draws:
+        raise ValueError(f"Unknown render mode: {renderMode}")
+
+    return draws[renderMode]
+
+
+def getQuiverFactor(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    arrowSpacing: int = ARROW_SPACING,
+) -> int:
+    """
+    Gets the downsampling factor that leaves at least `arrowSpacing` pixels between two arrows.
+    The size of the axes in pixels follows from the size and the DPI of the figure.
+
+    Parameters:
+    - axes - The matplotlib Axes on which the arrows are drawn
+    - X - The X co-ordinates
+    - Y - The Y co-ordinates
+    - arrowSpacing - Minimum distance (pixels) between two neighbouring arrows
+
+    Returns:
+    - The factor (`1` keeps every arrow)
+    """
+    cellPixels: float = min(axes.bbox.width / len(X), axes.bbox.height / len(Y))
+
+    return max(1, math.ceil(arrowSpacing / cellPixels))
+
+
+def reduceQuiver(
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    U: numpy.ndarray,
+    V: numpy.ndarray,
+    C: numpy.ndarray,
+    factor: int,
+    mode: str = "mean",
+) -> tuple[numpy.ndarray, ...]:
+    """
+    Reduces the arrows of a quiver plot to one per `factor` x `factor` block of cells
+
+    Parameters:
+    - X, Y - The X and Y co-ordinates
+    - U, V, C - The arrow components and colors of shape (len(Y), len(X))
+    - factor - The downsampling factor
+    - mode - `"stride"` keeps the first arrow of each block, `"mean"` averages each block, `"magnitude"` averages each block weighted by the magnitude `C` so that the strongest arrows dominate (the last partial blocks are dropped by the pooling modes)
+
+    Returns:
+    - A tuple (X, Y, U, V, C) of the reduced arrows
+    """
+    if factor == 1:
+        return (X, Y, U, V, C)
+
+    if mode == "stride":
+        return (
+            X[::factor],
+            Y[::factor],
+            U[::factor, ::factor],
+            V[::factor, ::factor],
+            C[::factor, ::factor],
+        )
+
+    ny: int = len(Y) // factor
+    nx: int = len(X) // factor
+
+    def blocks(values: numpy.ndarray) -> numpy.ndarray:
+        """
+        Splits the values into (ny, nx) blocks of (factor, factor) cells
+        """
+        return values[: ny * factor, : nx * factor].reshape(ny, factor, nx, factor)
+
+    X = X[: nx * factor].reshape(nx, factor).mean(axis=1)
+    Y = Y[: ny * factor].reshape(ny, factor).mean(axis=1)
+
+    if mode == "mean":
+        return (
+            X,
+            Y,
+            blocks(U).mean(axis=(1, 3)),
+            blocks(V).mean(axis=(1, 3)),
+            blocks(C).mean(axis=(1, 3)),
+        )
+    elif mode == "magnitude":
+        weights: numpy.ndarray = numpy.abs(blocks(C))
+        total: numpy.ndarray = weights.sum(axis=(1, 3))
+        total[total == 0] = 1
+
+        return (
+            X,
+            Y,
+            (blocks(U) * weights).sum(axis=(1, 3)) / total,
+            (blocks(V) * weights).sum(axis=(1, 3)) / total,
+            (blocks(C) * weights).sum(axis=(1, 3)) / total,
+        )
+
+    raise ValueError(f"Unknown level of detail mode: {mode}")
+
+
+def drawQuiver(
+    axes: Axes,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    U: numpy.ndarray,
+    V: numpy.ndarray,
+    C: numpy.ndarray,
+    norm=None,
+    scale=None,
+    lodMode: str = "mean",
+    lodFactor: int = None,
+):
+    """
+    Draws a quiver (arrow) plot of the curl on the `axes`.
+    The arrows are reduced to the density the figure can show (see `getQuiverFactor()` and `reduceQuiver()`), while the norm and the scale stay those of the full resolution data.
+
+    Parameters:
+    - axes - The matplotlib Axes to be drawn on
+    - X - The X co-ordinates
+    - Y - The Y co-ordinates
+    - U - The x component of the arrows
+    - V - The y component of the arrows
+    - C - The values used to color the arrows
+    - norm - Normalization of the colors
+    - scale - Scale of the arrows
+    - lodMode - How the arrows are reduced (`"stride"`, `"mean"` or `"magnitude"`)
+    - lodFactor - The downsampling factor (`None` chooses it from the size and the DPI of the figure, `1` draws every arrow)
+
+    Returns:
+    - The quiver
+    """
+    if lodFactor == None:
+        lodFactor = getQuiverFactor(axes=axes, X=X, Y=Y)
+
+    X, Y, U, V, C = reduceQuiver(
+        X=X,
+        Y=Y,
+        U=U,
+        V=V,
+        C=C,
+        factor=lodFactor,
+        mode=lodMode,
+    )
+
+    return axes.quiver(
+        X,
+        Y,
+        U,
+        V,
+        C,
+        norm=norm,
+        scale=scale,
+        angles="xy",
+        scale_units="xy",
+        minshaft=1,
+        minlength=0,
+    )
+
+
+# * Figures of this process, reused across frames (one per figure size)
+renderContexts: dict[tuple, Figure] = {}
+
+
+def getRenderContext(figsize: tuple = (10, 5)) -> tuple[Figure, Axes]:
+    """
+    Gets the figure of this process for `figsize` with a fresh Axes.
+    The figure is created once with the Agg backend (without the pyplot state machine) and cleared for every frame, so rendering many frames does not accumulate figures.
+
+    Parameters:
+    - figsize - Size of the figure in inches
+
+    Returns:
+    - A tuple (figure, axes)
+    """
+    figure: Figure = renderContexts.get(tuple(figsize))
+
+    if figure == None:
+        figure = Figure(figsize=figsize)
+        FigureCanvasAgg(figure)
+        renderContexts[tuple(figsize)] = figure
+    else:
+        # * Removes the axes, colorbars and artists of the previous frame
+        figure.clear()
+
+    return (figure, figure.add_subplot())
+
+
+def getFrameBuffer(figure: Figure) -> numpy.ndarray:
+    """
+    Draws the figure and copies its pixels
+
+    Parameters:
+    - figure - The figure to be drawn
+
+    Returns:
+    - An RGBA array of shape (height, width, 4)
+    """
+    figure.canvas.draw()
+
+    return numpy.array(figure.canvas.buffer_rgba())
+
+
+def renderStaticFrame(
+    saveFile: str,
+    Z: numpy.ndarray,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    field: dict,
+    levels,
+    colorMap="Blues_r",
+    showGrid: bool = False,
+    renderMode: str = "contour",
+    decorate: bool = False,
+):
+    """
+    Renders a contour fill plot to a PNG file.
+    An undecorated `"raster"` frame skips matplotlib: the image of `rasterizeField()` (one pixel per cell) is written straight to the PNG file.
+
+    Parameters:
+    - saveFile - The save file name (with extension), `None` returns the pixels of the frame instead
+    - renderMode - `"contour"` draws the field with `drawContourFill()`, `"image"` with `drawImage()` and `"raster"` with `rasterizeField()`
+    - decorate - Whether a `"raster"` frame is drawn on axes with a color bar (`drawRaster()`), the other modes always are
+    - The remaining parameters are those of `drawContourFill()`
+
+    Returns:
+    - The save file name, or the RGBA pixels of the frame when `saveFile` is `None`
+    """
+    if renderMode == "raster" and not decorate:
+        pixels = rasterizeField(Z=Z, levels=levels, colorMap=colorMap)
+
+        if saveFile == None:
+            return pixels
+
+        Image.fromarray(pixels).save(saveFile)
+
+        return saveFile
+
+    figure, axes = getRenderContext(figsize=(10, 5))
+
+    draw = getDrawFunction(renderMode)
+    draw(
+        axes=axes,
+        X=X,
+        Y=Y,
+        Z=Z,
+        field=field,
+        levels=levels,
+        colorMap=colorMap,
+        showGrid=showGrid,
+    )
+
+    if saveFile == None:
+        return getFrameBuffer(figure)
+
+    figure.savefig(saveFile)
+
+    return saveFile
+
+
+def renderCombinedFrame(
+    saveFile: str,
+    Z: numpy.ndarray,
+    U: numpy.ndarray,
+    V: numpy.ndarray,
+    C: numpy.ndarray,
+    X: numpy.ndarray,
+    Y: numpy.ndarray,
+    field: dict,
+    levels,
+    norm=None,
+    scale=None,
+    lodMode: str = "mean",
+    lodFactor: int = None,
+) -> str:
+    """
+    Renders a quiver plot overlapped on a contour fill plot to a PNG file
+
+    Parameters:
+    - saveFile - The save file name (with extension)
+    - Z - The scalar field values
+    - U, V, C - The quiver components and colors (in parsec)
+    - X, Y - The X and Y co-ordinates
+    - field - The scalar field
+    - levels - Levels of contours
+    - norm - Normalization of the quiver colors
+    - scale - Scale of the arrows
+    - lodMode, lodFactor - Level of detail of the arrows (see `drawQuiver()`)
+
+    Returns:
+    - The save file name
+    """
+    figure, axes = getRenderContext(figsize=(10, 5))
+
+    drawContourFill(
+        axes=axes,
+        X=X,
+        Y=Y,
+        Z=Z,
+        field=field,
+        levels=levels,
+        colorMap=field["colorMap"] if "colorMap" in field else "Blues_r",
+        title=f"{field['label']} & Curl of Velocity",
+        colorbarLabel=f"{field['label']} | {field['unit']}",
+    )
+
+    quiver = drawQuiver(
+        axes=axes,
+        X=X,
+        Y=Y,
+        U=U,
+        V=V,
+        C=C,
+        norm=norm,
+        scale=scale,
+        lodMode=lodMode,
+        lodFactor=lodFactor,
+    )
+    figure.colorbar(
+        quiver, ax=axes, label="Magnitude of the Curl the velocity | parsec/s"
+    )
+
+    figure.savefig(saveFile)
+
+    return saveFile
+
+
+# * Renderer and arguments shared by every frame rendered in a worker process
+workerRenderer = None
+workerShared: dict = {}
+
+
+def initializeWorker(
+    renderer,
+    shared: dict,
+):
+    """
+    Stores the renderer and the shared arguments once in each worker process
+    """
+    global workerRenderer, workerShared
+    workerRenderer = renderer
+    workerShared = shared
+
+
+def renderWorkerFrame(frame: dict) -> str:
+    """
+    Renders a single frame in a worker process with the stored renderer and shared arguments
+    """
+    return workerRenderer(**workerShared, **frame)
+
+
+def renderFrames(
+    renderer,
+    frames: list[dict],
+    workers: int = None,
+    **shared,
+) -> list[str]:
+    """
+    Renders frames in parallel with a process pool.
+    Arguments that are the same for every frame (e.g., the global levels) are sent once to each worker in `shared`.
+
+    Parameters:
+    - renderer - The function that renders a single frame (e.g., `renderStaticFrame()`)
+    - frames - The arguments of each frame, which include the `saveFile`
+    - workers - Number of worker processes (defaults to the number of CPUs, `1` renders in this process)
+    - shared - The arguments shared by every frame
+
+    Returns:
+    - The save file names in the order of the frames
+    """
+    if workers == 1:
+        return [renderer(**shared, **frame) for frame in frames]
+
+    # * The frames are rendered while prefetch threads read the next timesteps, so the workers are started from a fork server instead of forking a process whose locks those threads may hold
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=initializeWorker,
+        initargs=(renderer, shared),
+        mp_context=multiprocessing.get_context("forkserver"),
+    ) as executor:
+        # * `map()` yields the results in the order of the frames
+        return list(executor.map(renderWorkerFrame, frames))
+
+
+def encodeGifFrame(image: Image.Image, duration: float) -> tuple[bytes, bytes]:
+    """
+    Encodes a paletted image as a single frame GIF with `Image.save()` and splits it into the blocks of a looping GIF89a animation.
+    The global color table of the frame is moved into a local color table, so that every frame keeps its own palette.
+
+    Parameters:
+    - image - The paletted ("P" mode) image
+    - duration - The display time of the frame in milliseconds
+
+    Returns:
+    - The header of the animation (signature, logical screen descriptor without a global color table and the NETSCAPE2.0 looping extension)
+    - The frame (graphic control extension, image descriptor, local color table and image data)
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format="GIF", duration=duration)
+    data: bytes = buffer.getvalue()
+
+    # * Logical screen descriptor: width, height, packed fields (global color table flag and size), background color and aspect ratio
+    screen: bytes = data[6:13]
+    tableSize: int = screen[4] & 0x07
+    position: int = 13
+    table: bytes = b""
+    if screen[4] & 0x80:
+        table = data[position : position + 3 * 2 ** (tableSize + 1)]
+        position += len(table)
+
+    def skipSubBlocks(position: int) -> int:
+        # * Data sub-blocks are prefixed with their size and end with an empty block
+        while data[position] != 0:
+            position += data[position] + 1
+        return position + 1
+
+    # * Keep the graphic control extension (the duration) and drop the other extensions
+    control: bytes = b""
+    while data[position] == 0x21:
+        end = skipSubBlocks(position + 2)
+        if data[position + 1] == 0xF9:
+            control = data[position:end]
+        position = end
+
+    # * Image descriptor, whose packed fields get the local color table flag and size
+    descriptor = bytearray(data[position : position + 10])
+    position += 10
+    if descriptor[9] & 0x80:
+        tableSize = descriptor[9] & 0x07
+        table = data[position : position + 3 * 2 ** ((descriptor[9] & 0x07) + 1)]
+        position += len(table)
+    descriptor[9] = (descriptor[9] & 0x78) | 0x80 | tableSize
+
+    # * LZW minimum code size and the image data sub-blocks
+    imageData: bytes = data[position : skipSubBlocks(position + 1)]
+
+    header: bytes = (
+        b"GIF89a"
+        + screen[:4]
+        + bytes([screen[4] & 0x70])
+        + screen[5:]
+        + b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+    )
+
+    return header, control + bytes(descriptor) + table + imageData
+
+
+@contextmanager
+def openAnimationWriter(
+    saveFile: str,
+    fps: int = 24,
+):
+    """
+    Opens a streaming animation writer that encodes each frame as soon as it is written.
+    MP4, WebM and GIF files are encoded by an `ffmpeg` subprocess which reads the raw frames from a pipe, so the memory does not grow with the number of frames.
+    Without `ffmpeg`, GIF files are written one frame at a time from the blocks of `encodeGifFrame()` (each frame with its own palette), so the memory does not grow either.
+
+    Parameters:
+    - saveFile - The save file name, whose extension (`.mp4`, `.webm` or `.gif`) determines the format
+    - fps - The frames per second of the animation
+
+    Returns:
+    - A function that writes an RGBA frame of shape (height, width, 4), to be used in a `with` statement
+    """
+    extension: str = os.path.splitext(saveFile)[1].lower()
+    if extension not in [".mp4", ".webm", ".gif"]:
+        raise ValueError(f"Unsupported animation format: {extension}")
+
+    if shutil.which("ffmpeg") != None:
+        process = None
+
+        def writeFrame(frame: numpy.ndarray):
+            nonlocal process
+
+            if process == None:
+                # * The frame size is only known once the first frame is rendered
+                height, width = frame.shape[:2]
+                process = subprocess.Popen(
+                    [
+                        "ffmpeg",
+                        "-y",
+                        "-loglevel",
+                        "error",
+                        "-f",
+                        "rawvideo",
+                        "-pix_fmt",
+                        "rgba",
+                        "-s",
+                        f"{width}x{height}",
+                        "-r",
+                        str(fps),
+                        "-i",
+                        "-",
+                        *ENCODER_ARGUMENTS[extension],
+                        saveFile,
+                    ],
+                    stdin=subprocess.PIPE,
+                )
+
+            process.stdin.write(numpy.ascontiguousarray(frame).tobytes())
+
+        failed: bool = False
+        try:
+            yield writeFrame
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            if process != None:
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+
+                # * An error of the frames is not hidden by the failure of ffmpeg it caused
+                if process.wait() != 0 and not failed:
+                    raise RuntimeError(f"ffmpeg could not write {saveFile}")
+
+    elif extension == ".gif":
+        with open(saveFile, "wb") as output:
+            started: bool = False
+
+            def writeFrame(frame: numpy.ndarray):
+                nonlocal started
+                header, block = encodeGifFrame(
+                    image=Image.fromarray(frame[..., :3]).quantize(),
+                    duration=1000 / fps,
+                )
+
+                if not started:
+                    # * The size of the animation is only known once the first frame is rendered
+                    output.write(header)
+                    started = True
+
+                output.write(block)
+
+            yield writeFrame
+
+            # * GIF trailer
+            output.write(b";")
+
+    else:
+        raise RuntimeError(f"ffmpeg is required to write {extension} files")
+
+
+def streamFrames(
+    renderer,
+    frames: list[dict],
+    saveFile: str,
+    fps: int = 24,
+    workers: int = None,
+    **shared,
+) -> str:
+    """
+    Renders frames in parallel and streams them to an animation file in order.
+    At most two frames per worker are in flight, so the memory does not grow with the number of frames.
+
+    Parameters:
+    - renderer - The function that renders a single frame and returns its pixels when its `saveFile` is `None` (e.g., `renderStaticFrame()`)
+    - frames - The arguments of each frame
+    - saveFile - The save file name of the animation (`.mp4`, `.webm` or `.gif`)
+    - fps - The frames per second of the animation
+    - workers - Number of worker processes (defaults to the number of CPUs, `1` renders in this process)
+    - shared - The arguments shared by every frame
+
+    Returns:
+    - The save file name
+    """
+    with openAnimationWriter(saveFile=saveFile, fps=fps) as writeFrame:
+        if workers == 1:
+            for frame in frames:
+                writeFrame(renderer(**shared, **frame, saveFile=None))
+            return saveFile
+
+        # * Started from a fork server for the same reason as in `renderFrames()`
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=initializeWorker,
+            initargs=(renderer, shared),
+            mp_context=multiprocessing.get_context("forkserver"),
+        ) as executor:
+            window: int = 2 * (workers if workers != None else os.cpu_count())
+            pending: deque = deque()
+
+            for frame in frames:
+                pending.append(
+                    executor.submit(renderWorkerFrame, {**frame, "saveFile": None})
+                )
+
+                if len(pending) >= window:
+                    writeFrame(pending.popleft().result())
+
+            while len(pending) > 0:
+                writeFrame(pending.popleft().result())
+
+    return saveFile
@@ -7,6 +7,8 @@
 #	"unit" : "Unit of measurement",
 #	"colorMap" : "matplotlib color map",
 #	"dependentColumn": "The column on which this is dependent", 
+#	"dependencies": "The fields from which this is computed (if it has no dependent column)",
+#	"compactType": "numpy type of the field when the data set is read in the float16 precision",
 # }
 
 # * Data Set Columns
@@ -30,48 +32,56 @@ H_MASS_ABUNDANCE = {
     "accessor": 2,
     "label": "H Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 H_PLUS_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 3,
     "label": "H+ Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 HE_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 4,
     "label": "He Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 HE_PLUS_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 5,
     "label": "He+ Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 HE_PLUS_PLUS_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 6,
     "label": "He++ Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 H_MINUS_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 7,
     "label": "H- Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 H2_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 8,
     "label": "H2 Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 H2_PLUS_MASS_ABUNDANCE = {
     "fieldType": "given",
     "accessor": 9,
     "label": "H2 Mass Adundance",
     "unit": "",
+    "compactType": "float16",
 }
 
 # * Derived Columns
@@ -82,6 +92,17 @@ TOTAL_DENSITY = {
     "label": "Total Density",
     "unit": "g / cm^3",
     "colorMap": "BuPu_r",
+    "dependencies": [
+        TOTAL_PARTICLE_DENSITY,
+        H_MASS_ABUNDANCE,
+        H_PLUS_MASS_ABUNDANCE,
+        H_MINUS_MASS_ABUNDANCE,
+        HE_MASS_ABUNDANCE,
+        HE_PLUS_MASS_ABUNDANCE,
+        HE_PLUS_PLUS_MASS_ABUNDANCE,
+        H2_MASS_ABUNDANCE,
+        H2_PLUS_MASS_ABUNDANCE,
+    ],
 }
 
 H_NUMBER_DENSITY = {
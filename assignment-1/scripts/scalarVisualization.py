@@ -1,3 +1,8 @@
+import os
+import glob
+import json
+import hashlib
+import time
 import numpy
 import pandas
 from matplotlib import pyplot, animation
@@ -5,11 +10,37 @@ import math
 
 # ! Custom
 from scalarFields import *
-from dataOps import readDataSet, computeDerivedScalarFields, getGMaxMin
-
-
+from dataOps import (
+    LOOKAHEAD,
+    processDataSet,
+    iterateTimesteps,
+    readStatistics,
+    getGMaxMin,
+    getQuantileLevels,
+    getSourceFields,
+)
+from cacheOps import resultCacheCounters, getFingerprint
+from profileOps import profiled, enableProfiling, reportProfile
+from gridOps import (
+    Grid,
+    GridDataSet,
+    SLICE_GRID,
+    getDataSetGrid,
+    getPlane,
+    toGridDataSet,
+)
+from renderOps import (
+    rasterizeField,
+    getDrawFunction,
+    renderStaticFrame,
+    renderFrames,
+    streamFrames,
+)
+
+
+@profiled("scalarVisualization.visualizeStatic")
 def visualizeStatic(
-    dataSet: list[pandas.DataFrame],
+    dataSet: list[pandas.DataFrame] | GridDataSet,
     field: dict,
     levels=5,
     colorMap="Blues_r",
@@ -17,12 +48,17 @@ def visualizeStatic(
     showFigure: bool = True,
     saveFigure: bool = False,
     saveFile: str = "static-output",
+    workers: int = 1,
+    grid: Grid = None,
+    renderMode: str = "contour",
+    decorate: bool = False,
 ):
     """
-    Creates a contour fill plot for all the `pandas.DataFrames` passed in as the argument.
+    Creates a contour fill plot for every timestep of the data set passed in as the argument.
+    When the figures are only saved, the frames are rendered on a reused figure and can be rendered in parallel by setting `workers`.
 
     Parameters:
-    - dataSet - A list of pandas.DataFrame that represent the dataset
+    - dataSet - A list of pandas.DataFrame or a GridDataSet that represent the dataset
     - field - The field to be used as the 3rd dimension of the contour fill plot
     - levels - Number of levels of contours
     - colorMap - Color map to be used for the fills
@@ -30,56 +66,73 @@ def visualizeStatic(
     - showFigure - Show the plot in an interactive window
     - saveFigure - Save the figure to a file
     - saveFile - The save file name to be used
+    - workers - Number of worker processes that render the frames when the figures are not shown (`None` uses all the CPUs, `1` renders one after another)
+    - grid - The grid of the data set when it is a list of pandas.DataFrame (a GridDataSet carries its own grid)
+    - renderMode - `"contour"` draws contour fills, `"image"` an image binned by the same levels and `"raster"` writes the binned cells straight to the PNG files
+    - decorate - Whether the saved `"raster"` frames are drawn with axes and a color bar
     """
     # * Define the X and Y co-ordinate range
-    X: list[int] = numpy.arange(0.0, 0.6, 0.001)
-    Y: list[int] = numpy.arange(0.0, 0.248, 0.001)
+    grid = getDataSetGrid(dataSet=dataSet, grid=grid)
+    X, Y = grid.getAxes()
+
+    if not showFigure:
+        if not saveFigure:
+            return
+
+        # * Frames that are only saved are rendered on a reused figure (one per worker)
+        print(f"*** *** Rendering {len(dataSet)} figures 💾")
+        renderFrames(
+            renderer=renderStaticFrame,
+            frames=[
+                {
+                    "saveFile": f"{saveFile} - {index}.png",
+                    "Z": getPlane(data=data, field=field, grid=grid),
+                }
+                for index, data in enumerate(dataSet)
+            ],
+            workers=workers,
+            X=X,
+            Y=Y,
+            field=field,
+            levels=levels,
+            colorMap=colorMap,
+            showGrid=showGrid,
+            renderMode=renderMode,
+            decorate=decorate,
+        )
+        return
 
     for index, data in enumerate(dataSet):
-        # * Reshape Z field values
-        Z = numpy.array(data.iloc[:, 0]).reshape(len(Y), len(X))
+        # * Z field values of the plane
+        Z = getPlane(data=data, field=field, grid=grid)
 
         # * Define figure
-        pyplot.figure(figsize=(10, 5))
-
-        # * Define axis labels
-        pyplot.xlabel("X | parsec")
-        pyplot.ylabel("Y | parsec")
-
-        # * Set X and Y Ticks
-        pyplot.xticks(numpy.arange(min(X), max(X), 0.06))
-        pyplot.yticks(numpy.arange(min(Y), max(Y), 0.03))
-
-        # * Define title
-        pyplot.title(f"{field['label']} | {field['unit']}")
-
-        # * Draw Contour Fill plot
-        pyplot.contourf(
-            X,
-            Y,
-            Z,
-            levels,
-            cmap=colorMap,
+        figure = pyplot.figure(figsize=(10, 5))
+
+        # * Draw Contour Fill plot (or the image of the render mode)
+        getDrawFunction(renderMode)(
+            axes=figure.gca(),
+            X=X,
+            Y=Y,
+            Z=Z,
+            field=field,
+            levels=levels,
+            colorMap=colorMap,
+            showGrid=showGrid,
         )
 
-        # * Add color bar
-        pyplot.colorbar(label=field["unit"])
-
-        if showGrid:
-            # * Show grid lines
-            pyplot.grid(linestyle="--", linewidth=0.25)
-
         if saveFigure:
             print("*** *** Saving figure 💾")
             pyplot.savefig(f"{saveFile} - {index}.png")
 
-        if showFigure:
-            print("*** *** Showing figure 🖥️")
-            pyplot.show()
+        print("*** *** Showing figure 🖥️")
+        pyplot.show()
+        pyplot.close(figure)
 
 
+@profiled("scalarVisualization.visualizeMoving")
 def visualizeMoving(
-    dataSet: list[pandas.DataFrame],
+    dataSet: list[pandas.DataFrame] | GridDataSet,
     field: dict,
     levels=5,
     colorMap="Blues_r",
@@ -89,14 +142,22 @@ def visualizeMoving(
     saveFile: str = "moving-output.gif",
     fps: int = 24,
     repeat: bool = True,
+    renderMode: str = "contour",
+    blit: bool = False,
+    videoFormat: str = "gif",
+    workers: int = 1,
+    grid: Grid = None,
+    decorate: bool = False,
 ):
     """
-    Creates a moving (animated) contour fill plot for all the `pandas.DataFrames` passed in as the argument.
+    Creates a moving (animated) contour fill plot for every timestep of the data set passed in as the argument.
+    Each frame replaces the plot of the previous frame instead of drawing over it.
+    Saved animations are streamed frame by frame to the encoder instead of being kept in memory.
 
     Parameters:
-    - dataSet - A list of pandas.DataFrame that represent the dataset
+    - dataSet - A list of pandas.DataFrame or a GridDataSet that represent the dataset
     - field - The field to be used as the 3rd dimension of the contour fill plot
-    - levels - Number of levels of contours
+    - levels - Levels of contours
     - colorMap - Color map to be used for the fills
     - showGrid - Show grid lines on the figure
     - showFigure - Show the plot in an interactive window
@@ -104,79 +165,139 @@ def visualizeMoving(
     - saveFile - The save file name to be used
     - fps - The frames per second to be used in GIF file
     - repeat - Whether the animation must repeat while being showing in the interactive mode
+    - renderMode - `"contour"` draws contour fills, `"image"` draws an image binned by the same levels (faster, but not vector exact), `"raster"` writes the binned cells straight to the frames
+    - blit - Whether only the changed artists are redrawn in the interactive mode
+    - videoFormat - Format of the saved animation (`"gif"`, `"mp4"` or `"webm"`)
+    - workers - Number of worker processes that render the saved frames (`None` uses all the CPUs)
+    - grid - The grid of the data set when it is a list of pandas.DataFrame (a GridDataSet carries its own grid)
+    - decorate - Whether the saved `"raster"` frames are drawn with axes and a color bar
     """
     # * Define the X and Y co-ordinate range
-    X: list[int] = numpy.arange(0.0, 0.6, 0.001)
-    Y: list[int] = numpy.arange(0.0, 0.248, 0.001)
+    grid = getDataSetGrid(dataSet=dataSet, grid=grid)
+    X, Y = grid.getAxes()
 
-    # * Reshape Z field values
-    Z = numpy.array(dataSet[0].iloc[:, 0]).reshape(len(Y), len(X))
-
-    # * Create a figure
-    figure = pyplot.figure(figsize=(10, 5))
+    def getZ(iter: int) -> numpy.ndarray:
+        """
+        Gets the field values of a timestep as an array of dimension Y x X (a view, not a copy)
+        """
+        return getPlane(data=dataSet[iter], field=field, grid=grid)
 
-    # * Define Axis Labels
-    pyplot.xlabel("X | parsec")
-    pyplot.ylabel("Y | parsec")
+    if saveFigure:
+        print("*** *** Saving figure 💾")
+        streamFrames(
+            renderer=renderStaticFrame,
+            frames=[{"Z": getZ(iter)} for iter in range(len(dataSet))],
+            saveFile=f"{saveFile}.{videoFormat}",
+            fps=fps,
+            workers=workers,
+            X=X,
+            Y=Y,
+            field=field,
+            levels=levels,
+            colorMap=colorMap,
+            showGrid=showGrid,
+            renderMode=renderMode,
+            decorate=decorate,
+        )
 
-    # * Set X and Y Ticks
-    pyplot.xticks(numpy.arange(min(X), max(X), 0.06))
-    pyplot.yticks(numpy.arange(min(Y), max(Y), 0.03))
+    if not showFigure:
+        return
 
-    # * Define title
-    pyplot.title(f"{field['label']} | {field['unit']}")
+    # * Create a figure
+    figure = pyplot.figure(figsize=(10, 5))
+    axes = figure.gca()
 
-    pyplot.contourf(
-        X,
-        Y,
-        Z,
-        levels,
-        cmap=colorMap,
+    plot = getDrawFunction(renderMode)(
+        axes=axes,
+        X=X,
+        Y=Y,
+        Z=getZ(0),
+        field=field,
+        levels=levels,
+        colorMap=colorMap,
+        showGrid=showGrid,
     )
 
-    # * Add color bar
-    pyplot.colorbar(label=field["unit"])
+    # * The artist of the current frame
+    artists: list = [plot]
 
-    if showGrid:
-        # * Show grid lines
-        pyplot.grid(linestyle="--", linewidth=0.25)
+    def initialize():
+        """
+        Subroutine to the `animation.FuncAnimation()` method that returns the artists to be blitted
+        """
+        return artists
 
     def animate(iter: int):
         """
         Subroutine to the `animation.FuncAnimation()` method
         """
-        # * Reshape the value to be an array of dimension Y x X
-        Z = numpy.array(
-            dataSet[iter].iloc[:, 0],
-        ).reshape(len(Y), len(X))
-
-        return pyplot.contourf(
-            X,
-            Y,
-            Z,
-            levels,
-            cmap=colorMap,
-        )
+        if renderMode == "image":
+            # * Update the image in place
+            artists[0].set_data(getZ(iter))
+        elif renderMode == "raster":
+            # * Update the image in place with the binned colors of this frame
+            artists[0].set_data(
+                rasterizeField(Z=getZ(iter), levels=levels, colorMap=colorMap)
+            )
+        else:
+            # * Swap the contour set of the previous frame for the one of this frame
+            artists[0].remove()
+            artists[0] = axes.contourf(
+                X,
+                Y,
+                getZ(iter),
+                levels,
+                cmap=colorMap,
+            )
+
+        return artists
 
     # * Create animation
     contourFillPlotAnimation = animation.FuncAnimation(
         figure,
         animate,
-        frames=len(dataSet) - 1,
+        init_func=initialize,
+        frames=len(dataSet),
         repeat=repeat,
+        blit=blit,
     )
 
-    if saveFigure:
-        print("*** *** Saving figure 💾")
-        contourFillPlotAnimation.save(f"{saveFile}.gif", fps=fps)
+    print("*** *** Showing figure 🖥️")
+    pyplot.show()
+    pyplot.close(figure)
 
-    if showFigure:
-        print("*** *** Showing figure 🖥️")
-        pyplot.show()
 
+def getLevels(
+    dataSet: list[pandas.DataFrame] | GridDataSet,
+    field: dict,
+    levels: int,
+    levelMode: str = "linear",
+) -> numpy.ndarray:
+    """
+    Gets the contour levels of a field from the global values of the field in the data set (looked up in the statistics index)
+
+    Parameters:
+    - dataSet - A list of pandas.DataFrame or a GridDataSet that represent the dataset (only their statistics index is used)
+    - field - The field to be used as the 3rd dimension of the contour fill plot
+    - levels - Number of levels of contours
+    - levelMode - `"linear"` spaces the levels evenly between the global min and max, `"quantile"` places them at the global quantiles of the field
+
+    Returns:
+    - The levels
+    """
+    if levelMode == "quantile":
+        return getQuantileLevels(dataSet=dataSet, field=field, levels=levels)
+
+    # * Get global max & min of the field in the data set
+    gMax, gMin = getGMaxMin(dataSet=dataSet, field=field)
+
+    # * Determine levels
+    return numpy.linspace(gMin, gMax, levels)
 
+
+@profiled("scalarVisualization.visualize")
 def visualize(
-    dataSet: list[pandas.DataFrame],
+    dataSet: list[pandas.DataFrame] | GridDataSet,
     field: dict,
     animated: bool = False,
     levels=5,
@@ -187,12 +308,18 @@ def visualize(
     saveFile: str = "output",
     fps: int = 24,
     repeat: bool = True,
+    workers: int = 1,
+    renderMode: str = "contour",
+    videoFormat: str = "gif",
+    levelMode: str = "linear",
+    grid: Grid = None,
+    decorate: bool = False,
 ):
     """
     Wrapper method that performs a commong action before calling the `visualizeStatic()` or `visualizeMoving()` based on the parameters passed.
 
     Parameters:
-    - dataSet - A list of pandas.DataFrame that represent the dataset
+    - dataSet - A list of pandas.DataFrame or a GridDataSet that represent the dataset
     - field - The field to be used as the 3rd dimension of the contour fill plot
     - animated - Determines which type of plot to be show i.e., static or animated
     - levels - Number of levels of contours
@@ -201,13 +328,20 @@ def visualize(
     - showFigure - Show the plot in an interactive window
     - saveFigure - Save the figure to a file
     - saveFile - The save file name to be used
+    - workers - Number of worker processes that render the frames
+    - renderMode - How the visualization is drawn (`"contour"`, `"image"` or `"raster"`)
+    - videoFormat - Format of the saved moving visualization (`"gif"`, `"mp4"` or `"webm"`)
+    - levelMode - `"linear"` spaces the levels evenly between the global min and max, `"quantile"` places them at the global quantiles of the field
+    - grid - The grid of the data set when it is a list of pandas.DataFrame (a GridDataSet carries its own grid)
+    - decorate - Whether the saved `"raster"` frames are drawn with axes and a color bar
     """
-    # * Compute levels based on the global values of the field in the data set
-    # * Get global max & min of the field in the data set
-    gMax, gMin = getGMaxMin(dataSet=dataSet, field=field)
-
-    # * Determine levels
-    levels = numpy.linspace(gMin, gMax, levels)
+    # * Compute levels based on the global values of the field in the data set (looked up in the statistics index)
+    levels = getLevels(
+        dataSet=dataSet,
+        field=field,
+        levels=levels,
+        levelMode=levelMode,
+    )
 
     print("*** Visualizing 📈")
     if animated and len(dataSet) > 1:
@@ -223,6 +357,11 @@ def visualize(
             saveFile=saveFile,
             fps=fps,
             repeat=repeat,
+            renderMode=renderMode,
+            videoFormat=videoFormat,
+            workers=workers,
+            grid=grid,
+            decorate=decorate,
         )
     else:
         # * Show a static plot
@@ -235,9 +374,384 @@ def visualize(
             showFigure=showFigure,
             saveFigure=saveFigure,
             saveFile=saveFile,
+            workers=workers,
+            grid=grid,
+            renderMode=renderMode,
+            decorate=decorate,
         )
 
 
+def iterateFrames(
+    files: list[str],
+    field: dict,
+    saveFiles: list[str],
+    precision: str = "float64",
+    downsample: int = 1,
+    cacheDir: str = None,
+    zRange: range = None,
+    grid: Grid = SLICE_GRID,
+    lookahead: int = LOOKAHEAD,
+):
+    """
+    Reads and derives one timestep at a time and yields the arguments of its frame as soon as it is processed
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - field - The field to be used as the 3rd dimension of the contour fill plot
+    - saveFiles - The save file of the frame of each timestep
+    - precision - Type in which the columns are held in memory
+    - downsample - Renders one cell in `downsample` along x and y, averaging each block
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - grid - The grid of the data
+    - lookahead - Number of timesteps read and derived on background threads while a frame is rendered
+
+    Yields:
+    - The `saveFile`, `Z`, `X` and `Y` arguments of `renderOps.renderStaticFrame()`
+    """
+    for index, data in iterateTimesteps(
+        files=files,
+        fields=getSourceFields([field]),
+        derivedFields=[field] if field["fieldType"] == "derived" else None,
+        cacheDir=cacheDir,
+        zRange=zRange,
+        precision=precision,
+        grid=grid,
+        lookahead=lookahead,
+    ):
+        frame = toGridDataSet(dataSet=[data], grid=grid).getView(
+            factor=downsample,
+            mode="mean",
+        )
+        X, Y = frame.grid.getAxes()
+
+        yield {
+            "saveFile": saveFiles[index],
+            "Z": frame.getPlane(field=field, timestep=0),
+            "X": X,
+            "Y": Y,
+        }
+
+
+@profiled("scalarVisualization.visualizeStream")
+def visualizeStream(
+    files: list[str],
+    field: dict,
+    animated: bool = False,
+    levels=5,
+    showGrid: bool = False,
+    colorMap="Blues_r",
+    saveFile: str = "output",
+    fps: int = 24,
+    workers: int = None,
+    renderMode: str = "contour",
+    videoFormat: str = "gif",
+    levelMode: str = "linear",
+    precision: str = "float64",
+    downsample: int = 1,
+    cacheDir: str = None,
+    zRange: range = None,
+    grid: Grid = SLICE_GRID,
+    lookahead: int = LOOKAHEAD,
+    decorate: bool = False,
+):
+    """
+    Reads, derives and renders one timestep at a time, saving each frame (or streaming it to the animation) before the next timestep is read.
+    The levels come from the statistics index, which is only built for the timesteps that are not indexed yet (their results are then cached for the rendering pass).
+    The memory does not grow with the number of timesteps.
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - field - The field to be used as the 3rd dimension of the contour fill plot
+    - animated - Whether the frames are streamed to an animation instead of separate figures
+    - levels - Number of levels of contours
+    - showGrid - Show grid lines on the figure
+    - colorMap - Color map to be used for the fills
+    - saveFile - The save file name to be used
+    - fps - The frames per second of the animation
+    - workers - Number of worker processes that build the missing statistics index
+    - renderMode - How the frames are drawn (`"contour"`, `"image"` or `"raster"`)
+    - videoFormat - Format of the animation (`"gif"`, `"mp4"` or `"webm"`)
+    - levelMode - `"linear"` or `"quantile"` levels (see `getLevels()`)
+    - precision - Type in which the columns are held in memory
+    - downsample - Renders one cell in `downsample` along x and y, averaging each block
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - grid - The grid of the data
+    - lookahead - Number of timesteps read and derived on background threads while a frame is rendered
+    - decorate - Whether the `"raster"` frames are drawn with axes and a color bar
+    """
+    print("*** Indexing data files 📇")
+    levels = getLevels(
+        dataSet=readStatistics(
+            files=files,
+            fields=[field],
+            workers=workers,
+            cacheDir=cacheDir,
+            zRange=zRange,
+            grid=grid,
+        ),
+        field=field,
+        levels=levels,
+        levelMode=levelMode,
+    )
+
+    frames = iterateFrames(
+        files=files,
+        field=field,
+        saveFiles=[f"{saveFile} - {index}.png" for index in range(len(files))],
+        precision=precision,
+        downsample=downsample,
+        cacheDir=cacheDir,
+        zRange=zRange,
+        grid=grid,
+        lookahead=lookahead,
+    )
+
+    print("*** Visualizing 📈")
+    shared: dict = {
+        "field": field,
+        "levels": levels,
+        "colorMap": colorMap,
+        "showGrid": showGrid,
+        "renderMode": renderMode,
+        "decorate": decorate,
+    }
+
+    if animated:
+        streamFrames(
+            renderer=renderStaticFrame,
+            frames=(
+                {key: value for key, value in frame.items() if key != "saveFile"}
+                for frame in frames
+            ),
+            saveFile=f"{saveFile}.{videoFormat}",
+            fps=fps,
+            workers=1,
+            **shared,
+        )
+        return
+
+    for frame in frames:
+        print(f"*** *** Saving {frame['saveFile']} 💾")
+        renderStaticFrame(**frame, **shared)
+
+
+def readManifest(manifestFile: str) -> dict:
+    """
+    Reads the manifest of the frames rendered by `visualizeIncremental()`
+
+    Parameters:
+    - manifestFile - Path of the manifest
+
+    Returns:
+    - The manifest (empty if it does not exist yet)
+    """
+    if not os.path.isfile(manifestFile):
+        return {}
+
+    with open(manifestFile) as manifest:
+        return json.load(manifest)
+
+
+def writeManifest(manifestFile: str, manifest: dict):
+    """
+    Writes the manifest of the rendered frames (to a temporary file first, so that an interrupted run never leaves a partial manifest)
+
+    Parameters:
+    - manifestFile - Path of the manifest
+    - manifest - The manifest
+    """
+    directory: str = os.path.dirname(manifestFile)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f"{manifestFile}.tmp", "w") as temporary:
+        json.dump(manifest, temporary, indent=2)
+    os.replace(f"{manifestFile}.tmp", manifestFile)
+
+
+@profiled("scalarVisualization.visualizeIncremental")
+def visualizeIncremental(
+    files: list[str],
+    field: dict,
+    levels=5,
+    showGrid: bool = False,
+    colorMap="Blues_r",
+    saveFile: str = "output",
+    workers: int = None,
+    renderMode: str = "contour",
+    levelMode: str = "linear",
+    precision: str = "float64",
+    downsample: int = 1,
+    cacheDir: str = None,
+    zRange: range = None,
+    grid: Grid = SLICE_GRID,
+    lookahead: int = LOOKAHEAD,
+    manifestFile: str = None,
+    decorate: bool = False,
+) -> list[str]:
+    """
+    Renders the frames of the timesteps that are new or have changed since the previous call.
+    A manifest keeps the fingerprint of the file behind every saved frame and the levels they were drawn with.
+    The statistics index is only built for the new or changed files; every frame is rendered again only when the levels (the global min/max) or the render parameters change.
+
+    Parameters:
+    - files - List of files (paths) to be read, one per timestep
+    - field - The field to be used as the 3rd dimension of the contour fill plot
+    - levels - Number of levels of contours
+    - showGrid - Show grid lines on the figure
+    - colorMap - Color map to be used for the fills
+    - saveFile - The save file name to be used (each frame is saved as `"{saveFile} - {index}.png"`, like `visualizeStatic()`)
+    - workers - Number of worker processes that build the missing statistics index
+    - renderMode - How the frames are drawn (`"contour"`, `"image"` or `"raster"`)
+    - levelMode - `"linear"` or `"quantile"` levels (see `getLevels()`)
+    - precision - Type in which the columns are held in memory
+    - downsample - Renders one cell in `downsample` along x and y, averaging each block
+    - cacheDir - Directory of the cache
+    - zRange - The z-planes to be extracted when the files are gzipped data volumes
+    - grid - The grid of the data
+    - lookahead - Number of timesteps read and derived on background threads while a frame is rendered
+    - manifestFile - Path of the manifest (defaults to `"{saveFile}.manifest.json"`)
+    - decorate - Whether the `"raster"` frames are drawn with axes and a color bar
+
+    Returns:
+    - The frames that have been rendered
+    """
+    manifestFile = manifestFile if manifestFile != None else f"{saveFile}.manifest.json"
+    manifest: dict = readManifest(manifestFile)
+
+    directory: str = os.path.dirname(saveFile)
+    if directory != "":
+        os.makedirs(directory, exist_ok=True)
+
+    print("*** Indexing data files 📇")
+    levels = getLevels(
+        dataSet=readStatistics(
+            files=files,
+            fields=[field],
+            workers=workers,
+            cacheDir=cacheDir,
+            zRange=zRange,
+            grid=grid,
+        ),
+        field=field,
+        levels=levels,
+        levelMode=levelMode,
+    )
+
+    parameters: dict = {
+        "field": field["label"],
+        "colorMap": colorMap,
+        "showGrid": showGrid,
+        "renderMode": renderMode,
+        "downsample": downsample,
+        "decorate": decorate,
+        # * The levels are compared by a hash of their float64 bytes (exact, even for NaN or quantile levels)
+        "levels": hashlib.sha1(
+            numpy.ascontiguousarray(levels, dtype=numpy.float64).tobytes()
+        ).hexdigest(),
+    }
+    frames: dict = (
+        manifest.get("frames", {}) if manifest.get("parameters") == parameters else {}
+    )
+    if len(manifest) > 0 and len(frames) == 0:
+        print(
+            "*** *** Levels or render parameters changed, rendering every timestep again 🔁"
+        )
+
+    fingerprints: dict[str, dict] = {file: getFingerprint(file) for file in files}
+    saveFiles: list[str] = [f"{saveFile} - {index}.png" for index in range(len(files))]
+    pending: list[int] = [
+        index
+        for index, file in enumerate(files)
+        if file not in frames
+        or frames[file]["fingerprint"] != fingerprints[file]
+        or frames[file]["saveFile"] != saveFiles[index]
+        or not os.path.isfile(saveFiles[index])
+    ]
+
+    print(f"*** Visualizing {len(pending)} of {len(files)} timesteps 📈")
+    for frame in iterateFrames(
+        files=[files[index] for index in pending],
+        field=field,
+        saveFiles=[saveFiles[index] for index in pending],
+        precision=precision,
+        downsample=downsample,
+        cacheDir=cacheDir,
+        zRange=zRange,
+        grid=grid,
+        lookahead=lookahead,
+    ):
+        print(f"*** *** Saving {frame['saveFile']} 💾")
+        renderStaticFrame(
+            **frame,
+            field=field,
+            levels=levels,
+            colorMap=colorMap,
+            showGrid=showGrid,
+            renderMode=renderMode,
+            decorate=decorate,
+        )
+
+    # * Files that are no longer present are dropped from the manifest
+    writeManifest(
+        manifestFile=manifestFile,
+        manifest={
+            "parameters": parameters,
+            "frames": {
+                file: {"fingerprint": fingerprints[file], "saveFile": saveFiles[index]}
+                for index, file in enumerate(files)
+            },
+        },
+    )
+
+    return [saveFiles[index] for index in pending]
+
+
+def watch(
+    path: str,
+    field: dict,
+    pattern: str = "multifield.*.zslice.txt",
+    interval: float = 10,
+    polls: int = None,
+    **parameters,
+):
+    """
+    Watches a directory for new or changed timestep files and renders their frames with `visualizeIncremental()` as they arrive.
+    The frames are only updated once the size and modification time of every file are the same on two polls in a row, so files that are still being written are never read.
+
+    Parameters:
+    - path - Directory of the data files
+    - field - The field to be visualized
+    - pattern - Glob pattern of the data files in `path` (sorted by name, so the timestep numbers must be zero padded)
+    - interval - Seconds between two polls
+    - polls - Number of polls before returning (`None` watches until interrupted)
+    - parameters - The parameters of `visualizeIncremental()` (e.g., `levels`, `saveFile`)
+    """
+    previous: dict[str, dict] = None
+    rendered: dict[str, dict] = None
+    poll: int = 0
+
+    print(f"*** Watching {os.path.join(path, pattern)} 👀")
+    try:
+        while polls == None or poll < polls:
+            files: list[str] = sorted(glob.glob(os.path.join(path, pattern)))
+            current: dict[str, dict] = {file: getFingerprint(file) for file in files}
+
+            # * Render once the files have settled and only if they differ from the last render
+            if current == previous and current != rendered and len(files) > 0:
+                visualizeIncremental(files=files, field=field, **parameters)
+                rendered = current
+
+            previous = current
+            poll += 1
+            if polls == None or poll < polls:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print("*** Stopped watching 🛑")
+
+
 if __name__ == "__main__":
     print("*** Getting file names 🗃️")
 
@@ -245,10 +759,15 @@ if __name__ == "__main__":
     # timestepRange=range(0, 200, 10)
     timestepRange = [1, 2, 3, 6, 9, 14, 19, 29, 49, 69, 99, 129, 159, 189]
 
-    path: str = "./data/extracted/scalar"
+    # * Read the z-plane straight from the gzipped data volumes (the same cache entries makeZSlices.py writes) instead of the extracted z-slices
+    volumes: bool = False
+    zRange: range = range(125, 126) if volumes else None
+
+    path: str = "./data" if volumes else "./data/extracted/scalar"
+    extension: str = "txt.gz" if volumes else "zslice.txt"
 
     files: list[str] = [
-        rf"{path}/multifield.{'{:04d}'.format(timestep)}.zslice.txt"
+        rf"{path}/multifield.{'{:04d}'.format(timestep)}.{extension}"
         for timestep in timestepRange
     ]
 
@@ -272,45 +791,118 @@ if __name__ == "__main__":
     saveFile: str = f"./outputs/{field['label']}"
     fps: str = 5
     repeat: bool = True
-
-    print("*** Reading data files 📃")
-    if field["fieldType"] == "given":
-        dataSet: list[pandas.DataFrame] = readDataSet(
-            files=files,
-            fields=[field],
+    workers: int = None
+    # * "contour", "image" or "raster" (the binned cells written straight to the PNG files, much faster than the contour fills)
+    renderMode: str = "contour"
+    # * Whether the "raster" frames are drawn with axes and a color bar
+    decorate: bool = False
+    videoFormat: str = "gif"
+    levelMode: str = "linear"
+    precision: str = "float64"
+    downsample: int = 1
+
+    # * Process and render one timestep at a time (the saved figures appear as each timestep is read)
+    stream: bool = True
+    # * Number of timesteps read ahead on background threads while a frame is rendered
+    lookahead: int = 2
+
+    # * Watch `path` for new or changed timesteps and render only their frames (every frame again when the levels change)
+    watchMode: bool = False
+    # * Seconds between two checks of `path` in the watch mode
+    interval: float = 10
+
+    # * Whether the stages are timed and reported at the end of the run (PIPELINE_PROFILE=1 also turns it on)
+    profile: bool = False
+    if profile:
+        enableProfiling()
+
+    if watchMode:
+        watch(
+            path=path,
+            field=field,
+            pattern=f"multifield.*.{extension}",
+            interval=interval,
+            levels=levels,
+            showGrid=showGrid,
+            colorMap=colorMap,
+            saveFile=saveFile,
+            workers=workers,
+            renderMode=renderMode,
+            levelMode=levelMode,
+            precision=precision,
+            downsample=downsample,
+            lookahead=lookahead,
+            decorate=decorate,
+            zRange=zRange,
         )
-
-    elif field["fieldType"] == "derived":
-        dataSet: list[pandas.DataFrame] = readDataSet(
+    elif stream and saveFigure and not showFigure:
+        visualizeStream(
             files=files,
-            fields=[
-                TOTAL_PARTICLE_DENSITY,
-                H_MASS_ABUNDANCE,
-                H_PLUS_MASS_ABUNDANCE,
-                HE_MASS_ABUNDANCE,
-                HE_PLUS_MASS_ABUNDANCE,
-                HE_PLUS_PLUS_MASS_ABUNDANCE,
-                H_MINUS_MASS_ABUNDANCE,
-                H2_MASS_ABUNDANCE,
-                H2_PLUS_MASS_ABUNDANCE,
-            ],
+            field=field,
+            animated=animated,
+            levels=levels,
+            showGrid=showGrid,
+            colorMap=colorMap,
+            saveFile=saveFile,
+            fps=fps,
+            workers=workers,
+            renderMode=renderMode,
+            videoFormat=videoFormat,
+            levelMode=levelMode,
+            precision=precision,
+            downsample=downsample,
+            lookahead=lookahead,
+            decorate=decorate,
+            zRange=zRange,
+        )
+    else:
+        print("*** Reading data files 📃")
+        if field["fieldType"] == "given":
+            dataSet: list[pandas.DataFrame] = processDataSet(
+                files=files,
+                fields=[field],
+                workers=workers,
+                precision=precision,
+                zRange=zRange,
+            )
+
+        elif field["fieldType"] == "derived":
+            dataSet: list[pandas.DataFrame] = processDataSet(
+                files=files,
+                fields=getSourceFields([field]),
+                derivedFields=[field],
+                workers=workers,
+                precision=precision,
+                zRange=zRange,
+            )
+
+        # * Hold the data set as one (t, z, y, x) array per field (block averaged for quick previews)
+        dataSet: GridDataSet = toGridDataSet(dataSet=dataSet).getView(
+            factor=downsample,
+            mode="mean",
         )
 
-        dataSet = computeDerivedScalarFields(
+        visualize(
             dataSet=dataSet,
-            fields=[field],
+            field=field,
+            animated=animated,
+            levels=levels,
+            showGrid=showGrid,
+            colorMap=colorMap,
+            showFigure=showFigure,
+            saveFigure=saveFigure,
+            saveFile=saveFile,
+            fps=fps,
+            repeat=repeat,
+            workers=workers,
+            renderMode=renderMode,
+            videoFormat=videoFormat,
+            levelMode=levelMode,
+            decorate=decorate,
         )
 
-    visualize(
-        dataSet=dataSet,
-        field=field,
-        animated=animated,
-        levels=levels,
-        showGrid=showGrid,
-        colorMap=colorMap,
-        showFigure=showFigure,
-        saveFigure=saveFigure,
-        saveFile=saveFile,
-        fps=fps,
-        repeat=repeat,
+    print(
+        f"*** Result cache: {resultCacheCounters['hits']} hits, {resultCacheCounters['misses']} misses ♻️"
     )
+
+    reportProfile()
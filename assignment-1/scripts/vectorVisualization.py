@@ -2,87 +2,99 @@ import numpy
 import pandas
 from matplotlib import pyplot, animation, cm, colors
 import math
-from dataOps import readDataSet, computeCurl, getGMaxMin
+from dataOps import processDataSet, getGMaxMin
+from cacheOps import resultCacheCounters
+from profileOps import profiled, enableProfiling, reportProfile
 from vectorFields import *
+from renderOps import KM_TO_PARSEC, drawQuiver, getRenderContext
+from gridOps import Grid, GridFrame, getDataSetGrid, getPlane, toGridDataSet
 
 
+@profiled("vectorVisualization.visualize")
 def visualize(
-    data: pandas.DataFrame,
+    data: pandas.DataFrame | GridFrame,
     gMax=None,
     gMin=None,
     showFigure: bool = True,
     saveFigure: bool = True,
     saveFile: str = "static-quiver",
+    grid: Grid = None,
+    lodMode: str = "mean",
+    lodFactor: int = None,
 ):
     """
-    Creates a quiver (arrow) plot for the `pandas.DataFrame` passed in as the argument
+    Creates a quiver (arrow) plot for the timestep passed in as the argument
 
     Parameters:
-    - data - A pandas.DataFrame that represents the dataset
+    - data - A pandas.DataFrame or a GridFrame that represents the timestep
     - gMax - Maximum value of the curl of the magnitude (Used for scale & normalization)
     - gMin - Minimum value of the curl of the magnite (Used for normalization)
     - showFigure - Show the plot in interactive mode
     - saveFigure - Save the figure to a file
     - saveFile - The save file name to be used
+    - grid - The grid of the data when it is a pandas.DataFrame (a GridFrame carries its own grid)
+    - lodMode - How the arrows are reduced to the density the figure can show (`"stride"`, `"mean"` or `"magnitude"`, see `renderOps.reduceQuiver()`)
+    - lodFactor - The downsampling factor of the arrows (`None` chooses it from the size and the DPI of the figure, `1` draws every arrow)
     """
     # * Define X and Y co-ordinate range
-    X: list[float] = numpy.arange(0.0, 0.6, 0.001)
-    Y: list[float] = numpy.arange(0.0, 0.248, 0.001)
+    grid = getDataSetGrid(dataSet=data, grid=grid)
+    X, Y = grid.getAxes()
 
-    # * Define U, V, and Z
-    U = numpy.array(data[CURL_X["accessor"]]).reshape(len(Y), len(X))
-    V = numpy.array(data[CURL_Y["accessor"]]).reshape(len(Y), len(X))
-    C = numpy.array(data[CURL_MAG["accessor"]]).reshape(len(Y), len(X))
-
-    # * Change unit to Parsec
-    U *= 3.2407792700054e-14
-    V *= 3.2407792700054e-14
-    C *= 3.2407792700054e-14
+    # * Define U, V, and Z (in Parsec)
+    U = getPlane(data=data, field=CURL_X, grid=grid) * KM_TO_PARSEC
+    V = getPlane(data=data, field=CURL_Y, grid=grid) * KM_TO_PARSEC
+    C = getPlane(data=data, field=CURL_MAG, grid=grid) * KM_TO_PARSEC
 
     # * Compute the scale and normalize
     scale = None
     norm = None
     if gMax != None and gMin != None:
-        gMax *= 3.2407792700054e-14
-        gMin *= 3.2407792700054e-14
+        gMax *= KM_TO_PARSEC
+        gMin *= KM_TO_PARSEC
         scale = 10 ** (math.floor(math.log10(gMax)) + 2)
         norm = pyplot.Normalize(gMax, gMin)
 
-    # * Define the figure
-    pyplot.figure(figsize=(15, 10))
+    # * Define the figure (figures that are only saved reuse the figure of this process)
+    if showFigure:
+        figure = pyplot.figure(figsize=(15, 10))
+        axes = figure.gca()
+    else:
+        figure, axes = getRenderContext(figsize=(15, 10))
 
     # * Define axis labels
-    pyplot.xlabel("X | parsec")
-    pyplot.ylabel("Y | parsec")
+    axes.set_xlabel("X | parsec")
+    axes.set_ylabel("Y | parsec")
 
     # * Define title
-    pyplot.title("Curl of the Velocity | parsec/s")
+    axes.set_title("Curl of the Velocity | parsec/s")
 
     # * Draw quiver
-    pyplot.quiver(
-        X,
-        Y,
-        U,
-        V,
-        C,
+    quiver = drawQuiver(
+        axes=axes,
+        X=X,
+        Y=Y,
+        U=U,
+        V=V,
+        C=C,
         norm=norm,
         scale=scale,
-        angles="xy",
-        scale_units="xy",
-        minshaft=1,
-        minlength=0,
+        lodMode=lodMode,
+        lodFactor=lodFactor,
     )
 
     # * Add colorbar
-    pyplot.colorbar(label="Magnitude of the Curl the velocity | parsec/s}")
+    figure.colorbar(
+        quiver, ax=axes, label="Magnitude of the Curl the velocity | parsec/s}"
+    )
 
     if saveFigure:
         print("*** *** Saving figure 💾")
-        pyplot.savefig(f"{saveFile}.png")
+        figure.savefig(f"{saveFile}.png")
 
     if showFigure:
         print("*** *** Showing figure 🖥️")
         pyplot.show()
+        pyplot.close(figure)
 
 
 if __name__ == "__main__":
@@ -90,25 +102,50 @@ if __name__ == "__main__":
     # timestepRange = range(1, 200)
     timestepRange = [1, 2, 3, 6, 9, 14, 19, 29, 49, 69, 99, 129, 159, 189]
 
-    path: str = "./data/extracted/vector"
+    # * Read the z-planes straight from the gzipped data volumes (the same cache entries makeZSlices.py writes) instead of the extracted z-slices
+    # * The curl needs the next z-plane as well
+    volumes: bool = False
+    zRange: range = range(125, 127) if volumes else None
 
     files: list[str] = [
-        rf"{path}/velocity.{'{:04d}'.format(timestep)}.zslice.txt"
+        (
+            rf"./data/vector.{'{:04d}'.format(timestep)}.txt.gz"
+            if volumes
+            else rf"./data/extracted/vector/velocity.{'{:04d}'.format(timestep)}.zslice.txt"
+        )
         for timestep in timestepRange
     ]
 
-    print("*** Reading data files 📃")
-    dataSet: list[pandas.DataFrame] = readDataSet(
+    # * Number of worker processes (1 processes the timesteps one after another)
+    workers: int = None
+
+    # * Whether the stages are timed and reported at the end of the run (PIPELINE_PROFILE=1 also turns it on)
+    profile: bool = False
+    if profile:
+        enableProfiling()
+
+    # * How the arrows are reduced to the density the figure can show ("stride", "mean" or "magnitude")
+    lodMode: str = "mean"
+
+    print("*** Reading and processing data files ⛓️")
+    dataSet: list[pandas.DataFrame] = processDataSet(
         files=files,
         fields=[
             I_COMPONENT,
             J_COMPONENT,
             K_COMPONENT,
         ],
+        curl=True,
+        workers=workers,
+        zRange=zRange,
     )
 
-    print("*** Processing data ⛓️")
-    dataSet = computeCurl(dataSet=dataSet)
+    print(
+        f"*** Result cache: {resultCacheCounters['hits']} hits, {resultCacheCounters['misses']} misses ♻️"
+    )
+
+    # * Hold the data set as one (t, z, y, x) array per field
+    dataSet = toGridDataSet(dataSet=dataSet)
 
     curlMax, curlMin = getGMaxMin(dataSet=dataSet, field=CURL_MAG)
 
@@ -120,4 +157,7 @@ if __name__ == "__main__":
             showFigure=False,
             saveFigure=True,
             saveFile=f"./outputs/curl-arrow-{index}",
+            lodMode=lodMode,
         )
+
+    reportProfile()
@@ -0,0 +1,583 @@
+import os
+import json
+import shutil
+import numpy
+import pandas
+from dataclasses import replace
+from numpy.lib.format import open_memmap
+from scalarFields import *
+from vectorFields import *
+from gridOps import Grid, GridDataSet, CONTEST_GRID
+from cacheOps import getFingerprint
+from dataOps import (
+    STATISTICS_BINS,
+    computeCurlArrays,
+    computeDerivedColumns,
+    getSourceFields,
+)
+
+# * Number of z-planes processed at a time
+CHUNK_PLANES = 16
+
+
+def readVolumeChunks(
+    file: str,
+    columns: list[int],
+    grid: Grid = CONTEST_GRID,
+    chunkPlanes: int = CHUNK_PLANES,
+):
+    """
+    Reads a data volume (plain or gzipped) as a stream of z-chunks.
+    Only one chunk of `chunkPlanes` z-planes is parsed and held in memory at a time.
+
+    Parameters:
+    - file - Path of the data volume (e.g., multifield.0001.txt.gz)
+    - columns - The columns (accessors) to be read
+    - grid - The grid of the data volume
+    - chunkPlanes - Number of z-planes in a chunk
+
+    Yields:
+    - A tuple (start, chunk) with the index of the first z-plane of the chunk and a dictionary that maps each column to its (planes, ny, nx) values
+    """
+    start: int = 0
+
+    with pandas.read_csv(
+        file,
+        sep=r"\s+",
+        header=None,
+        usecols=columns,
+        lineterminator="\n",
+        dtype=numpy.float64,
+        chunksize=chunkPlanes * grid.planeCells,
+    ) as reader:
+        for data in reader:
+            if len(data) % grid.planeCells != 0:
+                raise ValueError(
+                    f"{file} ends with a partial z-plane after plane {start}"
+                )
+
+            planes: int = len(data) // grid.planeCells
+            yield (
+                start,
+                {
+                    column: data[column].to_numpy().reshape((planes,) + grid.planeShape)
+                    for column in data.columns
+                },
+            )
+            start += planes
+
+    if start != grid.nz:
+        raise ValueError(f"Expected {grid.nz} z-planes in {file} but got {start}")
+
+
+def readCurlChunks(
+    file: str,
+    grid: Grid = CONTEST_GRID,
+    chunkPlanes: int = CHUNK_PLANES,
+    scheme: str = "forward",
+):
+    """
+    Computes the curl of a velocity volume chunk by chunk.
+    Each chunk is extended by a one-plane halo from its neighbouring chunks, so the result is the same as the curl of the whole volume.
+
+    Parameters:
+    - file - Path of the velocity volume (e.g., vector.0001.txt.gz)
+    - grid - The grid of the data volume
+    - chunkPlanes - Number of z-planes in a chunk
+    - scheme - The finite difference to be used (`"forward"` or `"central"`)
+
+    Yields:
+    - A tuple (start, chunk) with the index of the first z-plane of the chunk and a dictionary that maps the accessor of CURL_X, CURL_Y, CURL_Z and CURL_MAG to its (planes, ny, nx) values
+    """
+    columns: list[int] = [
+        I_COMPONENT["accessor"],
+        J_COMPONENT["accessor"],
+        K_COMPONENT["accessor"],
+    ]
+
+    def process(
+        start: int,
+        velocity: numpy.ndarray,
+        lower: numpy.ndarray,
+        upper: numpy.ndarray,
+    ) -> tuple[int, dict]:
+        """
+        Computes the curl of a chunk from its velocity and its halo planes (`None` at the ends of the volume)
+        """
+        padded: list[numpy.ndarray] = [velocity]
+        if lower is not None:
+            padded.insert(0, lower)
+        if upper is not None:
+            padded.append(upper)
+
+        curl: dict[int, numpy.ndarray] = computeCurlArrays(
+            velocity=numpy.concatenate(padded),
+            spacing=grid.spacing,
+            scheme=scheme,
+        )
+        offset: int = 0 if lower is None else 1
+
+        return (
+            start,
+            {
+                column: values[offset : offset + len(velocity)]
+                for column, values in curl.items()
+            },
+        )
+
+    previous: tuple = None
+    lower: numpy.ndarray = None
+
+    for start, chunk in readVolumeChunks(
+        file=file,
+        columns=columns,
+        grid=grid,
+        chunkPlanes=chunkPlanes,
+    ):
+        velocity: numpy.ndarray = numpy.stack(
+            [chunk[column] for column in columns], axis=-1
+        )
+
+        if previous != None:
+            yield process(*previous, lower=lower, upper=velocity[:1])
+            lower = previous[1][-1:]
+
+        previous = (start, velocity)
+
+    if previous != None:
+        yield process(*previous, lower=lower, upper=None)
+
+
+def computeChunkedStatistics(
+    values: numpy.ndarray,
+    chunkPlanes: int = CHUNK_PLANES,
+) -> dict:
+    """
+    Computes the statistics of a (nz, ny, nx) field stored on disk, `chunkPlanes` z-planes at a time.
+    The result is the same as `dataOps.computeStatistics()` of the whole field.
+
+    Parameters:
+    - values - The (memory mapped) values of the field
+    - chunkPlanes - Number of z-planes in a chunk
+
+    Returns:
+    - The statistics of the field (see `dataOps.computeStatistics()`)
+    """
+
+    def chunks():
+        for start in range(0, len(values), chunkPlanes):
+            chunk: numpy.ndarray = numpy.asarray(values[start : start + chunkPlanes])
+            yield chunk[~numpy.isnan(chunk)]
+
+    count, positiveCount = 0, 0
+    lMin, lMax, logMin, logMax = numpy.inf, -numpy.inf, numpy.inf, -numpy.inf
+    total: float = 0.0
+
+    # * The ranges are needed before the histograms can be counted
+    for finite in chunks():
+        count += finite.size
+        if finite.size == 0:
+            continue
+
+        positive: numpy.ndarray = finite[finite > 0]
+        lMin = min(lMin, float(finite.min()))
+        lMax = max(lMax, float(finite.max()))
+        total += float(finite.sum(dtype=numpy.float64))
+        positiveCount += positive.size
+        if positive.size > 0:
+            logValues: numpy.ndarray = numpy.log10(positive, dtype=numpy.float64)
+            logMin = min(logMin, float(logValues.min()))
+            logMax = max(logMax, float(logValues.max()))
+
+    nanCount: int = int(values.size - count)
+
+    if count == 0:
+        return {
+            "count": 0,
+            "min": None,
+            "max": None,
+            "mean": None,
+            "nanCount": nanCount,
+            "logMin": None,
+            "logMax": None,
+            "positiveCount": 0,
+            "histogram": [],
+            "logHistogram": [],
+        }
+
+    histogram: numpy.ndarray = numpy.zeros(STATISTICS_BINS, dtype=numpy.int64)
+    logHistogram: numpy.ndarray = numpy.zeros(STATISTICS_BINS, dtype=numpy.int64)
+    for finite in chunks():
+        counts, _ = numpy.histogram(finite, bins=STATISTICS_BINS, range=(lMin, lMax))
+        histogram += counts
+
+        positive: numpy.ndarray = finite[finite > 0]
+        if positive.size > 0:
+            logHistogram += numpy.histogram(
+                numpy.log10(positive, dtype=numpy.float64),
+                bins=STATISTICS_BINS,
+                range=(logMin, logMax),
+            )[0]
+
+    return {
+        "count": int(count),
+        "min": lMin,
+        "max": lMax,
+        "mean": total / count,
+        "nanCount": nanCount,
+        "logMin": logMin if positiveCount > 0 else None,
+        "logMax": logMax if positiveCount > 0 else None,
+        "positiveCount": int(positiveCount),
+        "histogram": histogram.tolist(),
+        "logHistogram": logHistogram.tolist() if positiveCount > 0 else [],
+    }
+
+
+def getStoreEntry(
+    store: str,
+    file: str,
+) -> str:
+    """
+    Gets the directory in which the processed fields of a data volume are stored
+
+    Parameters:
+    - store - Directory of the store
+    - file - Path of the data volume
+
+    Returns:
+    - The path of the store entry directory
+    """
+    return os.path.join(store, os.path.basename(file))
+
+
+def readStoreMeta(
+    store: str,
+    file: str,
+) -> dict:
+    """
+    Reads the description of the processed fields of a data volume
+
+    Parameters:
+    - store - Directory of the store
+    - file - Path of the data volume
+
+    Returns:
+    - A dictionary with the fingerprint of the volume, its grid, the settings it was processed with, the stored fields (accessors) and their statistics (`None` if the entry is missing or the volume has changed)
+    """
+    metaFile: str = os.path.join(getStoreEntry(store=store, file=file), "meta.json")
+
+    if not os.path.isfile(metaFile):
+        return None
+
+    with open(metaFile) as meta:
+        description: dict = json.load(meta)
+
+    if description["fingerprint"] != getFingerprint(file):
+        return None
+
+    description["grid"] = Grid(
+        **dict(description["grid"], origin=tuple(description["grid"]["origin"]))
+    )
+    description["statistics"] = {
+        int(column): value for column, value in description["statistics"].items()
+    }
+
+    return description
+
+
+def processVolume(
+    file: str,
+    store: str,
+    fields: list[dict] = None,
+    curl: bool = False,
+    grid: Grid = CONTEST_GRID,
+    chunkPlanes: int = CHUNK_PLANES,
+    scheme: str = "forward",
+    dtype=numpy.float32,
+) -> dict:
+    """
+    Derives the scalar `fields` or the curl of a data volume chunk by chunk and writes them to a store on disk.
+    Every field is kept as a (nz, ny, nx) `.npy` file that is filled one z-chunk at a time, so a whole timestep is never held in memory.
+    The entry is reused while the volume has not changed and already holds the fields with the same `scheme`, `dtype`, `chunkPlanes` and `grid`; new fields are added to it.
+
+    Parameters:
+    - file - Path of the data volume (e.g., multifield.0001.txt.gz)
+    - store - Directory of the store
+    - fields - The given and derived scalar fields to be stored (none when `curl` is set)
+    - curl - Whether the curl of the velocity must be stored (the volume is then a velocity volume)
+    - grid - The grid of the data volume
+    - chunkPlanes - Number of z-planes in a chunk
+    - scheme - The finite difference of the curl (`"forward"` or `"central"`)
+    - dtype - The type of the stored values
+
+    Returns:
+    - The description of the store entry (see `readStoreMeta()`)
+    """
+    fields = fields if fields != None else []
+    columns: list[int] = (
+        [
+            CURL_X["accessor"],
+            CURL_Y["accessor"],
+            CURL_Z["accessor"],
+            CURL_MAG["accessor"],
+        ]
+        if curl
+        else [field["accessor"] for field in fields]
+    )
+
+    # * The settings that change the stored values (an entry processed with other settings is processed again)
+    settings: dict = {
+        "scheme": scheme if curl else None,
+        "dtype": numpy.dtype(dtype).name,
+        "chunkPlanes": chunkPlanes,
+    }
+
+    description: dict = readStoreMeta(store=store, file=file)
+    if description != None and (
+        description.get("settings") != settings or description["grid"] != grid
+    ):
+        description = None
+
+    if description != None and all(
+        column in description["fields"] for column in columns
+    ):
+        return description
+
+    print(f"*** *** Processing {file} in chunks of {chunkPlanes} z-planes 🧱")
+    fingerprint: dict = getFingerprint(file)
+    entry: str = getStoreEntry(store=store, file=file)
+
+    if description == None:
+        shutil.rmtree(entry, ignore_errors=True)
+        description = {"fields": [], "statistics": {}}
+    os.makedirs(entry, exist_ok=True)
+
+    # * The fields already in the entry are kept, only the missing ones are processed
+    missing: list[int] = [
+        column for column in columns if column not in description["fields"]
+    ]
+    fields = [field for field in fields if field["accessor"] in missing]
+
+    outputs: dict[int, numpy.ndarray] = {
+        column: open_memmap(
+            os.path.join(entry, f"{column}.npy"),
+            mode="w+",
+            dtype=dtype,
+            shape=grid.shape,
+        )
+        for column in missing
+    }
+
+    if curl:
+        chunks = readCurlChunks(
+            file=file,
+            grid=grid,
+            chunkPlanes=chunkPlanes,
+            scheme=scheme,
+        )
+    else:
+        chunks = (
+            (start, {**chunk, **computeDerivedColumns(columns=chunk, fields=fields)})
+            for start, chunk in readVolumeChunks(
+                file=file,
+                columns=[field["accessor"] for field in getSourceFields(fields)],
+                grid=grid,
+                chunkPlanes=chunkPlanes,
+            )
+        )
+
+    for start, chunk in chunks:
+        for column, output in outputs.items():
+            output[start : start + len(chunk[column])] = chunk[column]
+
+    for output in outputs.values():
+        output.flush()
+
+    description = {
+        "fingerprint": fingerprint,
+        "grid": {
+            "nx": grid.nx,
+            "ny": grid.ny,
+            "nz": grid.nz,
+            "spacing": grid.spacing,
+            "origin": list(grid.origin),
+        },
+        "settings": settings,
+        "fields": description["fields"] + missing,
+        "statistics": {
+            **description["statistics"],
+            **{
+                column: computeChunkedStatistics(values=output, chunkPlanes=chunkPlanes)
+                for column, output in outputs.items()
+            },
+        },
+    }
+
+    # * The meta file is replaced in one step, so an interrupted run never leaves a partial entry
+    metaFile: str = os.path.join(entry, "meta.json")
+    temporaryFile: str = f"{metaFile}.{os.getpid()}.tmp"
+    with open(temporaryFile, "w") as meta:
+        json.dump(description, meta)
+    os.replace(temporaryFile, metaFile)
+
+    return readStoreMeta(store=store, file=file)
+
+
+def readVolumeField(
+    store: str,
+    file: str,
+    field: dict,
+) -> numpy.ndarray:
+    """
+    Memory maps a stored field of a data volume (no values are read until they are used)
+
+    Parameters:
+    - store - Directory of the store
+    - file - Path of the data volume
+    - field - A dictionary that represents the field
+
+    Returns:
+    - A read-only (nz, ny, nx) memory mapped array
+    """
+    return numpy.load(
+        os.path.join(getStoreEntry(store=store, file=file), f"{field['accessor']}.npy"),
+        mmap_mode="r",
+    )
+
+
+def readVolumeSlice(
+    store: str,
+    file: str,
+    field: dict,
+    z: int,
+) -> numpy.ndarray:
+    """
+    Reads one z-plane of a stored field
+
+    Parameters:
+    - store - Directory of the store
+    - file - Path of the data volume
+    - field - A dictionary that represents the field
+    - z - Index of the z-plane
+
+    Returns:
+    - The (ny, nx) values of the plane
+    """
+    return numpy.array(readVolumeField(store=store, file=file, field=field)[z])
+
+
+def readVolumeProjection(
+    store: str,
+    file: str,
+    field: dict,
+    mode: str = "max",
+    chunkPlanes: int = CHUNK_PLANES,
+) -> numpy.ndarray:
+    """
+    Projects a stored field along z, reading `chunkPlanes` z-planes at a time
+
+    Parameters:
+    - store - Directory of the store
+    - file - Path of the data volume
+    - field - A dictionary that represents the field
+    - mode - `"max"` keeps the maximum of each column of cells, `"mean"` averages it
+    - chunkPlanes - Number of z-planes in a chunk
+
+    Returns:
+    - The (ny, nx) projection
+    """
+    values: numpy.ndarray = readVolumeField(store=store, file=file, field=field)
+    projection: numpy.ndarray = None
+
+    for start in range(0, len(values), chunkPlanes):
+        chunk: numpy.ndarray = numpy.asarray(values[start : start + chunkPlanes])
+
+        if mode == "max":
+            reduced = chunk.max(axis=0)
+            projection = (
+                reduced if projection is None else numpy.maximum(projection, reduced)
+            )
+        elif mode == "mean":
+            reduced = chunk.sum(axis=0, dtype=numpy.float64)
+            projection = reduced if projection is None else projection + reduced
+        else:
+            raise ValueError(f"Unknown projection: {mode}")
+
+    return projection / len(values) if mode == "mean" else projection
+
+
+def readVolumeStatistics(
+    store: str,
+    files: list[str],
+) -> list[pandas.DataFrame]:
+    """
+    Reads the statistics of the stored fields of every data volume
+
+    Parameters:
+    - store - Directory of the store
+    - files - Paths of the data volumes, one per timestep
+
+    Returns:
+    - A list of empty pandas.DataFrame whose statistics index can be passed to `dataOps.getGMaxMin()` and `dataOps.getQuantileLevels()`
+    """
+    index: list[pandas.DataFrame] = []
+
+    for file in files:
+        description: dict = readStoreMeta(store=store, file=file)
+        if description == None:
+            raise FileNotFoundError(f"{file} has not been processed into {store}")
+
+        data: pandas.DataFrame = pandas.DataFrame()
+        data.attrs["statistics"] = description["statistics"]
+        index.append(data)
+
+    return index
+
+
+def readVolumePlanes(
+    store: str,
+    files: list[str],
+    field: dict,
+    view: str = "slice",
+    z: int = 0,
+    chunkPlanes: int = CHUNK_PLANES,
+) -> GridDataSet:
+    """
+    Reads one plane of a stored field per timestep (a z-slice or a z-projection) into a `GridDataSet` that the visualizers accept.
+    The statistics index of the whole volumes is kept, so every view of a field uses the same levels.
+
+    Parameters:
+    - store - Directory of the store
+    - files - Paths of the data volumes, one per timestep
+    - field - A dictionary that represents the field
+    - view - `"slice"` reads the z-plane `z`, `"max"` and `"mean"` project the volume along z
+    - z - Index of the z-plane of a slice
+    - chunkPlanes - Number of z-planes in a chunk of a projection
+
+    Returns:
+    - The `GridDataSet` of one (1, ny, nx) plane per timestep
+    """
+    planes: list[numpy.ndarray] = [
+        (
+            readVolumeSlice(store=store, file=file, field=field, z=z)
+            if view == "slice"
+            else readVolumeProjection(
+                store=store,
+                file=file,
+                field=field,
+                mode=view,
+                chunkPlanes=chunkPlanes,
+            )
+        )
+        for file in files
+    ]
+    description: dict = readStoreMeta(store=store, file=files[0])
+
+    return GridDataSet(
+        fields={field["accessor"]: numpy.stack(planes)[:, numpy.newaxis]},
+        grid=replace(description["grid"], nz=1),
+        statistics=[
+            data.attrs["statistics"]
+            for data in readVolumeStatistics(store=store, files=files)
+        ],
+    )
@@ -0,0 +1,98 @@
+# ! Custom
+from scalarFields import *
+from gridOps import CONTEST_GRID
+from volumeOps import CHUNK_PLANES, processVolume, readVolumePlanes
+from profileOps import profiled, enableProfiling, reportProfile
+import scalarVisualization
+
+
+@profiled("volumeVisualization.visualize")
+def visualize(
+    store: str,
+    files: list[str],
+    field: dict,
+    view: str = "slice",
+    z: int = 0,
+    chunkPlanes: int = CHUNK_PLANES,
+    **parameters,
+):
+    """
+    Visualizes a z-slice or a z-projection of a field that has been processed into a store by `volumeOps.processVolume()`.
+    Only one plane per timestep is read (a projection reads the volume one chunk at a time), so the data volumes are never held in memory.
+
+    Parameters:
+    - store - Directory of the store
+    - files - Paths of the data volumes, one per timestep
+    - field - The field to be visualized
+    - view - `"slice"` shows the z-plane `z`, `"max"` and `"mean"` show the maximum and the mean along z
+    - z - Index of the z-plane of a slice
+    - chunkPlanes - Number of z-planes in a chunk of a projection
+    - parameters - The parameters of `scalarVisualization.visualize()` (e.g., `levels`, `animated`, `saveFile`)
+    """
+    print(f"*** Reading the {view} view 📃")
+    dataSet = readVolumePlanes(
+        store=store,
+        files=files,
+        field=field,
+        view=view,
+        z=z,
+        chunkPlanes=chunkPlanes,
+    )
+
+    scalarVisualization.visualize(dataSet=dataSet, field=field, **parameters)
+
+
+if __name__ == "__main__":
+    print("*** Getting file names 🗃️")
+    timestepRange = [1, 2, 3, 6, 9, 14, 19, 29, 49, 69, 99, 129, 159, 189]
+
+    path: str = "./data"
+
+    files: list[str] = [
+        rf"{path}/multifield.{'{:04d}'.format(timestep)}.txt.gz"
+        for timestep in timestepRange
+    ]
+
+    print("*** Setting field 🎲")
+    field = H_NUMBER_DENSITY
+    # field = GAS_TEMPERATURE
+
+    print("*** Setting parameters 🛠️")
+    store: str = "./data/volumes"
+    chunkPlanes: int = CHUNK_PLANES
+    # * "slice" (the z-plane `z`), "max" or "mean" (projections along z)
+    view: str = "max"
+    z: int = 125
+    levels: int = 15
+
+    # * Whether the stages are timed and reported at the end of the run (PIPELINE_PROFILE=1 also turns it on)
+    profile: bool = False
+    if profile:
+        enableProfiling()
+
+    print("*** Processing data volumes in chunks 🧱")
+    for file in files:
+        processVolume(
+            file=file,
+            store=store,
+            fields=[field],
+            grid=CONTEST_GRID,
+            chunkPlanes=chunkPlanes,
+        )
+
+    visualize(
+        store=store,
+        files=files,
+        field=field,
+        view=view,
+        z=z,
+        chunkPlanes=chunkPlanes,
+        levels=levels,
+        colorMap=field["colorMap"] if "colorMap" in field else "Blues_r",
+        animated=False,
+        showFigure=False,
+        saveFigure=True,
+        saveFile=f"./outputs/{field['label']} ({view})",
+    )
+
+    reportProfile()